@@ -1,8 +1,8 @@
 """Web Research Agent implementation with LangGraph."""
 
 import logging
-import os
-from typing import Dict, Any, TypedDict, Annotated, Sequence
+import threading
+from typing import Dict, Any, Optional, TypedDict, Annotated, Sequence
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
@@ -10,36 +10,78 @@ from langgraph.prebuilt import ToolNode
 from state import ResearchState
 import nodes
 import config
+from tracing import trace_node
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+PLANNER_MODES = ("llm", "hybrid", "shadow")
+
+
+def resolve_run_options(options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Complete per-run settings with the process configuration.
+
+    Args:
+        options: Any of disable_news, fused_planning and planner_mode; None
+            values fall back to config.
+
+    Returns:
+        The settings stored in state["run_options"] for the run.
+
+    Raises:
+        ValueError: for unknown options or planner modes.
+    """
+    resolved = {
+        "disable_news": config.DISABLE_NEWS_SEARCH,
+        "fused_planning": config.FUSED_PLANNING,
+        "planner_mode": config.PLANNER_MODE,
+    }
+    options = {name: value for name, value in (options or {}).items() if value is not None}
+    unknown = set(options) - set(resolved)
+    if unknown:
+        raise ValueError(f"Unknown run options: {', '.join(sorted(unknown))}")
+    resolved.update(options)
+    if resolved["planner_mode"] not in PLANNER_MODES:
+        raise ValueError(f"Unknown planner mode {resolved['planner_mode']!r}")
+    return resolved
+
+
 def create_web_research_agent():
     """
-    Create and configure the Web Research Agent graph.
+    Create and compile the Web Research Agent graph.
+    
+    The graph holds every variant; which planning entry point is used and
+    whether news search runs are decided per run from state["run_options"]
+    (see resolve_run_options), so one compiled graph serves every request.
     
     Returns:
-        The configured agent graph.
+        The compiled agent graph.
     """
     graph = StateGraph(ResearchState)
     
-    graph.add_node("analyze_query", nodes.analyze_query)
-    graph.add_node("plan_research_strategy", nodes.plan_research_strategy)
-    graph.add_node("execute_web_search", nodes.execute_web_search)
-    graph.add_node("execute_news_search", nodes.execute_news_search)
-    graph.add_node("evaluate_results_and_select_urls", nodes.evaluate_results_and_select_urls)
-    graph.add_node("scrape_websites", nodes.scrape_websites)
-    graph.add_node("extract_and_synthesize_information", nodes.extract_and_synthesize_information)
-    graph.add_node("compile_final_report", nodes.compile_final_report)
+    graph.add_node("analyze_and_plan", trace_node("analyze_and_plan", nodes.analyze_and_plan))
+    graph.add_node("analyze_query", trace_node("analyze_query", nodes.analyze_query))
+    graph.add_node("plan_research_strategy", trace_node("plan_research_strategy", nodes.plan_research_strategy))
+    graph.add_node("execute_web_search", trace_node("execute_web_search", nodes.execute_web_search))
+    graph.add_node("execute_news_search", trace_node("execute_news_search", nodes.execute_news_search))
+    graph.add_node("evaluate_results_and_select_urls", trace_node("evaluate_results_and_select_urls", nodes.evaluate_results_and_select_urls))
+    graph.add_node("scrape_websites", trace_node("scrape_websites", nodes.scrape_websites))
+    graph.add_node("extract_and_synthesize_information", trace_node("extract_and_synthesize_information", nodes.extract_and_synthesize_information))
+    graph.add_node("compile_final_report", trace_node("compile_final_report", nodes.compile_final_report))
     
     
-    graph.set_entry_point("analyze_query")
+    def route_entry(state: ResearchState) -> str:
+        if state.get("run_options", {}).get("fused_planning", config.FUSED_PLANNING):
+            return "analyze_and_plan"
+        return "analyze_query"
     
+    graph.set_conditional_entry_point(route_entry, ["analyze_and_plan", "analyze_query"])
     graph.add_edge("analyze_query", "plan_research_strategy")
     
     def route_to_search_strategy(state: ResearchState) -> str | Sequence[str]:
-        news_search_disabled = os.environ.get("DISABLE_NEWS_SEARCH") == "true"
+        news_search_disabled = state.get("run_options", {}).get("disable_news", config.DISABLE_NEWS_SEARCH)
         
         search_approach = state.get("research_plan", {}).get("search_approach", "web_search")
         
@@ -56,17 +98,15 @@ def create_web_research_agent():
         
         return search_approach  
     
-    graph.add_conditional_edges(
-        "plan_research_strategy",
-        route_to_search_strategy,
-        {
-            "web_search": "execute_web_search", 
-            "news_search": "execute_news_search",
-            "extract_and_synthesize_information": "extract_and_synthesize_information",
-            "execute_web_search": "execute_web_search",
-            "execute_news_search": "execute_news_search"
-        }
-    )
+    search_routes = {
+        "web_search": "execute_web_search", 
+        "news_search": "execute_news_search",
+        "extract_and_synthesize_information": "extract_and_synthesize_information",
+        "execute_web_search": "execute_web_search",
+        "execute_news_search": "execute_news_search"
+    }
+    graph.add_conditional_edges("plan_research_strategy", route_to_search_strategy, search_routes)
+    graph.add_conditional_edges("analyze_and_plan", route_to_search_strategy, search_routes)
     
  
     graph.add_edge(["execute_web_search", "execute_news_search"], "evaluate_results_and_select_urls")
@@ -102,19 +142,41 @@ def create_web_research_agent():
     return graph.compile()
 
 
-def run_web_research_agent(query: str) -> Dict[str, Any]:
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_web_research_agent():
+    """
+    Return the process-wide compiled graph, compiling it on first use.
+
+    The compiled graph keeps no per-run state (there is no checkpointer), so
+    it is invoked concurrently by API requests and interactive queries.
+    """
+    global _agent
+    with _agent_lock:
+        if _agent is None:
+            _agent = create_web_research_agent()
+        return _agent
+
+
+def run_web_research_agent(query: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Run the Web Research Agent with a user query.
     
     Args:
         query: The user's research query
+        options: Per-run settings (disable_news, fused_planning, planner_mode)
+            overriding the process configuration for this run only
         
     Returns:
         The final state containing the research report
+
+    Raises:
+        ValueError: if options contains unknown settings
     """
-    agent = create_web_research_agent()
-    
-    initial_state = {"original_query": query}
+    initial_state = {"original_query": query, "run_options": resolve_run_options(options)}
+    agent = get_web_research_agent()
     
     logger.info(f"Starting research for query: {query}")
     
@@ -1,19 +1,52 @@
 """ Functionality for the API. Endpoints for the API are defined here."""
 
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 load_dotenv()
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from typing import Any, Dict, Literal, Optional
+from fastapi import FastAPI, Header, HTTPException, Response
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
-from agent import run_web_research_agent
+from agent import get_web_research_agent, run_web_research_agent
+from browser_pool import browser_pool_stats, get_browser_pool, shutdown_browser_pool
+import config
+from cache import cache_stats
+from cassette import cassette_stats
+from coalesce import coalescing_stats
+from llm_client import llm_cache_stats
+from page_cache import page_cache_stats
+from prefetch import prefetch_stats
+from profiler import load_profile_file, profile_run
+from ratelimit import rate_limit_stats
+from resilience import resilience_stats
+from structured import structured_output_stats
+from tracing import configure_otel_exporter, metrics_payload, tracing_stats
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compile the graph and start the shared browser pool with the API; close the pool on shutdown."""
+    configure_otel_exporter()
+    get_web_research_agent()
+    if config.BROWSER_POOL_WARM_ON_STARTUP:
+        try:
+            await asyncio.to_thread(get_browser_pool().warm)
+        except Exception as e:
+            logger.error(f"Failed to warm browser pool, browsers will start on first scrape: {str(e)}")
+    yield
+    await asyncio.to_thread(shutdown_browser_pool)
 
 app = FastAPI(
     title="Web Research Agent API",
     description="API for running the Web Research Agent programmatically",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 # Allow all origins for development purposes
 app.add_middleware(
@@ -26,6 +59,14 @@ app.add_middleware(
 
 class ResearchRequest(BaseModel):
     query: str
+    # Per-run settings; omitted values use the server configuration
+    disable_news: Optional[bool] = None
+    fused_planning: Optional[bool] = None
+    planner_mode: Optional[Literal["llm", "hybrid", "shadow"]] = None
+
+    def run_options(self) -> Dict[str, Any]:
+        return {"disable_news": self.disable_news, "fused_planning": self.fused_planning,
+                "planner_mode": self.planner_mode}
 
 class ResearchResponse(BaseModel):
     query: str
@@ -35,17 +76,73 @@ class ResearchResponse(BaseModel):
 def root():
     return {"message": "Web Research Agent API is running"}
 
+@app.get("/stats", summary="Cache, coalescing, rate limiting, provider health, scraping and LLM cache statistics")
+def stats():
+    return {
+        "cache": cache_stats(),
+        "coalescing": coalescing_stats(),
+        "rate_limits": rate_limit_stats(),
+        "providers": resilience_stats(),
+        "browser_pool": browser_pool_stats(),
+        "page_cache": page_cache_stats(),
+        "prefetch": prefetch_stats(),
+        "llm_cache": llm_cache_stats(),
+        "structured_output": structured_output_stats(),
+        "tracing": tracing_stats(),
+        "cassette": cassette_stats()
+    }
+
+@app.get("/metrics", summary="Prometheus metrics for node and external call latency")
+def metrics():
+    payload = metrics_payload()
+    if payload is None:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    content, content_type = payload
+    return Response(content=content, media_type=content_type)
+
+def _require_profiling():
+    if not config.API_PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set API_PROFILING_ENABLED=true)")
+
 @app.post("/research", response_model=ResearchResponse, summary="Run research agent")
-def run_research(req: ResearchRequest):
+def run_research(req: ResearchRequest, response: Response, x_profile: Optional[str] = Header(default=None)):
     """
     Run the web research agent on the given query and return the final report.
+
+    Send `X-Profile: true` to profile the run per graph node; the profile id
+    is returned in the `X-Profile-Id` header and served under /profiles.
     """
+    profile = (x_profile or "").lower() in ("1", "true", "yes")
+    if profile:
+        _require_profiling()
     try:
-        result = run_web_research_agent(req.query)
+        if profile:
+            with profile_run(req.query) as run:
+                result = run_web_research_agent(req.query, req.run_options())
+            run.save()
+            response.headers["X-Profile-Id"] = run.id
+        else:
+            result = run_web_research_agent(req.query, req.run_options())
         report = result.get("final_report", "")
         return ResearchResponse(query=req.query, report=report)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
+
+@app.get("/profiles/{profile_id}", summary="Wall vs CPU time and top functions per node for a profiled run")
+def get_profile(profile_id: str):
+    _require_profiling()
+    content = load_profile_file(profile_id, "summary.json")
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=content, media_type="application/json")
+
+@app.get("/profiles/{profile_id}/stacks.folded", summary="Sampled stacks of a profiled run in folded flamegraph format")
+def get_profile_stacks(profile_id: str):
+    _require_profiling()
+    content = load_profile_file(profile_id, "stacks.folded")
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=content, media_type="text/plain")
     
 
 # Run the API
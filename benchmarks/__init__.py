@@ -0,0 +1 @@
+"""Offline end-to-end benchmarks against local stand-ins for the external providers."""
@@ -0,0 +1,97 @@
+"""
+Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--fail-above 10]
+
+Prints end-to-end, per-node and per-external-call latency side by side for
+every mode and pass present in both files. With --fail-above, exits 1 when
+any end-to-end p50/p95 or throughput regresses by more than that percentage.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old * 100
+
+
+def _row(label: str, old: Optional[float], new: Optional[float], unit: str = "s") -> str:
+    def fmt(value):
+        return "-" if value is None else f"{value:.3f}{unit}"
+
+    change = _change(old, new)
+    delta = "" if change is None else f"{change:+.1f}%"
+    return f"  {label:<52} {fmt(old):>12} {fmt(new):>12} {delta:>9}"
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Return report lines and the end-to-end metrics with their percentage change."""
+    lines = [f"baseline  {baseline.get('commit') or 'unknown'} ({baseline['settings']['profile']})",
+             f"candidate {candidate.get('commit') or 'unknown'} ({candidate['settings']['profile']})"]
+    headline = []
+    for mode, old_passes in baseline.get("modes", {}).items():
+        new_passes = {p["pass"]: p for p in candidate.get("modes", {}).get(mode, [])}
+        for old in old_passes:
+            new = new_passes.get(old["pass"])
+            if new is None:
+                continue
+            lines.append(f"\n{mode} pass {old['pass']}")
+            for metric in ("p50", "p95"):
+                headline.append({"metric": f"{mode}/{old['pass']} {metric}", "higher_is_better": False,
+                                 "change": _change(old["latency"].get(metric), new["latency"].get(metric))})
+                lines.append(_row(f"end-to-end {metric}", old["latency"].get(metric), new["latency"].get(metric)))
+            headline.append({"metric": f"{mode}/{old['pass']} throughput", "higher_is_better": True,
+                             "change": _change(old["throughput_qps"], new["throughput_qps"])})
+            lines.append(_row("throughput", old["throughput_qps"], new["throughput_qps"], " q/s"))
+            lines.append(_row("errors", old["errors"], new["errors"], ""))
+            if old.get("peak_python_bytes") and new.get("peak_python_bytes"):
+                lines.append(_row("peak Python heap", old["peak_python_bytes"] / 2**20,
+                                  new["peak_python_bytes"] / 2**20, " MiB"))
+            for section, prefix in (("nodes", "node"), ("external", "call")):
+                for name in sorted(set(old.get(section, {})) | set(new.get(section, {}))):
+                    before = old.get(section, {}).get(name, {})
+                    after = new.get(section, {}).get(name, {})
+                    lines.append(_row(f"{prefix} {name} p95",
+                                      before.get("p95"), after.get("p95")))
+    if baseline.get("peak_rss_bytes") and candidate.get("peak_rss_bytes"):
+        lines.append("")
+        lines.append(_row("peak RSS", baseline["peak_rss_bytes"] / 2**20, candidate["peak_rss_bytes"] / 2**20, " MiB"))
+    return lines, headline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--fail-above", type=float,
+                        help="Exit 1 if end-to-end latency or throughput regresses by more than this percentage")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    lines, headline = compare(baseline, candidate)
+    print("\n".join(lines))
+
+    if args.fail_above is None:
+        return 0
+    regressions = [
+        m["metric"] for m in headline if m["change"] is not None
+        and (-m["change"] if m["higher_is_better"] else m["change"]) > args.fail_above
+    ]
+    if regressions:
+        print(f"\nRegressed by more than {args.fail_above}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Run the research agent end to end against local stub providers and record latency.
+
+Usage:
+    python -m benchmarks.run --profile realistic --modes agent api --repeat 2
+
+Each mode runs the query corpus through `agent.run_web_research_agent`
+("agent") or a local uvicorn server's POST /research ("api"). Every pass
+reports end-to-end latency percentiles, throughput, per-node and
+per-external-call latency (from tracing.py) and peak memory. Caches live in
+a temporary directory, so the first pass is cold and later passes are warm.
+With --replay, provider calls are answered from a cassette recorded by
+`main.py --record` instead of the stubs (see cassette.py).
+Results are written as JSON; compare two runs with `python -m benchmarks.compare`.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.stubs import PROFILES, Stubs
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_VERSION = 1
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank summary of latency samples in seconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(pct):
+        return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+    return {
+        "min": ordered[0], "p50": rank(50), "p95": rank(95), "p99": rank(99),
+        "max": ordered[-1], "mean": sum(ordered) / len(ordered),
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=BENCHMARK_DIR, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, cwd=BENCHMARK_DIR).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def configure_agent(stubs: Stubs, cache_dir: str, args):
+    """Point every provider at the stubs (or a cassette) and keep caches out of the working tree."""
+    for key in ("GOOGLE_API_KEY", "TAVILY_API_KEY", "NEWS_API_KEY"):
+        os.environ[key] = "benchmark"
+    import config
+    import providers
+
+    for name, value in stubs.endpoints().items():
+        setattr(config, name, value)
+    config.CACHE_PATH = os.path.join(cache_dir, "research_cache.sqlite3")
+    if args.replay:
+        config.CASSETTE_MODE = "replay"
+        config.CASSETTE_PATH = args.replay
+        config.CASSETTE_TIME_SCALE = args.time_scale
+    providers.reset()
+
+
+def agent_runner() -> Callable[[str], bool]:
+    from agent import run_web_research_agent
+
+    def run(query: str) -> bool:
+        result = run_web_research_agent(query)
+        return not result.get("final_report", "").startswith("Error")
+    return run
+
+
+class APIServer:
+    """The FastAPI app served by uvicorn on an ephemeral localhost port."""
+
+    def __init__(self):
+        import uvicorn
+        from api import app
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="benchmark-api", daemon=True)
+
+    def __enter__(self) -> "APIServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("API server failed to start")
+            time.sleep(0.05)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+    def runner(self) -> Callable[[str], bool]:
+        import requests
+
+        session = requests.Session()
+
+        def run(query: str) -> bool:
+            response = session.post(f"{self.url}/research", json={"query": query}, timeout=600)
+            return response.status_code == 200 and not response.json().get("report", "").startswith("Error")
+        return run
+
+
+def run_pass(run: Callable[[str], bool], corpus: List[str], concurrency: int, trace_memory: bool) -> Dict[str, Any]:
+    """Run the corpus once and summarise latency, throughput, stages and memory."""
+    from tracing import reset_tracing_stats, tracing_stats
+
+    reset_tracing_stats()
+    if trace_memory:
+        tracemalloc.start()
+
+    def timed(query):
+        start = time.perf_counter()
+        try:
+            ok = run(query)
+        except Exception as e:
+            logger.error(f"Benchmark query failed: {query}: {e}")
+            ok = False
+        return {"query": query, "seconds": time.perf_counter() - start, "ok": ok}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        queries = list(executor.map(timed, corpus))
+    wall = time.perf_counter() - start
+
+    peak_python = None
+    if trace_memory:
+        peak_python = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stages = tracing_stats()
+    return {
+        "wall_seconds": wall,
+        "throughput_qps": len(queries) / wall if wall else None,
+        "errors": sum(1 for q in queries if not q["ok"]),
+        "latency": percentiles([q["seconds"] for q in queries]),
+        "nodes": {key.split(":", 1)[1]: value for key, value in stages.items() if key.startswith("node:")},
+        "external": {key.split(":", 1)[1]: value for key, value in stages.items() if key.startswith("external:")},
+        "peak_python_bytes": peak_python,
+        "queries": queries,
+    }
+
+
+def run_mode(mode: str, runner: Callable[[str], bool], corpus: List[str], args) -> List[Dict[str, Any]]:
+    passes = []
+    for number in range(1, args.repeat + 1):
+        print(f"{mode}: pass {number}/{args.repeat} over {len(corpus)} queries", file=sys.stderr)
+        result = run_pass(runner, corpus, args.concurrency, not args.no_tracemalloc)
+        result["pass"] = number
+        passes.append(result)
+        latency = result["latency"]
+        print(f"{mode}: pass {number} p50={latency['p50']:.2f}s p95={latency['p95']:.2f}s "
+              f"throughput={result['throughput_qps']:.3f} q/s errors={result['errors']}", file=sys.stderr)
+    return passes
+
+
+def settings_snapshot(args) -> Dict[str, Any]:
+    import config
+
+    return {
+        "profile": args.profile,
+        "modes": args.modes,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "corpus": os.path.relpath(args.corpus),
+        "replay": args.replay,
+        "time_scale": args.time_scale if args.replay else None,
+        "tracemalloc": not args.no_tracemalloc,
+        "fused_planning": config.FUSED_PLANNING,
+        "planner_mode": config.PLANNER_MODE,
+        "synthesis_mode": config.SYNTHESIS_MODE,
+        "speculative_prefetch": config.SPECULATIVE_PREFETCH,
+        "news_disabled": config.DISABLE_NEWS_SEARCH,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the research agent")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic",
+                        help="Latency and error distribution of the stub providers")
+    parser.add_argument("--modes", nargs="+", choices=["agent", "api"], default=["agent", "api"])
+    parser.add_argument("--corpus", default=os.path.join(BENCHMARK_DIR, "corpus.json"),
+                        help="JSON list of research queries")
+    parser.add_argument("--limit", type=int, help="Only run the first N queries of the corpus")
+    parser.add_argument("--concurrency", type=int, default=1, help="Queries run at the same time")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus; later passes hit warm caches")
+    parser.add_argument("--replay", metavar="CASSETTE",
+                        help="Serve provider calls from a recorded cassette instead of the stubs")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Multiplier for recorded call durations when replaying (0 replays instantly)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for stub latency and error draws")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip Python heap tracking (it slows allocation-heavy code)")
+    parser.add_argument("-o", "--output", help="Results file (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the agent's INFO logging")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)[:args.limit]
+
+    started = datetime.now(timezone.utc)
+    with Stubs(args.profile, seed=args.seed) as stubs, tempfile.TemporaryDirectory() as cache_dir:
+        configure_agent(stubs, cache_dir, args)
+        modes = {}
+        if "agent" in args.modes:
+            modes["agent"] = run_mode("agent", agent_runner(), corpus, args)
+        if "api" in args.modes:
+            with APIServer() as server:
+                modes["api"] = run_mode("api", server.runner(), corpus, args)
+        stub_stats = stubs.stats()
+        from cassette import cassette_stats
+        replay_stats = cassette_stats()
+
+    results = {
+        "version": RESULTS_VERSION,
+        **git_revision(),
+        "started_at": started.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings_snapshot(args),
+        "modes": modes,
+        "stubs": stub_stats,
+        "cassette": replay_stats,
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+    }
+
+    output = args.output
+    if not output:
+        name = f"{(results['commit'] or 'unknown')[:10]}-{started.strftime('%Y%m%dT%H%M%S')}.json"
+        output = os.path.join(BENCHMARK_DIR, "results", name)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
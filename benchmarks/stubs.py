@@ -0,0 +1,324 @@
+"""Local stand-ins for Tavily, NewsAPI, Gemini and the scraped websites."""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+# Latency (median seconds and log-normal spread) and failure rates per provider.
+# "errors" answer 500 and "throttles" answer 429 with Retry-After.
+PROFILES = {
+    "instant": {
+        "tavily": {"latency": 0.0}, "newsapi": {"latency": 0.0},
+        "gemini": {"latency": 0.0}, "site": {"latency": 0.0},
+    },
+    "realistic": {
+        "tavily": {"latency": 0.8, "spread": 0.3},
+        "newsapi": {"latency": 0.4, "spread": 0.3},
+        "gemini": {"latency": 2.5, "spread": 0.5},
+        "site": {"latency": 0.3, "spread": 0.6},
+    },
+    "degraded": {
+        "tavily": {"latency": 1.5, "spread": 0.6, "errors": 0.05, "throttles": 0.05},
+        "newsapi": {"latency": 1.0, "spread": 0.6, "errors": 0.1},
+        "gemini": {"latency": 4.0, "spread": 0.7, "errors": 0.03, "throttles": 0.1},
+        "site": {"latency": 0.8, "spread": 1.0, "errors": 0.1},
+    },
+}
+
+
+class StubProfile:
+    """Latency and failure distribution of one stub provider."""
+
+    def __init__(self, latency: float = 0.0, spread: float = 0.0, errors: float = 0.0,
+                 throttles: float = 0.0, retry_after: float = 0.5, seed: int = 0):
+        self.latency = latency
+        self.spread = spread
+        self.errors = errors
+        self.throttles = throttles
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Return (delay in seconds, forced HTTP status or None) for one request."""
+        with self._lock:
+            delay = self.latency * self._random.lognormvariate(0, self.spread) if self.latency else 0.0
+            roll = self._random.random()
+        if roll < self.errors:
+            return delay, 500
+        if roll < self.errors + self.throttles:
+            return delay, 429
+        return delay, None
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)
+
+
+class StubServer:
+    """A threaded HTTP server on an ephemeral localhost port that answers with handle()."""
+
+    name = "stub"
+
+    def __init__(self, profile: StubProfile):
+        self.profile = profile
+        self.requests = 0
+        self.failures = 0
+        self._counter_lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, content_type, payload, headers = stub._respond(self.command, self.path, body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(payload)
+
+            do_GET = do_POST = do_HEAD = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name=f"{self.name}-stub", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _respond(self, method: str, path: str, body: bytes):
+        delay, forced_status = self.profile.draw()
+        if delay:
+            time.sleep(delay)
+        with self._counter_lock:
+            self.requests += 1
+            if forced_status:
+                self.failures += 1
+        if forced_status == 429:
+            return 429, "application/json", b'{"error": "rate limited"}', {"Retry-After": str(self.profile.retry_after)}
+        if forced_status:
+            return forced_status, "application/json", b'{"error": "stub failure"}', {}
+        return self.handle(method, path, body)
+
+    def handle(self, method: str, path: str, body: bytes):
+        """Return (status, content type, payload bytes, extra headers)."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "failures": self.failures}
+
+
+def _json(data: Any):
+    return 200, "application/json", json.dumps(data).encode(), {}
+
+
+class StaticSite(StubServer):
+    """Deterministic article pages, one per path, for Crawl4AI to render."""
+
+    name = "site"
+    paragraphs = 12
+
+    def page_url(self, query: str, index: int) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:60] or "page"
+        return f"{self.url}/articles/{slug}-{index}.html"
+
+    def handle(self, method, path, body):
+        path = urlparse(path).path
+        if not path.startswith("/articles/"):
+            return 404, "text/html", b"<html><body>Not found</body></html>", {}
+        topic = path.rsplit("/", 1)[-1].rsplit(".", 1)[0].replace("-", " ")
+        rng = random.Random(_digest(path))
+        sentences = [
+            f"Researchers studying {topic} reported a {rng.randint(5, 60)}% change over {rng.randint(2, 10)} years.",
+            f"Independent reviews of {topic} highlight trade-offs between cost, reliability and adoption.",
+            f"In {rng.randint(2015, 2025)} several groups published comparisons of approaches to {topic}.",
+            f"Critics argue that claims about {topic} depend heavily on the evaluation method used.",
+        ]
+        paragraphs = "".join(
+            f"<p>{' '.join(rng.choice(sentences) for _ in range(5))}</p>" for _ in range(self.paragraphs)
+        )
+        html = (f"<html><head><title>{topic.title()}</title></head><body><article>"
+                f"<h1>{topic.title()}</h1>{paragraphs}</article></body></html>")
+        return 200, "text/html; charset=utf-8", html.encode(), {
+            "ETag": f'"{_digest(html):x}"', "Cache-Control": "max-age=3600"
+        }
+
+
+class TavilyStub(StubServer):
+    """POST /search answering in Tavily's result format with links into the static site."""
+
+    name = "tavily"
+
+    def __init__(self, profile: StubProfile, site: StaticSite):
+        super().__init__(profile)
+        self.site = site
+
+    def handle(self, method, path, body):
+        request = json.loads(body or b"{}")
+        query = request.get("query", "")
+        results = [{
+            "url": self.site.page_url(query, i),
+            "title": f"{query} - result {i + 1}",
+            "content": f"Overview of {query}: findings, comparisons and open questions (source {i + 1}).",
+            "score": round(1 - i / 20, 3),
+        } for i in range(min(int(request.get("max_results", 5)), 10))]
+        return _json({"query": query, "results": results})
+
+
+class NewsAPIStub(StubServer):
+    """GET /v2/everything answering in NewsAPI's article format."""
+
+    name = "newsapi"
+
+    def __init__(self, profile: StubProfile, site: StaticSite):
+        super().__init__(profile)
+        self.site = site
+
+    def handle(self, method, path, body):
+        params = parse_qs(urlparse(path).query)
+        query = params.get("q", [""])[0]
+        size = int(params.get("pageSize", ["5"])[0])
+        articles = [{
+            "url": self.site.page_url(f"news {query}", i),
+            "title": f"News: {query} ({i + 1})",
+            "description": f"Recent coverage of {query}.",
+            "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - i * 86400)),
+            "source": {"name": f"Stub Wire {i + 1}"},
+        } for i in range(min(size, 5))]
+        return _json({"status": "ok", "totalResults": len(articles), "articles": articles})
+
+
+class GeminiStub(StubServer):
+    """
+    generateContent endpoint returning responses shaped like the request asks.
+
+    Requests with a response JSON schema get a small instance of that schema;
+    URL fields are filled with the static site links found in the prompt so
+    the evaluator selects real pages. Other requests get a markdown report.
+    """
+
+    name = "gemini"
+
+    def __init__(self, profile: StubProfile, site: StaticSite):
+        super().__init__(profile)
+        self.site = site
+
+    def handle(self, method, path, body):
+        request = json.loads(body or b"{}")
+        prompt = " ".join(
+            part.get("text", "") for content in request.get("contents", []) for part in content.get("parts", [])
+        )
+        generation = request.get("generationConfig", {})
+        schema = generation.get("responseJsonSchema") or generation.get("responseSchema")
+        if schema:
+            context = {
+                "urls": list(dict.fromkeys(re.findall(re.escape(self.site.url) + r"[^\s\"'\\,)]+", prompt))),
+                "topic": _topic(prompt),
+            }
+            text = json.dumps(_instance(schema, schema, context, ""))
+        else:
+            text = _report(prompt)
+        words = len(prompt.split())
+        return _json({
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": words, "candidatesTokenCount": len(text.split()),
+                              "totalTokenCount": words + len(text.split())},
+        })
+
+
+def _topic(prompt: str) -> str:
+    match = re.search(r"\bQUERY\s*:\s*(.+)", prompt, re.IGNORECASE)
+    return match.group(1).strip()[:80] if match else "research topic"
+
+
+def _instance(schema: Dict[str, Any], root: Dict[str, Any], context: Dict[str, Any], name: str) -> Any:
+    """Build a small value conforming to a JSON schema (as produced by pydantic)."""
+    if "$ref" in schema:
+        ref = schema["$ref"].rsplit("/", 1)[-1]
+        return _instance(root.get("$defs", {}).get(ref, {}), root, context, name)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return _instance(options[0], root, context, name)
+    if "enum" in schema:
+        return schema["enum"][-1] if name == "search_approach" else schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {key: _instance(sub, root, context, key) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        if "url" in name:
+            return context["urls"][:3]
+        items = [_instance(schema.get("items", {}), root, context, name) for _ in range(3)]
+        return [f"{item} {i + 1}" if isinstance(item, str) else item for i, item in enumerate(items)]
+    if kind == "boolean":
+        return name == "requires_web_scraping"
+    if kind in ("number", "integer"):
+        return 0.8
+    if name == "url":
+        return context["urls"][0] if context["urls"] else ""
+    if name in ("confidence", "overall"):
+        return "medium"
+    return f"{context['topic']} {name.replace('_', ' ')}".strip()
+
+
+def _report(prompt: str) -> str:
+    return (f"# {_topic(prompt)}\n\n## Summary\n\nStub report generated for benchmarking.\n\n"
+            "## Key findings\n\n- Finding one [1]\n- Finding two [2]\n\n## Sources\n\n[1] Stub source\n[2] Stub source\n")
+
+
+class Stubs:
+    """All stand-in providers, started together from a named profile."""
+
+    def __init__(self, profile: str = "instant", seed: int = 0):
+        settings = PROFILES[profile]
+        self.profile = profile
+        self.site = StaticSite(StubProfile(seed=seed, **settings["site"]))
+        self.tavily = TavilyStub(StubProfile(seed=seed + 1, **settings["tavily"]), self.site)
+        self.newsapi = NewsAPIStub(StubProfile(seed=seed + 2, **settings["newsapi"]), self.site)
+        self.gemini = GeminiStub(StubProfile(seed=seed + 3, **settings["gemini"]), self.site)
+        self.servers = [self.site, self.tavily, self.newsapi, self.gemini]
+
+    def __enter__(self) -> "Stubs":
+        for server in self.servers:
+            server.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for server in self.servers:
+            server.stop()
+
+    def endpoints(self) -> Dict[str, str]:
+        """Config overrides pointing the agent at these stubs."""
+        return {
+            "TAVILY_SEARCH_URL": f"{self.tavily.url}/search",
+            "NEWS_API_URL": f"{self.newsapi.url}/v2/everything",
+            "GEMINI_BASE_URL": self.gemini.url,
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {server.name: server.stats() for server in self.servers}
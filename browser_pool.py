@@ -0,0 +1,286 @@
+"""Pool of warm Crawl4AI browsers shared across research runs."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import config
+from cassette import wrap_crawler_factory
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is skipped without psutil
+    psutil = None
+
+
+def _default_crawler_factory():
+    from crawl4ai import AsyncWebCrawler
+    return AsyncWebCrawler()
+
+
+def _browser_rss_mb() -> Optional[float]:
+    """Resident memory of this process's child processes (the browsers) in MB."""
+    if psutil is None:
+        return None
+    try:
+        children = psutil.Process().children(recursive=True)
+        return sum(child.memory_info().rss for child in children) / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+def _child_pids() -> Optional[Set[int]]:
+    if psutil is None:
+        return None
+    try:
+        return {child.pid for child in psutil.Process().children(recursive=True)}
+    except psutil.Error:
+        return None
+
+
+def _new_process_roots(before: Optional[Set[int]], after: Optional[Set[int]]) -> List[int]:
+    """Processes started between two snapshots whose parent was not started in between too."""
+    if before is None or after is None:
+        return []
+    started = after - before
+    roots = []
+    for pid in started:
+        try:
+            if psutil.Process(pid).ppid() not in started:
+                roots.append(pid)
+        except psutil.Error:
+            continue
+    return roots
+
+
+def _process_tree_rss_mb(roots: List[int]) -> Optional[float]:
+    """Resident memory of the given processes and all their descendants in MB."""
+    if psutil is None or not roots:
+        return None
+    total = 0
+    for pid in roots:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:  # the browser has exited
+            continue
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+    return total / (1024 * 1024)
+
+
+class _PooledCrawler:
+    def __init__(self, crawler: Any, process_roots: List[int]):
+        self.crawler = crawler
+        self.uses = 0
+        self.created_at = time.monotonic()
+        # The processes this crawler started (its browser and driver), measured apart from other crawlers
+        self.process_roots = process_roots
+        self.baseline_rss = _process_tree_rss_mb(process_roots)
+
+    def rss_mb(self) -> Optional[float]:
+        return _process_tree_rss_mb(self.process_roots)
+
+
+class BrowserPool:
+    """
+    Long-lived pool of started crawlers owned by a dedicated event loop thread.
+
+    Crawlers are created lazily up to `size` (or all at once by `warm`) and
+    leased to one scrape at a time. A crawler is closed and replaced after
+    `max_uses` leases, or when the memory of its own browser processes has
+    grown by more than `max_memory_growth_mb` since it was started. Browsers
+    are launched one at a time when psutil is available, so the processes
+    each crawler starts can be told apart. Synchronous callers submit
+    coroutines with `run`, so no event loop is created per scrape.
+    """
+
+    def __init__(self, size: int, max_uses: int, max_memory_growth_mb: float,
+                 crawler_factory: Callable[[], Any] = _default_crawler_factory):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.crawler_factory = crawler_factory
+        self.leases = 0
+        self.recycled = 0
+        self.waiting = 0
+        self._idle = deque()
+        self._created = 0
+        self._in_use = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Start the pool's event loop thread if it is not running yet."""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._cond = asyncio.Condition()
+            self._launch_lock = asyncio.Lock()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+            self._thread.start()
+
+    def submit(self, coro_fn: Callable[[], Awaitable[Any]]) -> Future:
+        """Schedule coro_fn() on the pool's event loop without waiting; cancelling the future cancels it."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro_fn(), self._loop)
+
+    def run(self, coro_fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """Run coro_fn() on the pool's event loop and block until it completes."""
+        return self.submit(coro_fn).result(timeout)
+
+    def warm(self):
+        """Start every crawler up front so the first scrape does not pay browser startup."""
+        async def fill():
+            while self._created < self.size:
+                self._created += 1
+                try:
+                    self._idle.append(await self._open())
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        logger.info(f"Warming browser pool with {self.size} crawlers")
+        self.run(fill)
+
+    async def _open(self) -> _PooledCrawler:
+        if psutil is None:
+            crawler = self.crawler_factory()
+            await crawler.__aenter__()
+            return _PooledCrawler(crawler, [])
+        async with self._launch_lock:
+            before = _child_pids()
+            crawler = self.crawler_factory()
+            await crawler.__aenter__()
+            return _PooledCrawler(crawler, _new_process_roots(before, _child_pids()))
+
+    async def _close(self, entry: _PooledCrawler):
+        try:
+            await entry.crawler.__aexit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error closing pooled crawler: {str(e)}")
+
+    def _should_recycle(self, entry: _PooledCrawler) -> bool:
+        if entry.uses >= self.max_uses:
+            return True
+        current_rss = entry.rss_mb()
+        if current_rss is None or entry.baseline_rss is None:
+            return False
+        return current_rss - entry.baseline_rss > self.max_memory_growth_mb
+
+    @asynccontextmanager
+    async def lease(self):
+        """Lease a started crawler for one scrape. Must be used on the pool's event loop."""
+        async with self._cond:
+            self.waiting += 1
+            while not self._idle and self._created >= self.size:
+                await self._cond.wait()
+            self.waiting -= 1
+            entry = self._idle.popleft() if self._idle else None
+            if entry is None:
+                self._created += 1
+        if entry is None:
+            try:
+                entry = await self._open()
+            except Exception:
+                async with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+        self._in_use += 1
+        self.leases += 1
+        try:
+            yield entry.crawler
+        finally:
+            entry.uses += 1
+            self._in_use -= 1
+            if self._should_recycle(entry):
+                logger.info(f"Recycling pooled crawler after {entry.uses} uses")
+                await self._close(entry)
+                self.recycled += 1
+                async with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+            else:
+                async with self._cond:
+                    self._idle.append(entry)
+                    self._cond.notify()
+
+    def close(self):
+        """Close every idle crawler and stop the event loop thread."""
+        if self._loop is None:
+            return
+
+        async def drain():
+            while self._idle:
+                await self._close(self._idle.popleft())
+                self._created -= 1
+
+        try:
+            self.run(drain, timeout=30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "browsers": self._created,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "waiting": self.waiting,
+            "utilization": self._in_use / self.size if self.size else 0.0,
+            "leases": self.leases,
+            "recycled": self.recycled,
+            "browser_rss_mb": _browser_rss_mb(),
+        }
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=config.BROWSER_POOL_SIZE,
+                max_uses=config.BROWSER_MAX_USES,
+                max_memory_growth_mb=config.BROWSER_MAX_MEMORY_GROWTH_MB,
+                crawler_factory=wrap_crawler_factory(_default_crawler_factory)
+            )
+            _pool.start()
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Close the process-wide browser pool if one was created."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def browser_pool_stats() -> Optional[Dict[str, Any]]:
+    """Return utilization of the process-wide pool, or None if it has not been created."""
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else None
@@ -0,0 +1,243 @@
+"""Persistent caching for the Web Research Agent."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def make_cache_key(**parts: Any) -> str:
+    """Build a stable cache key from keyword arguments."""
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    """
+    SQLite-backed key/value cache with per-entry TTL and size-bounded eviction.
+
+    Entries are stored as JSON in a single database file. Several caches can
+    share one file through different namespaces, and several processes on the
+    same host can share it too (the database runs in WAL mode). Hit and miss
+    counters are kept per process.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int,
+                 path: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path or config.CACHE_PATH
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (namespace, accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self._count(hit=False)
+                return None
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            self._count(hit=True)
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed for {self.namespace}: {str(e)}")
+            self._count(hit=False)
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store value under key and evict the least recently used entries over the size bound."""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), now + ttl, now)
+            )
+            self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed for {self.namespace}: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at ASC LIMIT ?)",
+                (self.namespace, self.namespace, overflow)
+            )
+
+    def clear(self):
+        """Remove every entry in this namespace and reset the counters."""
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache clear failed for {self.namespace}: {str(e)}")
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current number of stored entries."""
+        try:
+            (entries,) = self._connection().execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        except sqlite3.Error:
+            entries = None
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+class MemoryLRUCache:
+    """
+    In-process LRU cache with per-entry TTL.
+
+    Has the same get/set/clear/stats interface as PersistentCache so the two
+    can be stacked as cache tiers.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[1] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses, entries = self.hits, self.misses, len(self._entries)
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0, "entries": entries}
+
+
+_caches: Dict[str, PersistentCache] = {}
+_memory_caches: Dict[str, MemoryLRUCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl: float, max_entries: int) -> PersistentCache:
+    """Return the process-wide cache for a namespace, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = PersistentCache(namespace, ttl=ttl, max_entries=max_entries)
+            _caches[namespace] = cache
+        return cache
+
+
+def get_memory_cache(namespace: str, ttl: float, max_entries: int) -> MemoryLRUCache:
+    """Return the process-wide in-memory cache for a namespace, creating it on first use."""
+    with _caches_lock:
+        cache = _memory_caches.get(namespace)
+        if cache is None:
+            cache = MemoryLRUCache(namespace, ttl=ttl, max_entries=max_entries)
+            _memory_caches[namespace] = cache
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return statistics for every cache created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+        memory_caches = list(_memory_caches.values())
+    stats = {cache.namespace: cache.stats() for cache in caches}
+    stats.update({f"{cache.namespace}:memory": cache.stats() for cache in memory_caches})
+    return stats
@@ -0,0 +1,338 @@
+"""Record and replay of provider interactions for deterministic offline runs."""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from langchain_core.messages import AIMessage
+from requests.structures import CaseInsensitiveDict
+
+import config
+from cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept in a cassette; the rest are not read by the agent
+_KEPT_HEADERS = ("content-type", "retry-after", "etag", "last-modified", "cache-control", "expires")
+# Request parameters left out of interaction keys: credentials, and the date window
+# NewsAPI queries are anchored to, so a cassette replays on a later day
+_UNKEYED_PARAMS = ("apiKey", "api_key", "key", "from", "to")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when the cassette has no recording of a request."""
+
+    def __init__(self, kind: str, key: str):
+        super().__init__(f"No recorded {kind} interaction for key {key[:12]}")
+        self.kind = kind
+
+
+class RecordedError(RuntimeError):
+    """A provider error replayed from a cassette, carrying the original message."""
+
+
+class Cassette:
+    """
+    Compact on-disk log of provider interactions: gzip-compressed JSON lines.
+
+    Each line holds the interaction kind ("tavily", "newsapi", "gemini",
+    "crawl4ai", "extraction"), a key derived from the request, how long the
+    call took, and the response or error. In "record" mode interactions are
+    appended as they complete, so an interrupted run keeps what it recorded.
+    In "replay" mode requests are answered from the file after waiting the
+    recorded duration times `time_scale` (0 replays instantly). A key seen
+    several times replays its recordings in order, then repeats the last.
+    """
+
+    def __init__(self, path: str, mode: str, time_scale: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.time_scale = time_scale
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._interactions: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._positions: Dict[tuple, int] = {}
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with gzip.open(path, "wt", encoding="utf-8"):
+                pass
+        else:
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._interactions.setdefault((interaction["kind"], interaction["key"]), []).append(interaction)
+        logger.info(f"Loaded {sum(len(v) for v in self._interactions.values())} interactions from {self.path}")
+
+    def record(self, kind: str, key: str, elapsed: float, response: Any = None, error: Optional[str] = None):
+        interaction = {"kind": kind, "key": key, "elapsed": round(elapsed, 4)}
+        if error is not None:
+            interaction["error"] = error
+        else:
+            interaction["response"] = response
+        line = json.dumps(interaction, separators=(",", ":")) + "\n"
+        with self._lock:
+            # Every append is its own gzip member; gzip readers concatenate them
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+            self.recorded += 1
+
+    def lookup(self, kind: str, key: str) -> Dict[str, Any]:
+        """Return the next recorded interaction for the key, or raise CassetteMissError."""
+        with self._lock:
+            recordings = self._interactions.get((kind, key))
+            if not recordings:
+                self.misses += 1
+                raise CassetteMissError(kind, key)
+            position = self._positions.get((kind, key), 0)
+            self._positions[(kind, key)] = position + 1
+            self.replayed += 1
+            return recordings[min(position, len(recordings) - 1)]
+
+    def delay(self, interaction: Dict[str, Any]) -> float:
+        return interaction["elapsed"] * self.time_scale
+
+    def replay(self, kind: str, key: str) -> Dict[str, Any]:
+        """Look up an interaction and wait out its scaled duration."""
+        interaction = self.lookup(kind, key)
+        if self.delay(interaction) > 0:
+            time.sleep(self.delay(interaction))
+        return interaction
+
+    async def replay_async(self, kind: str, key: str) -> Dict[str, Any]:
+        interaction = self.lookup(kind, key)
+        if self.delay(interaction) > 0:
+            await asyncio.sleep(self.delay(interaction))
+        return interaction
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "path": self.path, "time_scale": self.time_scale,
+                "recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette for config.CASSETTE_MODE, or None when it is "off"."""
+    global _cassette
+    if config.CASSETTE_MODE == "off":
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(config.CASSETTE_PATH, config.CASSETTE_MODE, config.CASSETTE_TIME_SCALE)
+            logger.info(f"Cassette {config.CASSETTE_MODE} mode using {config.CASSETTE_PATH}")
+        return _cassette
+
+
+def reset_cassette():
+    """Forget the process-wide cassette so the next get_cassette() reads the config again."""
+    global _cassette
+    with _cassette_lock:
+        _cassette = None
+
+
+def cassette_stats() -> Optional[Dict[str, Any]]:
+    """Return record/replay counters, or None when no cassette is in use."""
+    with _cassette_lock:
+        cassette = _cassette
+    return cassette.stats() if cassette is not None else None
+
+
+class CassetteSession:
+    """
+    requests.Session stand-in for the search tools.
+
+    Keys cover the provider, method, URL path, query parameters (minus API
+    keys) and JSON body. The host is left out unless `include_host` is set,
+    so a cassette recorded against the real search APIs replays against any
+    base URL.
+    """
+
+    def __init__(self, session: requests.Session, provider: str, cassette: Cassette,
+                 include_host: bool = False):
+        self.session = session
+        self.provider = provider
+        self.cassette = cassette
+        self.include_host = include_host
+
+    def _key(self, method: str, url: str, params: Optional[Dict[str, Any]], body: Any) -> str:
+        parsed = urlparse(url)
+        params = {k: v for k, v in (params or {}).items() if k not in _UNKEYED_PARAMS}
+        return make_cache_key(method=method, host=parsed.netloc if self.include_host else None,
+                              path=parsed.path, query=parsed.query, params=params, json=body)
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None, json: Any = None,
+                **kwargs: Any) -> requests.Response:
+        key = self._key(method, url, params, json)
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.replay(self.provider, key)
+            if "error" in interaction:
+                raise requests.exceptions.ConnectionError(interaction["error"])
+            return _build_response(url, interaction["response"])
+
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, params=params, json=json, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.cassette.record(self.provider, key, time.monotonic() - start, error=str(e))
+            raise
+        self.cassette.record(self.provider, key, time.monotonic() - start, response={
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in _KEPT_HEADERS},
+            "body": response.text,
+        })
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+def _build_response(url: str, recorded: Dict[str, Any]) -> requests.Response:
+    response = requests.Response()
+    response.status_code = recorded["status"]
+    response.headers = CaseInsensitiveDict(recorded.get("headers", {}))
+    response._content = recorded["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+class CassetteModel:
+    """Chat model wrapper recording or replaying invoke(); other attributes go to the model."""
+
+    def __init__(self, model: Any, cassette: Cassette):
+        self.wrapped = model
+        self.cassette = cassette
+
+    def invoke(self, prompt: Any, **kwargs: Any) -> Any:
+        key = make_cache_key(
+            model=getattr(self.wrapped, "model", None),
+            temperature=getattr(self.wrapped, "temperature", None),
+            options=sorted(kwargs.items()),
+            prompt=hashlib.sha256(str(prompt).encode("utf-8")).hexdigest(),
+        )
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.replay("gemini", key)
+            if "error" in interaction:
+                raise RecordedError(interaction["error"])
+            return AIMessage(content=interaction["response"])
+
+        start = time.monotonic()
+        try:
+            response = self.wrapped.invoke(prompt, **kwargs)
+        except Exception as e:
+            self.cassette.record("gemini", key, time.monotonic() - start, error=str(e))
+            raise
+        self.cassette.record("gemini", key, time.monotonic() - start, response=response.content)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.wrapped, name)
+
+
+class CassetteCrawler:
+    """Crawl4AI crawler wrapper; in replay mode no browser is started at all."""
+
+    def __init__(self, crawler: Any, cassette: Cassette):
+        self.crawler = crawler
+        self.cassette = cassette
+
+    async def __aenter__(self):
+        if self.crawler is not None:
+            await self.crawler.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.crawler is not None:
+            await self.crawler.__aexit__(*exc_info)
+
+    async def arun(self, url: str, **kwargs: Any) -> Any:
+        if self.cassette.mode == "replay":
+            interaction = await self.cassette.replay_async("crawl4ai", url)
+            if "error" in interaction:
+                raise RecordedError(interaction["error"])
+            return SimpleNamespace(**interaction["response"])
+
+        start = time.monotonic()
+        try:
+            result = await self.crawler.arun(url=url, **kwargs)
+        except Exception as e:
+            self.cassette.record("crawl4ai", url, time.monotonic() - start, error=str(e))
+            raise
+        self.cassette.record("crawl4ai", url, time.monotonic() - start, response={
+            "markdown": str(result.markdown or ""),
+            "response_headers": dict(getattr(result, "response_headers", None) or {}),
+        })
+        return result
+
+
+class CassetteExtraction:
+    """LLMExtractionStrategy wrapper recording or replaying the per-page Gemini extraction."""
+
+    def __init__(self, strategy: Any, cassette: Cassette):
+        self.strategy = strategy
+        self.cassette = cassette
+
+    async def arun(self, url: str, sections: List[str]) -> Any:
+        key = make_cache_key(instruction=getattr(self.strategy, "instruction", None),
+                             sections=hashlib.sha256("\n".join(sections).encode("utf-8")).hexdigest())
+        if self.cassette.mode == "replay":
+            interaction = await self.cassette.replay_async("extraction", key)
+            if "error" in interaction:
+                raise RecordedError(interaction["error"])
+            return interaction["response"]
+
+        start = time.monotonic()
+        try:
+            blocks = await self.strategy.arun(url, sections)
+        except Exception as e:
+            self.cassette.record("extraction", key, time.monotonic() - start, error=str(e))
+            raise
+        self.cassette.record("extraction", key, time.monotonic() - start, response=blocks)
+        return blocks
+
+
+def wrap_session(session: requests.Session, provider: str, include_host: bool = False) -> Any:
+    cassette = get_cassette()
+    return CassetteSession(session, provider, cassette, include_host) if cassette is not None else session
+
+
+def wrap_model(model: Any) -> Any:
+    cassette = get_cassette()
+    return CassetteModel(model, cassette) if cassette is not None else model
+
+
+def wrap_extraction(strategy: Any) -> Any:
+    cassette = get_cassette()
+    return CassetteExtraction(strategy, cassette) if cassette is not None else strategy
+
+
+def wrap_crawler_factory(factory: Callable[[], Any]) -> Callable[[], Any]:
+    """Crawler factory for the browser pool; replay mode never calls the real factory."""
+    cassette = get_cassette()
+    if cassette is None:
+        return factory
+    if cassette.mode == "replay":
+        return lambda: CassetteCrawler(None, cassette)
+    return lambda: CassetteCrawler(factory(), cassette)
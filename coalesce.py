@@ -0,0 +1,158 @@
+"""Single-flight coalescing of duplicate in-flight operations."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight operation: its shared result and the callers waiting for it."""
+
+    def __init__(self):
+        self.future = Future()
+        # Mark as running so a waiting caller can never cancel the shared future
+        self.future.set_running_or_notify_cancel()
+        self.waiters = 1
+        self.task: Optional[asyncio.Task] = None
+
+
+class SingleFlight:
+    """
+    Share one in-flight operation between concurrent callers with the same key.
+
+    The first caller for a key (the leader) runs the operation; callers that
+    arrive while it is running wait for the leader's result instead of
+    repeating the work. Once the operation finishes the key is released, so
+    later calls run again (caching is handled elsewhere).
+
+    Both entry points use a thread-safe future, so a synchronous caller on a
+    worker thread and an async caller on any event loop can share an operation.
+    An async operation runs as its own task: cancelling a caller (including
+    the leader) only detaches that caller, and the operation itself is only
+    cancelled once no caller is waiting for it. Callers still waiting on an
+    operation that was cancelled anyway (its event loop closed) run it again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                call.waiters += 1
+                return call, False
+            call = _Call()
+            self._in_flight[key] = call
+            return call, True
+
+    def _detach(self, call: _Call):
+        """Stop waiting for call; cancel its task if nobody else is waiting."""
+        with self._lock:
+            call.waiters -= 1
+            abandoned = call.waiters == 0 and not call.future.done()
+        if abandoned and call.task is not None:
+            try:
+                call.task.get_loop().call_soon_threadsafe(call.task.cancel)
+            except RuntimeError:  # the task's event loop is already closed
+                pass
+
+    def _finish(self, key: Hashable, call: _Call, result: Any = None, error: BaseException = None):
+        with self._lock:
+            if self._in_flight.get(key) is call:
+                del self._in_flight[key]
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def _finish_task(self, key: Hashable, call: _Call, task: asyncio.Task):
+        if task.cancelled():
+            self._finish(key, call, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, call, error=task.exception())
+        else:
+            self._finish(key, call, result=task.result())
+
+    @staticmethod
+    def _work_cancelled(call: _Call) -> bool:
+        return call.future.done() and isinstance(call.future.exception(), asyncio.CancelledError)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent synchronous callers sharing key."""
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+            logger.debug(f"Coalesced {self.name} call for {key}")
+            try:
+                return call.future.result()
+            except asyncio.CancelledError:
+                if not self._work_cancelled(call):
+                    raise
+                logger.debug(f"Shared {self.name} call for {key} was cancelled, running it again")
+            finally:
+                self._detach(call)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        finally:
+            self._detach(call)
+        self._finish(key, call, result=result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() once for all concurrent callers sharing key, across event loops."""
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                call.task = asyncio.ensure_future(fn())
+                call.task.add_done_callback(lambda task, call=call: self._finish_task(key, call, task))
+            else:
+                logger.debug(f"Coalesced {self.name} call for {key}")
+            try:
+                return await asyncio.wrap_future(call.future)
+            except asyncio.CancelledError:
+                if leader or not self._work_cancelled(call):
+                    raise
+                logger.debug(f"Shared {self.name} call for {key} was cancelled, running it again")
+            finally:
+                self._detach(call)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many calls were made and how many shared another call's result."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Return the process-wide SingleFlight group for name, creating it on first use."""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = SingleFlight(name)
+            _flights[name] = flight
+        return flight
+
+
+def coalescing_stats() -> Dict[str, Dict[str, int]]:
+    """Return statistics for every SingleFlight group in this process."""
+    with _flights_lock:
+        flights = list(_flights.values())
+    return {flight.name: flight.stats() for flight in flights}
@@ -12,19 +12,153 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
 
+# Provider endpoints; overridden to point the agent at local stand-ins (see benchmarks/)
+TAVILY_SEARCH_URL = os.getenv("TAVILY_SEARCH_URL", "https://api.tavily.com/search")
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")  # Empty uses the Gemini API default
+
 # Language model settings
 LLM_MODEL = "gemini-2.0-flash"
 LLM_TEMPERATURE = 0.1
 
+# Ask Gemini for JSON constrained to each node's response schema (see structured.py)
+STRUCTURED_OUTPUT_ENABLED = True
+
+# Profiling of single runs (main.py --profile, or the X-Profile header when enabled)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+API_PROFILING_ENABLED = os.getenv("API_PROFILING_ENABLED", "false").lower() == "true"
+
+# Record/replay of Tavily, NewsAPI, Gemini and Crawl4AI interactions (see cassette.py):
+# "off", "record" or "replay"
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join(".cache", "cassette.jsonl.gz"))
+CASSETTE_TIME_SCALE = float(os.getenv("CASSETTE_TIME_SCALE", "1.0"))  # Replay delay multiplier; 0 replays instantly
+
+# Tracing: per-node and per-external-call latency spans (see tracing.py)
+TRACING_ENABLED = True
+TRACING_WINDOW = 1000  # Recent spans kept per stage for the percentiles in /stats
+OTEL_EXPORTER_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "web-research-agent")
+
+# LLM response cache, keyed on model, temperature and rendered prompt.
+# Nodes not listed here are never cached.
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MEMORY_ENTRIES = 500
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_POLICIES = {
+    "analyze_query": {"enabled": True, "ttl": 7 * 24 * 3600},
+    "plan_research_strategy": {"enabled": True, "ttl": 24 * 3600},
+    "analyze_and_plan": {"enabled": True, "ttl": 24 * 3600},
+    "refine_search_queries": {"enabled": True, "ttl": 3600},
+    "evaluate_results_and_select_urls": {"enabled": True, "ttl": 3600},
+    "extract_and_synthesize_information": {"enabled": True, "ttl": 3600},
+    "summarize_sources": {"enabled": True, "ttl": 24 * 3600},
+    "compile_final_report": {"enabled": True, "ttl": 3600},
+}
+
 # Search and scraping parameters
 MAX_SEARCH_RESULTS = 10
 MAX_NEWS_RESULTS = 5
 MAX_URLS_TO_SCRAPE = 5
 MAX_SEARCH_QUERIES = 5
 
+# Scraping concurrency and time limits (seconds)
+SCRAPE_CONCURRENCY = 3
+SCRAPE_URL_TIMEOUT = 45
+SCRAPE_DEADLINE = 90  # Whatever has finished by then is kept
+
+# Local BM25 passage selection: only the best passages of a page go to the LLM
+PASSAGE_WORDS = 120
+PASSAGES_PER_PAGE = 8
+
+# Synthesis prompt context budget, split across source types
+CONTEXT_TOKEN_BUDGET = 30000
+CONTEXT_BUDGET_SHARES = {"web": 0.25, "news": 0.15, "scraped": 0.6}
+CHARS_PER_TOKEN = 4  # Used to estimate token counts
+
+# Speculatively fetch the top-ranked search results while the evaluator runs (requires the page cache)
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "false").lower() == "true"
+SPECULATIVE_PREFETCH_URLS = 3
+
+# Synthesis: "single" packs every source into one prompt; "map_reduce" summarizes
+# groups of sources concurrently, then merges the per-source key points in one call
+SYNTHESIS_MODE = os.getenv("SYNTHESIS_MODE", "single")
+SYNTHESIS_MAP_GROUP_TOKENS = 6000
+SYNTHESIS_MAP_CONCURRENCY = 4
+
+# Warm browser pool shared by all scrapes in the process
+BROWSER_POOL_SIZE = SCRAPE_CONCURRENCY
+BROWSER_MAX_USES = 50  # Leases before a browser is recycled
+BROWSER_MAX_MEMORY_GROWTH_MB = 512  # Browser memory growth that triggers recycling
+BROWSER_POOL_WARM_ON_STARTUP = True  # Start the browsers when the API starts
+
+# Scraped page cache: pages are served without revalidation for the TTL of
+# their content type, then revalidated with ETag/Last-Modified
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TTLS = {
+    "text/html": 6 * 3600,
+    "application/pdf": 7 * 24 * 3600,
+    "default": 3600,
+}
+PAGE_CACHE_RETENTION = 30 * 24 * 3600  # How long stale pages are kept for revalidation
+EXTRACTION_CACHE_TTL = 7 * 24 * 3600  # Per-query extractions, keyed on page content hash
+PAGE_CACHE_MAX_ENTRIES = 2000
+
+# Use the single-call analyze_and_plan node instead of analyze_query + plan_research_strategy
+FUSED_PLANNING = os.getenv("FUSED_PLANNING", "false").lower() == "true"
+
+# Research planner: "hybrid" plans simple queries with local rules and asks the
+# LLM only below the confidence threshold, "llm" always asks the LLM, and
+# "shadow" always asks the LLM but records what the rules would have chosen.
+PLANNER_MODE = os.getenv("PLANNER_MODE", "hybrid")
+PLANNER_CONFIDENCE_THRESHOLD = 0.7
+
+# Skip news search (parallel plans search the web only)
+DISABLE_NEWS_SEARCH = os.getenv("DISABLE_NEWS_SEARCH", "false").lower() == "true"
+# FUSED_PLANNING, PLANNER_MODE and DISABLE_NEWS_SEARCH are defaults; a run can
+# override them through run_options (see agent.resolve_run_options)
+
 # Retry and iteration limits
 MAX_ITERATIONS = {"search_refinement": 3, "scraping_attempts": 2, "total_research": 8}
 
-# Timeout for network requests (seconds)
+# Time limit for one search query (seconds), counted from when it starts running;
+# its retries and rate-limit waits stop at it too (see resilience.deadline)
 SEARCH_TIMEOUT = 30
 
+# HTTP connection pooling for search providers
+HTTP_POOL_SIZE = 10  # Keep-alive connections kept open per provider
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = SEARCH_TIMEOUT
+
+# Persistent cache shared by all processes on the host
+CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", os.path.join(".cache", "research_cache.sqlite3"))
+SEARCH_CACHE_ENABLED = True
+WEB_SEARCH_CACHE_TTL = 6 * 3600  # Seconds
+NEWS_SEARCH_CACHE_TTL = 30 * 60  # Seconds, news goes stale quickly
+SEARCH_CACHE_MAX_ENTRIES = 5000  # Per provider
+
+# Maximum number of in-flight requests per search provider
+WEB_SEARCH_CONCURRENCY = 5
+NEWS_SEARCH_CONCURRENCY = 3
+
+# Process-wide rate limits: sustained requests per second, burst size, maximum
+# concurrency and the latency (seconds) above which concurrency is reduced
+RATE_LIMITS = {
+    "tavily": {"rate": 5.0, "burst": 10, "max_concurrency": 5, "latency_target": 10.0},
+    "newsapi": {"rate": 1.0, "burst": 5, "max_concurrency": 3, "latency_target": 10.0},
+    "gemini": {"rate": 2.0, "burst": 5, "max_concurrency": 4, "latency_target": 60.0},
+}
+RATE_LIMIT_BACKOFF = 2.0  # Seconds to pause after a 429 without Retry-After
+RATE_LIMIT_MAX_RETRIES = 3  # Rate-limited attempts to wait out before giving up
+
+# Retries, circuit breaking and request hedging for search providers
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled per attempt with full jitter
+RETRY_MAX_DELAY = 8.0
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before the circuit opens
+CIRCUIT_RESET_TIMEOUT = 30.0  # Seconds before a probe call is let through
+HEDGE_ENABLED = True  # Send a duplicate request once a call exceeds the provider's p95 latency
+HEDGE_MIN_SAMPLES = 20  # Latency samples needed before hedging starts
+HEDGE_MAX_WORKERS = 16
+
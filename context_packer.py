@@ -0,0 +1,223 @@
+"""Token-budgeted packing of search and scraped content into the synthesis prompt."""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+import config
+from ranking import BM25Index, chunk_markdown
+
+logger = logging.getLogger(__name__)
+
+SECTION_HEADERS = {
+    "web": "WEB SEARCH RESULTS:",
+    "news": "NEWS SEARCH RESULTS:",
+    "scraped": "SCRAPED WEB CONTENT:",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate based on the average characters per token."""
+    return max(1, len(text) // config.CHARS_PER_TOKEN)
+
+
+def _web_text(label: str, result: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"[{label}] Title: {result.get('title', 'No title')}",
+        f"    URL: {result.get('url', 'No URL')}",
+        f"    Snippet: {result.get('snippet', 'No snippet')}",
+    ])
+
+
+def _news_text(label: str, result: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"[{label}] Title: {result.get('title', 'No title')}",
+        f"    URL: {result.get('url', 'No URL')}",
+        f"    Date: {result.get('date', 'No date')}",
+        f"    Source: {result.get('source', 'Unknown source')}",
+        f"    Summary: {result.get('summary', 'No summary')}",
+    ])
+
+
+def _build_units(web_results, news_results, scraped_content) -> List[Dict[str, Any]]:
+    """Turn every source into packable units; scraped pages are split into passages."""
+    units = []
+    for i, result in enumerate(web_results):
+        label = f"Web {i+1}"
+        units.append({"kind": "web", "label": label, "url": result.get("url", ""),
+                      "order": (0, i, 0), "text": _web_text(label, result)})
+    for i, result in enumerate(news_results):
+        label = f"News {i+1}"
+        units.append({"kind": "news", "label": label, "url": result.get("url", ""),
+                      "order": (1, i, 0), "text": _news_text(label, result)})
+    for i, (url, content) in enumerate(scraped_content.items()):
+        label = f"Scraped {i+1}"
+        for j, passage in enumerate(chunk_markdown(content) or [""]):
+            units.append({"kind": "scraped", "label": label, "url": url,
+                          "order": (2, i, j), "text": passage})
+    for unit in units:
+        unit["tokens"] = estimate_tokens(unit["text"])
+    return units
+
+
+def _render(selected: List[Dict[str, Any]]) -> str:
+    context = []
+    current_kind = None
+    current_label = None
+    for unit in sorted(selected, key=lambda u: u["order"]):
+        if unit["kind"] != current_kind:
+            current_kind = unit["kind"]
+            current_label = None
+            context.append(SECTION_HEADERS[current_kind])
+        if unit["kind"] == "scraped":
+            if unit["label"] != current_label:
+                if current_label is not None:
+                    context.append("")
+                context.append(f"[{unit['label']}] URL: {unit['url']}")
+                context.append("Content:")
+            context.append(unit["text"])
+        else:
+            context.append(unit["text"])
+            context.append("")
+        current_label = unit["label"]
+    return "\n".join(context)
+
+
+def pack_context(web_results: List[Dict[str, Any]], news_results: List[Dict[str, Any]],
+                 scraped_content: Dict[str, str], query: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the synthesis context within CONTEXT_TOKEN_BUDGET.
+
+    Each source type gets its share of the budget (CONTEXT_BUDGET_SHARES) and
+    is filled greedily with its most relevant units by BM25 score against the
+    query; budget a type leaves unused is then offered to the remaining units
+    of every type. Labels are assigned before packing, so "[Web 3]" always
+    refers to the third web result whether or not earlier ones were dropped.
+
+    Returns:
+        The context text and a report of the budget, tokens used and what was dropped.
+    """
+    units = _build_units(web_results, news_results, scraped_content)
+    if not units:
+        return "", {"budget_tokens": config.CONTEXT_TOKEN_BUDGET, "used_tokens": 0, "dropped": []}
+
+    scores = BM25Index([unit["text"] for unit in units]).scores(query)
+    for unit, score in zip(units, scores):
+        unit["score"] = float(score)
+
+    def by_relevance(unit):
+        return (-unit["score"], unit["order"])
+
+    remaining = {kind: config.CONTEXT_TOKEN_BUDGET * share for kind, share in config.CONTEXT_BUDGET_SHARES.items()}
+    selected = []
+    for kind in SECTION_HEADERS:
+        for unit in sorted((u for u in units if u["kind"] == kind), key=by_relevance):
+            if unit["tokens"] <= remaining.get(kind, 0):
+                selected.append(unit)
+                remaining[kind] -= unit["tokens"]
+
+    leftover = sum(remaining.values())
+    chosen = {id(unit) for unit in selected}
+    for unit in sorted((u for u in units if id(u) not in chosen), key=by_relevance):
+        if unit["tokens"] <= leftover:
+            selected.append(unit)
+            chosen.add(id(unit))
+            leftover -= unit["tokens"]
+
+    included_labels = {unit["label"] for unit in selected}
+    dropped = {}
+    for unit in units:
+        if id(unit) not in chosen:
+            entry = dropped.setdefault(unit["label"], {"label": unit["label"], "url": unit["url"], "tokens": 0,
+                                                       "partial": unit["label"] in included_labels})
+            entry["tokens"] += unit["tokens"]
+
+    report = {
+        "budget_tokens": config.CONTEXT_TOKEN_BUDGET,
+        "used_tokens": sum(unit["tokens"] for unit in selected),
+        "available_tokens": sum(unit["tokens"] for unit in units),
+        "included": {kind: len({u["label"] for u in selected if u["kind"] == kind}) for kind in SECTION_HEADERS},
+        "dropped": list(dropped.values()),
+    }
+    if dropped:
+        logger.info(f"Context packed into {report['used_tokens']}/{report['budget_tokens']} tokens, "
+                    f"{len(dropped)} sources dropped or truncated")
+    return _render(selected), report
+
+
+def pack_findings(analyzed_content: Dict[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render the map step's per-source key points within CONTEXT_TOKEN_BUDGET.
+
+    Sources are listed most relevant first and their key points are added in
+    order until the budget is spent; a source is only started if its header
+    and first point fit. Labels are the ones the map step saw, so "[Web 3]"
+    still refers to the third web result.
+
+    Returns:
+        The findings text and a report of the budget, tokens used and what was dropped.
+    """
+    title = "KEY POINTS EXTRACTED FROM EACH SOURCE:"
+    lines = [title]
+    used = estimate_tokens(title)
+    available = used
+    included = 0
+    dropped = []
+    ranked = sorted(enumerate(analyzed_content.items()), key=lambda item: (-item[1][1]["relevance"], item[0]))
+    for _, (url, entry) in ranked:
+        header = f"[{entry['label']}] URL: {url} (relevance {entry['relevance']:.1f})"
+        points = [f"    - {point}" for point in entry["key_points"]]
+        header_tokens = estimate_tokens(header)
+        point_tokens = [estimate_tokens(point) for point in points]
+        available += header_tokens + sum(point_tokens)
+
+        kept = 0
+        if points and used + header_tokens + point_tokens[0] <= config.CONTEXT_TOKEN_BUDGET:
+            used += header_tokens
+            while kept < len(points) and used + point_tokens[kept] <= config.CONTEXT_TOKEN_BUDGET:
+                used += point_tokens[kept]
+                kept += 1
+            lines.append(header)
+            lines.extend(points[:kept])
+            lines.append("")
+            included += 1
+        if kept < len(points):
+            dropped.append({"label": entry["label"], "url": url, "partial": kept > 0,
+                            "tokens": sum(point_tokens[kept:]) + (0 if kept else header_tokens)})
+
+    report = {
+        "budget_tokens": config.CONTEXT_TOKEN_BUDGET,
+        "used_tokens": used,
+        "available_tokens": available,
+        "included": {"sources": included},
+        "dropped": dropped,
+    }
+    if dropped:
+        logger.info(f"Findings packed into {used}/{config.CONTEXT_TOKEN_BUDGET} tokens, "
+                    f"{len(dropped)} sources dropped or truncated")
+    return "\n".join(lines), report
+
+
+def group_sources(web_results: List[Dict[str, Any]], news_results: List[Dict[str, Any]],
+                  scraped_content: Dict[str, str], max_tokens: int) -> List[Dict[str, Any]]:
+    """
+    Split every source into groups of at most max_tokens for per-group summarization.
+
+    Units keep their packing labels and page order; a scraped page too large
+    for one group continues in the next. Nothing is dropped here; the key
+    points summarized from the groups are fitted to the budget by pack_findings.
+
+    Returns:
+        Groups with the rendered "text" and a "sources" map of label to URL.
+    """
+    groups = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for unit in sorted(_build_units(web_results, news_results, scraped_content), key=lambda u: u["order"]):
+        if current and used + unit["tokens"] > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(unit)
+        used += unit["tokens"]
+    if current:
+        groups.append(current)
+    return [{"text": _render(group), "sources": {unit["label"]: unit["url"] for unit in group}} for group in groups]
@@ -0,0 +1,140 @@
+"""LLM client wrapper used by the graph nodes."""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+
+import config
+from cache import get_cache, get_memory_cache, make_cache_key
+from ratelimit import AdaptiveLimiter
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Return True if an LLM provider exception signals a quota or rate limit."""
+    if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ in ("ResourceExhausted", "RateLimitError") or is_rate_limit_message(str(error))
+
+
+def is_rate_limit_message(message: str) -> bool:
+    """Return True if an error message (e.g. a failed crawl4ai extraction block) signals a rate limit."""
+    return "RESOURCE_EXHAUSTED" in message or "RateLimitError" in message or "429" in message
+
+
+_cache_stats: Dict[str, Dict[str, int]] = {}
+_cache_stats_lock = threading.Lock()
+
+
+def _count(node: Optional[str], outcome: str):
+    with _cache_stats_lock:
+        counters = _cache_stats.setdefault(node or "unnamed", {"memory_hits": 0, "disk_hits": 0,
+                                                                "misses": 0, "bypassed": 0})
+        counters[outcome] += 1
+
+
+def llm_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return per-node LLM response cache counters for this process."""
+    with _cache_stats_lock:
+        stats = {node: dict(counters) for node, counters in _cache_stats.items()}
+    for counters in stats.values():
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_rate"] = hits / lookups if lookups else 0.0
+    return stats
+
+
+def default_cache_tiers() -> List[Any]:
+    """In-memory LRU in front of the persistent SQLite cache, both in the "llm_responses" namespace."""
+    return [
+        get_memory_cache("llm_responses", ttl=3600, max_entries=config.LLM_CACHE_MEMORY_ENTRIES),
+        get_cache("llm_responses", ttl=3600, max_entries=config.LLM_CACHE_MAX_ENTRIES),
+    ]
+
+
+class LLMClient:
+    """
+    Wrap a LangChain chat model with response caching and the provider's limiter.
+
+    Calls made with a node name that has an enabled entry in
+    LLM_CACHE_POLICIES are looked up in the cache tiers, fastest first, before
+    the model is called; a hit in a slower tier is copied into the faster ones.
+    Keys cover the model, temperature, call options and a hash of the rendered
+    prompt. Only the response text is cached, so hits come back as a plain
+    AIMessage. A caller that checks the response passes `validate`, and text
+    it rejects is returned but not cached, so a malformed response is not
+    replayed for the policy's TTL.
+
+    Rate-limit errors are reported to the limiter and the call waits for
+    capacity before being retried, up to RATE_LIMIT_MAX_RETRIES times.
+    Attributes not defined here are delegated to the wrapped model.
+    """
+
+    def __init__(self, model: Any, limiter: AdaptiveLimiter,
+                 cache_tiers: Callable[[], List[Any]] = default_cache_tiers):
+        self.model = model
+        self.limiter = limiter
+        self.cache_tiers = cache_tiers
+
+    def cache_key(self, prompt: Any, **kwargs: Any) -> str:
+        prompt_hash = hashlib.sha256(str(prompt).encode("utf-8")).hexdigest()
+        return make_cache_key(
+            model=getattr(self.model, "model", None),
+            temperature=getattr(self.model, "temperature", None),
+            options=sorted(kwargs.items()),
+            prompt=prompt_hash,
+        )
+
+    def invoke(self, prompt: Any, node: Optional[str] = None,
+               validate: Optional[Callable[[str], bool]] = None, **kwargs: Any) -> Any:
+        policy = config.LLM_CACHE_POLICIES.get(node) if config.LLM_CACHE_ENABLED and node else None
+        if not policy or not policy.get("enabled"):
+            _count(node, "bypassed")
+            return self._invoke_model(prompt, node, **kwargs)
+
+        key = self.cache_key(prompt, **kwargs)
+        tiers = self.cache_tiers()
+        for depth, tier in enumerate(tiers):
+            content = tier.get(key)
+            if content is not None:
+                for faster in tiers[:depth]:
+                    faster.set(key, content, ttl=policy["ttl"])
+                _count(node, "memory_hits" if depth == 0 else "disk_hits")
+                logger.info(f"LLM response cache hit for {node}")
+                return AIMessage(content=content)
+
+        _count(node, "misses")
+        response = self._invoke_model(prompt, node, **kwargs)
+        content = getattr(response, "content", None)
+        if isinstance(content, str) and content and (validate is None or validate(content)):
+            for tier in tiers:
+                tier.set(key, content, ttl=policy["ttl"])
+        return response
+
+    def _invoke_model(self, prompt: Any, node: Optional[str] = None, **kwargs: Any) -> Any:
+        for attempt in range(config.RATE_LIMIT_MAX_RETRIES + 1):
+            with self.limiter.slot(), span("external", "gemini", node or "generate",
+                                           prompt_chars=len(str(prompt))) as call:
+                start = time.monotonic()
+                try:
+                    response = self.model.invoke(prompt, **kwargs)
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == config.RATE_LIMIT_MAX_RETRIES:
+                        raise
+                    call.outcome = "rate_limited"
+                    rate_limited = e
+                else:
+                    self.limiter.record_success(time.monotonic() - start)
+                    call.payload_bytes = len(str(getattr(response, "content", "")))
+                    return response
+            self.limiter.record_throttle()
+            logger.warning(f"LLM call rate limited (attempt {attempt + 1}): {str(rate_limited)}")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
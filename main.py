@@ -5,8 +5,11 @@ import logging
 import os
 import sys
 import json
-from typing import Optional
-from agent import run_web_research_agent
+import tempfile
+from typing import Any, Dict, Optional
+from agent import PLANNER_MODES, run_web_research_agent
+import config
+from profiler import format_summary, profile_run
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -101,6 +104,30 @@ def main():
         "-n", "--no-news", action="store_true",
         help="Disable news search functionality (web search only)"
     )
+    parser.add_argument(
+        "--planner", choices=PLANNER_MODES,
+        help="Research planner for this run (default: PLANNER_MODE)"
+    )
+    parser.add_argument(
+        "--fused-planning", action="store_true",
+        help="Analyze the query and plan the research in a single LLM call"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Profile each research run per graph node (cProfile, sampled stacks, wall vs CPU time)"
+    )
+    parser.add_argument(
+        "--record", metavar="CASSETTE",
+        help="Record every provider interaction to a cassette file (runs with an empty cache)"
+    )
+    parser.add_argument(
+        "--replay", metavar="CASSETTE",
+        help="Answer provider calls from a recorded cassette instead of the network"
+    )
+    parser.add_argument(
+        "--replay-speed", type=float, default=1.0,
+        help="Multiplier for recorded call durations during replay (0 replays instantly)"
+    )
     
     args = parser.parse_args()
     if args.verbose:
@@ -110,33 +137,74 @@ def main():
         logging.getLogger("tools").setLevel(logging.DEBUG)
     
 
+    options = {
+        "disable_news": True if args.no_news else None,
+        "fused_planning": True if args.fused_planning else None,
+        "planner_mode": args.planner,
+    }
     if args.no_news:
-        os.environ["DISABLE_NEWS_SEARCH"] = "true"
         logger.info("News search functionality disabled")
+
+    if args.record or args.replay:
+        config.CASSETTE_MODE = "record" if args.record else "replay"
+        config.CASSETTE_PATH = args.record or args.replay
+        config.CASSETTE_TIME_SCALE = args.replay_speed
+        # Cache hits would leave gaps in a recording and skip replayed calls, so use a cold cache
+        cache_dir = tempfile.TemporaryDirectory(prefix="research-cassette-")
+        config.CACHE_PATH = os.path.join(cache_dir.name, "research_cache.sqlite3")
+        logger.info(f"Cassette {config.CASSETTE_MODE} mode using {config.CASSETTE_PATH}")
+    if args.replay:
+        # Replayed calls never reach the providers, but the clients still expect keys;
+        # without NEWS_API_KEY news search would use mock data instead of the recording
+        for key in ("GOOGLE_API_KEY", "TAVILY_API_KEY", "NEWS_API_KEY"):
+            os.environ.setdefault(key, "replay")
     
-    setup_environment()
+    if not args.replay:
+        setup_environment()
     
     if args.interactive:
-        run_interactive_mode(args.output)
+        run_interactive_mode(args.output, args.profile, options)
     elif args.query:
-        run_single_query(args.query, args.output)
+        run_single_query(args.query, args.output, args.profile, options)
     else:
         parser.print_help()
 
 
-def run_single_query(query: str, output_file: Optional[str] = None):
+def research(query: str, profile: bool = False, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run the agent on a query, optionally profiling the run.
+
+    Args:
+        query: The research query
+        profile: Profile the run and write the results under config.PROFILE_DIR
+        options: Per-run settings passed to run_web_research_agent
+    """
+    if not profile:
+        return run_web_research_agent(query, options)
+    with profile_run(query, all_threads=True) as run:
+        result = run_web_research_agent(query, options)
+    path = run.save()
+    print("\n" + format_summary(run.summary()))
+    print(f"Profile written to {path} (stacks.folded for flamegraphs, <node>.prof for pstats)")
+    return result
+
+
+def run_single_query(query: str, output_file: Optional[str] = None, profile: bool = False,
+                     options: Optional[Dict[str, Any]] = None):
     """
     Run a single research query.
     
     Args:
         query: The research query
         output_file: Optional file to save the report to
+        profile: Profile the run per graph node
+        options: Per-run settings (news search, planner)
     """
     print(f"Researching: {query}")
     print("This may take a few minutes...")
     
     try:
-        result = run_web_research_agent(query)
+        result = research(query, profile, options)
         
         report = result.get("final_report", "Error: No report generated")
         
@@ -154,12 +222,15 @@ def run_single_query(query: str, output_file: Optional[str] = None):
         print(f"An error occurred: {str(e)}")
 
 
-def run_interactive_mode(default_output_file: Optional[str] = None):
+def run_interactive_mode(default_output_file: Optional[str] = None, profile: bool = False,
+                         options: Optional[Dict[str, Any]] = None):
     """
     Run the agent in interactive mode, allowing multiple queries.
     
     Args:
         default_output_file: Default file pattern to save reports
+        profile: Profile each run per graph node
+        options: Per-run settings (news search, planner)
     """
     print("Web Research Agent - Interactive Mode")
     print("Type 'exit' or 'quit' to end the session")
@@ -178,7 +249,7 @@ def run_interactive_mode(default_output_file: Optional[str] = None):
             print(f"Researching: {query}")
             print("This may take a few minutes...")
             
-            result = run_web_research_agent(query)
+            result = research(query, profile, options)
             
             report = result.get("final_report", "Error: No report generated")
             
@@ -1,55 +1,124 @@
-import re
 from typing import Dict, List, Tuple, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from state import ResearchState
 from tools import TavilySearchTool, NewsAggregatorTool
+from cache import normalize_query
+from coalesce import get_flight
+from browser_pool import get_browser_pool
+from page_cache import PageCache
+from ranking import select_passages
+from context_packer import group_sources, pack_context, pack_findings
+from planner import heuristic_plan
+from prefetch import Prefetcher, rank_candidates
+from structured import (AnalysisAndPlan, Evaluation, QueryAnalysis, QueryRefinement, ResearchPlan, SourceSummaries,
+                        Synthesis, invoke_structured)
+from urls import dedupe_search_results, url_key
+from llm_client import LLMClient, is_rate_limit_error, is_rate_limit_message
+from cassette import wrap_extraction, wrap_model
+from ratelimit import get_limiter
+from resilience import deadline
+import providers
+from tracing import span
 import config
 import os
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode, LLMConfig
-from crawl4ai.extraction_strategy import LLMExtractionStrategy
+import sys
+import types
+import importlib
 import logging
 import json
 import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
-web_search_tool = TavilySearchTool()
-news_tool = NewsAggregatorTool()
+# Heavy dependencies are imported on first use, so importing this module (for
+# the CLI, graph visualization or tests) does not load crawl4ai, Playwright or
+# the Gemini SDK. Access them through _lazy() inside this module.
+_LAZY_IMPORTS = {
+    "ChatGoogleGenerativeAI": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "CrawlerRunConfig": ("crawl4ai", "CrawlerRunConfig"),
+    "CacheMode": ("crawl4ai", "CacheMode"),
+    "LLMConfig": ("crawl4ai", "LLMConfig"),
+    "LLMExtractionStrategy": ("crawl4ai.extraction_strategy", "LLMExtractionStrategy"),
+}
 
-google_api_key = os.environ.get("GOOGLE_API_KEY") or config.GOOGLE_API_KEY
-if not google_api_key:
-    raise ValueError("GOOGLE_API_KEY is required for the research agent")
+# Read-only module attributes kept for callers that used the old eagerly built
+# clients. The nodes call providers.get(), so replace a client with providers.register().
+_PROVIDER_ATTRIBUTES = {"web_search_tool": "web_search", "news_tool": "news", "llm": "llm"}
 
-llm = ChatGoogleGenerativeAI(
-    model=config.LLM_MODEL,
-    temperature=config.LLM_TEMPERATURE,
-    google_api_key=google_api_key,
-    convert_system_message_to_human=True  
-)
 
-def analyze_query(state: ResearchState) -> ResearchState:
-    """Analyze user query to extract research requirements.
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        module_name, attribute = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name), attribute)
+        globals()[name] = value
+        return value
+    if name in _PROVIDER_ATTRIBUTES:
+        return providers.get(_PROVIDER_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    Args:
-        state (ResearchState): current state with 'original_query'.
 
-    Returns:
-        ResearchState: updated state with 'analyzed_query', 'search_queries',
-            'iteration_count', 'max_iterations', and empty 'error_log'.
-    """
-    logger.info(f"Analyzing query: {state['original_query']}")
-    
-    prompt = ChatPromptTemplate.from_template("""
-        You are a meticulous research assistant AI. Your task is to thoroughly analyze user queries to understand the core intent, necessary information, and optimal approach for research.
+class _NodesModule(types.ModuleType):
+    """Module type rejecting assignments to provider attributes, which the nodes would ignore."""
 
-        Analyze the following research query:
+    def __setattr__(self, name: str, value: Any):
+        if name in _PROVIDER_ATTRIBUTES:
+            raise AttributeError(f"{__name__}.{name} is read-only; replace the client with "
+                                 f"providers.register({_PROVIDER_ATTRIBUTES[name]!r}, factory)")
+        super().__setattr__(name, value)
 
-        QUERY: {query}
 
-        Break down the query by determining the following components:
+sys.modules[__name__].__class__ = _NodesModule
+
 
-        1.  **main_topic**: The primary subject or domain of the query.
+def _lazy(name: str) -> Any:
+    """Return a lazily imported name, preferring a value already bound (or patched) on the module."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
+# Executors are shared by every research run so the number of in-flight
+# requests is capped per provider, not per graph invocation.
+web_search_executor = ThreadPoolExecutor(max_workers=config.WEB_SEARCH_CONCURRENCY,
+                                         thread_name_prefix="web-search")
+news_search_executor = ThreadPoolExecutor(max_workers=config.NEWS_SEARCH_CONCURRENCY,
+                                          thread_name_prefix="news-search")
+synthesis_executor = ThreadPoolExecutor(max_workers=config.SYNTHESIS_MAP_CONCURRENCY,
+                                        thread_name_prefix="synthesis-map")
+
+# Identical searches and scrapes issued concurrently by different runs share one request
+web_search_flight = get_flight("web_search")
+news_search_flight = get_flight("news_search")
+scrape_flight = get_flight("scrape")
+extraction_flight = get_flight("extraction")
+
+
+def _google_api_key() -> str:
+    google_api_key = os.environ.get("GOOGLE_API_KEY") or config.GOOGLE_API_KEY
+    if not google_api_key:
+        raise ValueError("GOOGLE_API_KEY is required for the research agent")
+    return google_api_key
+
+
+def _build_llm() -> LLMClient:
+    return LLMClient(
+        wrap_model(_lazy("ChatGoogleGenerativeAI")(
+            model=config.LLM_MODEL,
+            temperature=config.LLM_TEMPERATURE,
+            google_api_key=_google_api_key(),
+            base_url=config.GEMINI_BASE_URL or None,
+            convert_system_message_to_human=True  
+        )),
+        get_limiter("gemini")
+    )
+
+
+providers.register("web_search", TavilySearchTool)
+providers.register("news", NewsAggregatorTool)
+providers.register("llm", _build_llm)
+
+# Shared by analyze_query and the fused analyze_and_plan node so both produce the same analysis
+QUERY_ANALYSIS_COMPONENTS = """        1.  **main_topic**: The primary subject or domain of the query.
         2.  **specific_request**: The precise question being asked or the specific information the user seeks within the main topic.
         3.  **info_type**: The nature of the information required (e.g., factual definitions, technical explanations, user opinions/reviews, news updates, comparative analysis, historical context, pros/cons).
         4.  **time_sensitive**: Is the query about current, rapidly changing information (True) or established knowledge (False)?
@@ -73,8 +142,9 @@ def analyze_query(state: ResearchState) -> ResearchState:
          ["latest research edible robotics", "developments in food safe robots", "applications of ingestible robotics in medicine", "challenges designing edible robots", "companies developing edible robot technology", "edible robotics current state review", "future of edible robots"]
          10. **requires_web_scraping**: Set to true if the query involves subjective assessment, requires comparisons, needs in-depth analysis/synthesis from potentially long-form content, or tackles complex topics where simple search snippets are insufficient. Set to false for straightforward factual queries.
 
-        Respond ONLY with a valid JSON object adhering to this structure:
-        {{
+"""
+
+QUERY_ANALYSIS_JSON = """        {{
             "main_topic": "topic",
             "specific_request": "what is being asked",
             "info_type": "facts/opinions/news/analysis/comparison/etc",
@@ -86,66 +156,185 @@ def analyze_query(state: ResearchState) -> ResearchState:
             "search_queries": ["search query 1", "search query 2", ...],
             "requires_web_scraping": true/false
         }}
-        """)
+"""
+
+
+def _default_analysis(query: str) -> Dict[str, Any]:
+    """Analysis used when the LLM response cannot be parsed."""
+    return {
+        "main_topic": query,
+        "specific_request": query,
+        "info_type": "facts",
+        "time_sensitive": False,
+        "key_entities": [query],
+        "subjective_criteria": [],
+        "depth_required": "medium",
+        "regional_context": None,
+        "search_queries": [query],
+        "requires_web_scraping": False
+    }
+
+
+def _complete_analysis(analysis: Dict[str, Any], query: str) -> Dict[str, Any]:
+    """Fill fields the model left empty (or the whole analysis, if unusable) from the raw query."""
+    if not analysis:
+        return _default_analysis(query)
+    for field in ("main_topic", "specific_request"):
+        analysis[field] = analysis.get(field) or query
+    for field in ("key_entities", "search_queries"):
+        analysis[field] = analysis.get(field) or [query]
+    return analysis
+
+
+def analyze_query(state: ResearchState) -> ResearchState:
+    """Analyze user query to extract research requirements.
+
+    Args:
+        state (ResearchState): current state with 'original_query'.
+
+    Returns:
+        ResearchState: state fragment with 'analyzed_query', 'search_queries',
+            'iteration_count', 'max_iterations', and empty 'error_log'.
+    """
+    logger.info(f"Analyzing query: {state['original_query']}")
     
-    response = llm.invoke(prompt.format(query=state['original_query'], max_search_queries=config.MAX_SEARCH_QUERIES))
+    prompt = ChatPromptTemplate.from_template("""
+        You are a meticulous research assistant AI. Your task is to thoroughly analyze user queries to understand the core intent, necessary information, and optimal approach for research.
 
-    try:
-        response_text = response.content
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            json_text = response_text.strip()
-            
-        analyzed_query = json.loads(json_text)
-        logger.info(f"Query analysis complete: {analyzed_query}")
-    except (json.JSONDecodeError, IndexError) as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        analyzed_query = {
-            "main_topic": state['original_query'],
-            "specific_request": state['original_query'],
-            "info_type": "facts",
-            "time_sensitive": False,
-            "key_entities": [state['original_query']],
-            "subjective_criteria": [],
-            "depth_required": "medium",
-            "regional_context": None,
-            "search_queries": [state['original_query']],
-            "requires_web_scraping": False
-        }
+        Analyze the following research query:
+
+        QUERY: {query}
+
+        Break down the query by determining the following components:
+
+""" + QUERY_ANALYSIS_COMPONENTS + """        Respond ONLY with a valid JSON object adhering to this structure:
+""" + QUERY_ANALYSIS_JSON + """        """)
+    
+    analyzed_query, _ = invoke_structured(
+        providers.get("llm"),
+        prompt.format(query=state['original_query'], max_search_queries=config.MAX_SEARCH_QUERIES),
+        QueryAnalysis,
+        node="analyze_query"
+    )
+    analyzed_query = _complete_analysis(analyzed_query, state['original_query'])
+    logger.info(f"Query analysis complete: {analyzed_query}")
     
     return {
-        **state,
         "analyzed_query": analyzed_query,
-        "search_queries": analyzed_query.get("search_queries", [state['original_query']]),
+        "search_queries": analyzed_query["search_queries"],
         "iteration_count": {"search_refinement": 0, "total_research": 0},
         "max_iterations": config.MAX_ITERATIONS,
         "error_log": []
     }
 
 
+def _refine_search_queries(state: ResearchState) -> List[str]:
+    """Ask the LLM for search queries that cover what the executed ones missed.
+
+    Returns:
+        List[str]: new queries only; anything already searched in this run is removed.
+    """
+    executed = sorted({query for queries in state.get("executed_queries", {}).values() for query in queries})
+    prompt = ChatPromptTemplate.from_template("""
+    You are a research strategist. The searches below did not find enough information to answer the query.
+    
+    ORIGINAL QUERY: {original_query}
+    QUERY ANALYSIS: {analyzed_query}
+    SEARCHES ALREADY RUN: {executed_queries}
+    WHY THE RESULTS WERE INSUFFICIENT: {reasoning}
+    
+    Suggest up to {max_search_queries} new search engine queries that target the missing information,
+    for example by using different terminology, narrowing to a specific aspect, or naming specific sources.
+    Do not repeat or trivially rephrase any search already run.
+    
+    Respond in a structured JSON format:
+    {{
+        "search_queries": ["new query 1", "new query 2", ...],
+        "reasoning": "What the new queries are meant to find"
+    }}
+    """)
+    refinement, _ = invoke_structured(
+        providers.get("llm"),
+        prompt.format(
+            original_query=state.get("original_query", ""),
+            analyzed_query=state.get("analyzed_query", {}),
+            executed_queries=json.dumps(executed),
+            reasoning=state.get("evaluation_reasoning") or "Not recorded",
+            max_search_queries=config.MAX_SEARCH_QUERIES
+        ),
+        QueryRefinement,
+        node="refine_search_queries"
+    )
+    already_run = set(executed)
+    new_queries = []
+    for query in (refinement or {}).get("search_queries", []):
+        key = normalize_query(query)
+        if key and key not in already_run:
+            already_run.add(key)
+            new_queries.append(query)
+    logger.info(f"Refined search queries: {new_queries}")
+    return new_queries[:config.MAX_SEARCH_QUERIES]
+
+
 def plan_research_strategy(state: ResearchState) -> ResearchState:
     """Plan research steps based on the analyzed query.
 
     Args:
         state (ResearchState): current state with 'analyzed_query'.
 
+    A rule-based planner decides simple cases from the query analysis alone;
+    the LLM is only called when its confidence is below
+    PLANNER_CONFIDENCE_THRESHOLD (or always, in "llm" and "shadow" modes).
+    Where the plan came from is recorded in 'plan_decision'.
+
+    On a refinement iteration (some queries have already been run), the
+    search queries are replaced by new or reformulated ones from
+    _refine_search_queries; if there are none, the plan goes straight to
+    synthesis instead of repeating the same searches.
+
     Returns:
-        ResearchState: state updated with 'research_plan' and incremented 'iteration_count'.
+        ResearchState: state fragment with 'search_queries', 'research_plan',
+            'plan_decision' and incremented 'iteration_count'.
     """
     logger.info("Planning research strategy")
     
-    state["iteration_count"]["total_research"] = state["iteration_count"].get("total_research", 0) + 1
+    iteration_count = dict(state["iteration_count"])
+    iteration_count["total_research"] = iteration_count.get("total_research", 0) + 1
     
-    if state["iteration_count"]["total_research"] > state["max_iterations"]["total_research"]:
+    if iteration_count["total_research"] > state["max_iterations"]["total_research"]:
         logger.warning("Exceeded maximum total research iterations")
         return {
-            **state,
+            "iteration_count": iteration_count,
             "research_plan": {"search_approach": "extract_and_synthesize_information"}
         }
     
+    search_queries = state.get("search_queries", [])
+    if state.get("executed_queries"):
+        search_queries = _refine_search_queries(state)
+        if not search_queries:
+            logger.info("No new search queries to try, moving to synthesis")
+            return {
+                "iteration_count": iteration_count,
+                "search_queries": [],
+                "research_plan": {"search_approach": "extract_and_synthesize_information"}
+            }
+    
+    mode = state.get("run_options", {}).get("planner_mode", config.PLANNER_MODE)
+    heuristic, confidence = heuristic_plan(state.get("analyzed_query") or {})
+    plan_decision = {
+        "mode": mode,
+        "confidence": confidence,
+        "heuristic_approach": heuristic["search_approach"] if heuristic else None,
+    }
+    if mode == "hybrid" and heuristic and confidence >= config.PLANNER_CONFIDENCE_THRESHOLD:
+        logger.info(f"Research plan decided locally (confidence {confidence:.2f}): {heuristic}")
+        return {
+            "iteration_count": iteration_count,
+            "search_queries": search_queries,
+            "research_plan": heuristic,
+            "plan_decision": {**plan_decision, "source": "heuristic"}
+        }
+    
     prompt = ChatPromptTemplate.from_template("""
     You are a research strategist. Based on the analyzed query, create a research plan.
     
@@ -166,37 +355,187 @@ def plan_research_strategy(state: ResearchState) -> ResearchState:
     }}
     """)
     
-    response = llm.invoke(prompt.format(analyzed_query=state['analyzed_query']))
-    
-    try:
-        response_text = response.content
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            json_text = response_text.strip()
-            
-        research_plan = json.loads(json_text)
-        logger.info(f"Research plan created: {research_plan}")
-    except (json.JSONDecodeError, IndexError) as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        research_plan = {"search_approach": "web_search", "priority_info": [], "source_priorities": []}
+    research_plan, parse_error = invoke_structured(
+        providers.get("llm"), prompt.format(analyzed_query=state['analyzed_query']), ResearchPlan, node="plan_research_strategy"
+    )
+    if parse_error:
+        research_plan = ResearchPlan().model_dump()
+        plan_decision["parse_error"] = True
+    logger.info(f"Research plan created: {research_plan}")
     
+    plan_decision["source"] = "llm"
+    plan_decision["agrees_with_heuristic"] = plan_decision["heuristic_approach"] == research_plan.get("search_approach")
     return {
-        **state,
-        "research_plan": research_plan
+        "iteration_count": iteration_count,
+        "search_queries": search_queries,
+        "research_plan": research_plan,
+        "plan_decision": plan_decision
     }
 
 
+def analyze_and_plan(state: ResearchState) -> ResearchState:
+    """Analyze the query and plan the research in a single LLM call.
+
+    Fast-path replacement for analyze_query followed by plan_research_strategy:
+    the model returns the query analysis and the research plan in one JSON
+    object, saving a round trip before the first search. Refinement loops
+    still go through plan_research_strategy.
+
+    Args:
+        state (ResearchState): current state with 'original_query'.
+
+    Returns:
+        ResearchState: state fragment with 'analyzed_query', 'search_queries',
+            'research_plan', 'iteration_count', 'max_iterations', and empty 'error_log'.
+    """
+    logger.info(f"Analyzing and planning query: {state['original_query']}")
+
+    prompt = ChatPromptTemplate.from_template("""
+        You are a meticulous research assistant and research strategist. Analyze the user's research query, then plan how to research it.
+
+        QUERY: {query}
+
+        First, break down the query by determining the following components:
+
+""" + QUERY_ANALYSIS_COMPONENTS + """        Then, based on that analysis, create a research plan:
+
+        1. What type of search should be performed first (web search or news search or both in parallel)?
+        2. What specific information should we look for in the search results?
+        3. Should we prioritize certain types of sources?
+
+        Respond ONLY with a valid JSON object with two keys, "analysis" and "plan":
+        {{
+            "analysis": """ + QUERY_ANALYSIS_JSON.strip() + """,
+            "plan": {{
+                "search_approach": "web_search" or "news_search" or "parallel_search",
+                "priority_info": ["info1", "info2", ...],
+                "source_priorities": ["academic", "news", "general", etc],
+                "search_refinement_needed": true/false
+            }}
+        }}
+        """)
+
+    parsed, _ = invoke_structured(
+        providers.get("llm"),
+        prompt.format(query=state['original_query'], max_search_queries=config.MAX_SEARCH_QUERIES),
+        AnalysisAndPlan,
+        node="analyze_and_plan"
+    )
+    parsed = parsed or AnalysisAndPlan().model_dump()
+    analyzed_query = _complete_analysis(parsed["analysis"], state['original_query'])
+    research_plan = parsed["plan"]
+    logger.info(f"Query analysis complete: {analyzed_query}")
+    logger.info(f"Research plan created: {research_plan}")
+
+    return {
+        "analyzed_query": analyzed_query,
+        "search_queries": analyzed_query["search_queries"],
+        "research_plan": research_plan,
+        "plan_decision": {"mode": "fused", "source": "llm"},
+        # The fused call counts as the first planning iteration
+        "iteration_count": {"search_refinement": 0, "total_research": 1},
+        "max_iterations": config.MAX_ITERATIONS,
+        "error_log": []
+    }
+
+
+def _fan_out_queries(executor: ThreadPoolExecutor, search_fn, queries: List[str],
+                     provider: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Run a search for every query concurrently and gather the results.
+
+    Results are concatenated in query order regardless of completion order.
+    The executor is shared by every run, so a query may wait for a worker;
+    its SEARCH_TIMEOUT starts when it begins running and also bounds its
+    retries (see resilience.deadline). A query that fails or does not finish
+    in time is skipped and reported as an error instead of holding up the others.
+
+    Args:
+        executor: bounded executor for the provider.
+        search_fn: callable taking a single query and returning a list of results.
+        queries: search queries to dispatch.
+        provider: provider name used in log and error messages.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: combined results and error entries.
+    """
+    progress = threading.Condition()
+    started: Dict[int, float] = {}
+
+    def run(index: int, query: str):
+        with progress:
+            started[index] = time.monotonic()
+            progress.notify_all()
+        with deadline(config.SEARCH_TIMEOUT):
+            return search_fn(query)
+
+    def notify(_):
+        with progress:
+            progress.notify_all()
+
+    futures = [executor.submit(run, index, query) for index, query in enumerate(queries)]
+    for future in futures:
+        future.add_done_callback(notify)
+
+    timed_out = set()
+    with progress:
+        while True:
+            now = time.monotonic()
+            for index, future in enumerate(futures):
+                if not future.done() and index in started and now - started[index] >= config.SEARCH_TIMEOUT:
+                    timed_out.add(index)
+            waiting = [index for index, future in enumerate(futures) if not future.done() and index not in timed_out]
+            if not waiting:
+                break
+            # Queued queries have no deadline yet; wake when one starts, finishes or times out
+            deadlines = [started[index] + config.SEARCH_TIMEOUT for index in waiting if index in started]
+            progress.wait(timeout=min(deadlines) - now if deadlines else None)
+
+    all_results = []
+    errors = []
+    for index, (query, future) in enumerate(zip(queries, futures)):
+        if index in timed_out:
+            logger.warning(f"{provider} search timed out for: {query}")
+            errors.append({"type": "search_error", "provider": provider, "query": query,
+                           "message": f"Timed out after {config.SEARCH_TIMEOUT}s"})
+            continue
+        try:
+            all_results.extend(future.result())
+        except Exception as e:
+            logger.error(f"{provider} search failed for {query}: {str(e)}")
+            errors.append({"type": "search_error", "provider": provider, "query": query, "message": str(e),
+                           "circuit_open": getattr(e, "circuit_open", False)})
+    return all_results, errors
+
+
+def _pending_queries(state: ResearchState, provider: str, queries: List[str]) -> List[str]:
+    """Drop queries already sent to this provider in the current run, and repeats within the list."""
+    executed = set(state.get("executed_queries", {}).get(provider, []))
+    pending = []
+    for query in queries:
+        key = normalize_query(query)
+        if key and key not in executed:
+            executed.add(key)
+            pending.append(query)
+    return pending
+
+
+def _record_queries(state: ResearchState, provider: str, queries: List[str]) -> Dict[str, List[str]]:
+    previous = state.get("executed_queries", {}).get(provider, [])
+    return {provider: previous + [normalize_query(query) for query in queries]}
+
+
 def execute_web_search(state: ResearchState) -> Dict[str, Any]:
     """Perform web searches for the given queries.
 
     Args:
         state (ResearchState): current state with 'search_queries'.
 
+    Queries already run against the web search provider in this research
+    run are skipped, so a refinement iteration only searches new queries.
+
     Returns:
-        Dict[str, Any]: state fragment containing 'web_results'.
+        Dict[str, Any]: state fragment containing 'web_results', 'executed_queries'
+            and any search errors.
     """
     logger.info(f"Executing web search (limited to {config.MAX_SEARCH_QUERIES} API calls)")
     
@@ -204,17 +543,24 @@ def execute_web_search(state: ResearchState) -> Dict[str, Any]:
     if not search_queries:
         search_queries = [state.get("original_query", "")]
     
-    search_queries = search_queries[:config.MAX_SEARCH_QUERIES]
-    
-    all_results = []
-    for i, query in enumerate(search_queries):
-        logger.info(f"Executing Tavily search {i+1}/{len(search_queries)}: {query}")
-        results = web_search_tool.search(query)
-        all_results.extend(results)
+    search_queries = _pending_queries(state, "web", search_queries)[:config.MAX_SEARCH_QUERIES]
+    if not search_queries:
+        logger.info("Every web search query has already been run, skipping web search")
+        return {"web_results": [], "error_log": []}
+    
+    logger.info(f"Dispatching {len(search_queries)} Tavily searches concurrently")
+    all_results, errors = _fan_out_queries(
+        web_search_executor,
+        lambda query: web_search_flight.do(normalize_query(query), lambda: providers.get("web_search").search(query)),
+        search_queries,
+        "tavily"
+    )
     
     logger.info(f"Retrieved a total of {len(all_results)} search results from {len(search_queries)} queries")
     return {
-        "web_results": all_results
+        "web_results": all_results,
+        "executed_queries": _record_queries(state, "web", search_queries),
+        "error_log": errors
     }
 
 
@@ -224,8 +570,11 @@ def execute_news_search(state: ResearchState) -> Dict[str, Any]:
     Args:
         state (ResearchState): current state with 'search_queries' and time sensitivity info.
 
+    Queries already run against the news provider in this research run are skipped.
+
     Returns:
-        Dict[str, Any]: state fragment containing 'news_results'.
+        Dict[str, Any]: state fragment containing 'news_results', 'executed_queries'
+            and any search errors.
     """
     logger.info("Executing news search")
     
@@ -236,13 +585,25 @@ def execute_news_search(state: ResearchState) -> Dict[str, Any]:
     if not search_queries:
         search_queries = [state.get("original_query", "")]
     
-    all_results = []
-    for query in search_queries:
-        results = news_tool.search_news(query, days_back=days_back)
-        all_results.extend(results)
+    search_queries = _pending_queries(state, "news", search_queries)
+    if not search_queries:
+        logger.info("Every news search query has already been run, skipping news search")
+        return {"news_results": [], "error_log": []}
+    
+    all_results, errors = _fan_out_queries(
+        news_search_executor,
+        lambda query: news_search_flight.do(
+            (normalize_query(query), days_back),
+            lambda: providers.get("news").search_news(query, days_back=days_back)
+        ),
+        search_queries,
+        "newsapi"
+    )
     
     return {
-        "news_results": all_results
+        "news_results": all_results,
+        "executed_queries": _record_queries(state, "news", search_queries),
+        "error_log": errors
     }
 
 
@@ -252,13 +613,19 @@ def evaluate_results_and_select_urls(state: ResearchState) -> ResearchState:
     Args:
         state (ResearchState): state containing 'web_results' and 'news_results'.
 
+    With SPECULATIVE_PREFETCH enabled, the top search results by local BM25
+    score are fetched into the page cache while the LLM evaluates; fetches
+    that were not selected are cancelled once the selection is known.
+
     Returns:
-        ResearchState: state updated with 'urls_to_scrape' and 'next_node'.
+        ResearchState: state fragment with the newly selected 'urls_to_scrape', 'next_node',
+            'evaluation_reasoning', 'dedup_stats' and, when prefetching, 'prefetch_stats'.
     """
     logger.info("Evaluating search results and selecting URLs")
     
-    web_results = state.get("web_results", [])
-    news_results = state.get("news_results", [])
+    web_results, news_results, dedup_stats = dedupe_search_results(
+        state.get("web_results", []), state.get("news_results", [])
+    )
     
     web_snippets = [
         {"source": "web", "title": r.get("title", ""), "snippet": r.get("snippet", ""), "url": r.get("url", "")}
@@ -274,17 +641,34 @@ def evaluate_results_and_select_urls(state: ResearchState) -> ResearchState:
     all_snippets = web_snippets + news_snippets
     
     if not all_snippets:
+        if any(error.get("circuit_open") for error in state.get("error_log", [])):
+            logger.warning("No search results and search providers are unavailable, skipping refinement")
+            return {
+                "next_node": "extract_and_synthesize_information",
+                "urls_to_scrape": []
+            }
         logger.warning("No search results to evaluate, refinement needed")
         return {
-            **state,
-            "error_log": state.get("error_log", []) + [{"type": "search_error", "message": "No search results found"}],
+            "error_log": [{"type": "search_error", "message": "No search results found"}],
             "next_node": "plan_research_strategy",
+            "evaluation_reasoning": "The searches returned no results",
             "urls_to_scrape": []
         }
     
     original_query = state.get("original_query", "")
     analyzed_query = state.get("analyzed_query", {})
     
+    # Start fetching the likeliest scrape targets while the evaluator decides
+    prefetcher = None
+    if config.SPECULATIVE_PREFETCH and config.PAGE_CACHE_ENABLED:
+        browser_pool = get_browser_pool()
+        pages = PageCache()
+        prefetcher = Prefetcher(
+            browser_pool,
+            lambda url: scrape_flight.do_async(url_key(url), lambda: _fetch_page(browser_pool, pages, url))
+        )
+        prefetcher.start(rank_candidates(all_snippets, _ranking_query(state), config.SPECULATIVE_PREFETCH_URLS))
+    
     query_has_subjective_elements = any(term in original_query.lower() for term in 
         ["best", "good", "great", "better", "worst", "minimal", "excellent", "quality", 
          "experience", "reliable", "recommended", "should", "worth", "comparison"])
@@ -343,30 +727,23 @@ def evaluate_results_and_select_urls(state: ResearchState) -> ResearchState:
     
     prompt = ChatPromptTemplate.from_template(prompt_template)
     
-    response = llm.invoke(
+    evaluation, parse_error = invoke_structured(
+        providers.get("llm"),
         prompt.format(
             original_query=original_query,
             analyzed_query=analyzed_query,
             research_plan=state.get("research_plan", {}),
             snippets=json.dumps(all_snippets, indent=2),
             max_urls=config.MAX_URLS_TO_SCRAPE
-        )
+        ),
+        Evaluation,
+        node="evaluate_results_and_select_urls"
     )
-    
-    try:
-        response_text = response.content
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            json_text = response_text.strip()
-            
-        evaluation = json.loads(json_text)
-        logger.info(f"Evaluation complete: {evaluation}")
-    except (json.JSONDecodeError, IndexError) as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        evaluation = {"snippets_sufficient": False, "urls_to_scrape": [], "refine_search": True}
+    if parse_error:
+        # An unreadable evaluation says nothing about the search results, so
+        # don't pay for another research loop; scrape the top results instead.
+        evaluation = Evaluation().model_dump()
+    logger.info(f"Evaluation complete: {evaluation}")
     
     urls_to_scrape = evaluation.get("urls_to_scrape", [])
     snippets_sufficient = evaluation.get("snippets_sufficient", False)
@@ -403,11 +780,93 @@ def evaluate_results_and_select_urls(state: ResearchState) -> ResearchState:
             logger.warning("No clear evaluation direction, defaulting to synthesis")
             next_node = "extract_and_synthesize_information"
     
-    return {
-        **state,
-        "urls_to_scrape": urls_to_scrape[:config.MAX_URLS_TO_SCRAPE],
-        "next_node": next_node
+    # The LLM may echo URLs with tracking parameters or duplicates; scrape each page once, as first listed
+    unique_urls = {}
+    for url in urls_to_scrape:
+        if url:
+            unique_urls.setdefault(url_key(url), url)
+    unique_urls = list(unique_urls.values())[:config.MAX_URLS_TO_SCRAPE]
+    
+    result = {
+        "urls_to_scrape": unique_urls,
+        "next_node": next_node,
+        "evaluation_reasoning": evaluation.get("reasoning", ""),
+        "dedup_stats": dedup_stats
     }
+    if prefetcher is not None:
+        result["prefetch_stats"] = prefetcher.settle(unique_urls if next_node == "scrape_websites" else [])
+    return result
+
+
+def _ranking_query(state: ResearchState) -> str:
+    """The original query plus its key entities, used to rank results and passages locally."""
+    key_entities = state.get("analyzed_query", {}).get("key_entities", []) or []
+    return " ".join([state.get("original_query", "")] + [str(entity) for entity in key_entities])
+
+
+async def _render_page(browser_pool, pages: PageCache, url: str) -> Dict[str, Any]:
+    async with browser_pool.lease() as crawler:
+        with span("external", "crawl4ai", "page_load") as call:
+            result = await crawler.arun(url=url, config=_lazy("CrawlerRunConfig")(cache_mode=_lazy("CacheMode").BYPASS))
+            markdown = str(result.markdown or "")
+            call.payload_bytes = len(markdown)
+            if not markdown:
+                call.outcome = "empty"
+    if not markdown:
+        raise ValueError("Failed to extract content")
+    return await asyncio.to_thread(pages.store_page, url, markdown, getattr(result, "response_headers", None))
+
+
+async def _fetch_page(browser_pool, pages: PageCache, url: str) -> Dict[str, Any]:
+    """Return the page from the cache if fresh or still valid, rendering it otherwise.
+
+    SQLite and HTTP work runs in worker threads, so it does not block the
+    browser pool's event loop that every run's scrapes share.
+    """
+    entry = await asyncio.to_thread(pages.get_page, url)
+    if entry is not None:
+        if pages.is_fresh(entry) or await asyncio.to_thread(pages.revalidate, url, entry):
+            return entry
+    return await _render_page(browser_pool, pages, url)
+
+
+async def _extract_blocks(strategy: Any, url: str, text: str) -> List[Dict[str, Any]]:
+    """
+    Run the page's LLM extraction under the Gemini limiter.
+
+    crawl4ai reports a failed extraction as error blocks rather than raising,
+    so rate-limit errors are recognized either way; they are reported to the
+    limiter and the extraction is retried up to RATE_LIMIT_MAX_RETRIES times.
+    """
+    limiter = get_limiter("gemini")
+    for attempt in range(config.RATE_LIMIT_MAX_RETRIES + 1):
+        async with limiter.async_slot():
+            with span("external", "gemini", "page_extraction") as call:
+                start = time.monotonic()
+                try:
+                    blocks = await strategy.arun(url, [text])
+                except Exception as e:
+                    if not is_rate_limit_error(e):
+                        raise
+                    call.outcome = "rate_limited"
+                    if attempt == config.RATE_LIMIT_MAX_RETRIES:
+                        limiter.record_throttle()
+                        raise
+                    rate_limited = str(e)
+                else:
+                    call.payload_bytes = len(json.dumps(blocks or []))
+                    rate_limited = next((str(block.get("content", "")) for block in blocks or []
+                                         if block.get("error") and is_rate_limit_message(str(block.get("content", "")))),
+                                        None)
+                    if rate_limited is None:
+                        limiter.record_success(time.monotonic() - start)
+                        return blocks
+                    call.outcome = "rate_limited"
+                    if attempt == config.RATE_LIMIT_MAX_RETRIES:
+                        limiter.record_throttle()
+                        return blocks
+        limiter.record_throttle()
+        logger.warning(f"Page extraction for {url} rate limited (attempt {attempt + 1}): {rate_limited}")
 
 
 def scrape_websites(state: ResearchState) -> ResearchState:
@@ -417,65 +876,198 @@ def scrape_websites(state: ResearchState) -> ResearchState:
         state (ResearchState): state containing 'urls_to_scrape'.
 
     Returns:
-        ResearchState: state updated with 'scraped_content' and 'error_log'.
+        ResearchState: state fragment with the pages scraped by this call in
+            'scraped_content' and 'fetched_urls', and their errors in 'error_log'.
     """
     logger.info("Scraping websites with Crawl4AI")
-    
-    import asyncio
 
     original_query = state.get("original_query", "")
-    strategy = LLMExtractionStrategy(
-        llm_config=LLMConfig(provider='gemini/gemini-1.5-flash', api_token=google_api_key),
+    ranking_query = _ranking_query(state)
+    strategy = wrap_extraction(_lazy("LLMExtractionStrategy")(
+        llm_config=_lazy("LLMConfig")(provider='gemini/gemini-1.5-flash', api_token=_google_api_key(),
+                                       base_url=config.GEMINI_BASE_URL or None),
         instruction=f"Extract key insights relevant to the query: {original_query}",
         extraction_type="block"
-    )
-    urls_to_scrape = state.get("urls_to_scrape", [])
-    scraped_content = state.get("scraped_content", {})
+    ))
+    # urls_to_scrape accumulates across iterations; scrape only pages not fetched yet in this run
+    already_fetched = set(state.get("fetched_urls", []))
+    pending = {}
+    for url in state.get("urls_to_scrape", []):
+        key = url_key(url)
+        if key not in already_fetched and key not in pending:
+            pending[key] = url
+    urls_to_scrape = list(pending.values())
+    # Only this node's pages and errors are returned; the state reducers merge them
+    scraped_content = {}
+    fetched_urls = []
+    errors = []
+
+    def record_error(url: str, message: str):
+        errors.append({"type": "scrape_error", "url": url, "message": message})
+
+    browser_pool = get_browser_pool()
+    pages = PageCache()
+
+    async def extract(url: str, entry: Dict[str, Any]) -> str:
+        extraction = await asyncio.to_thread(pages.get_extraction, entry["content_hash"], ranking_query)
+        if extraction is not None:
+            return extraction
+        # Only the passages that match the query and its key entities are sent to the LLM
+        passages = await asyncio.to_thread(select_passages, entry["markdown"], ranking_query)
+        passage_text = "\n\n".join(passages)
+        logger.info(f"Selected {len(passages)} passages ({len(passage_text)} of {len(entry['markdown'])} chars) from {url}")
+        blocks = await _extract_blocks(strategy, url, passage_text)
+        if not blocks or all(block.get("error") for block in blocks):
+            logger.warning(f"LLM extraction returned nothing for {url}, keeping selected passages")
+            return passage_text
+        extraction = json.dumps(blocks)
+        await asyncio.to_thread(pages.store_extraction, entry["content_hash"], ranking_query, extraction)
+        return extraction
+
+    async def scrape_page(url: str) -> str:
+        entry = await scrape_flight.do_async(url_key(url), lambda: _fetch_page(browser_pool, pages, url))
+        return await extraction_flight.do_async(
+            (entry["content_hash"], normalize_query(ranking_query)),
+            lambda: extract(url, entry)
+        )
+
     async def scrape_urls():
-        async with AsyncWebCrawler() as crawler:
-            for url in urls_to_scrape:
-                try:
-                    logger.info(f"Crawl4AI scraping URL: {url}")
-                    result = await crawler.arun(
-                        url=url,
-                        config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS),
-                        extraction_strategy=strategy
-                    )
-                    if getattr(result, 'extracted_content', None):
-                        scraped_content[url] = result.extracted_content
-                        logger.info(f"Stored extracted_content for {url}")
-                    elif result.markdown:
-                        scraped_content[url] = result.markdown
-                        logger.info(f"Successfully scraped {url} with Crawl4AI")
-                    else:
-                        logger.warning(f"No content retrieved from {url}")
-                        error = {"type": "scrape_error", "url": url, "message": "Failed to extract content"}
-                        state["error_log"] = state.get("error_log", []) + [error]
-                except Exception as e:
-                    logger.error(f"Failed to scrape {url} with Crawl4AI: {str(e)}")
-                    error = {"type": "scrape_error", "url": url, "message": str(e)}
-                    state["error_log"] = state.get("error_log", []) + [error]
+        semaphore = asyncio.Semaphore(config.SCRAPE_CONCURRENCY)
+
+        async def scrape_url(url: str):
+            async with semaphore:
+                logger.info(f"Crawl4AI scraping URL: {url}")
+                return await asyncio.wait_for(scrape_page(url), timeout=config.SCRAPE_URL_TIMEOUT)
+
+        tasks = [asyncio.create_task(scrape_url(url)) for url in urls_to_scrape]
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=config.SCRAPE_DEADLINE)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        # Collect in selection order so scraped_content is deterministic
+        for url, task in zip(urls_to_scrape, tasks):
+            if task in pending:
+                logger.warning(f"Scraping deadline of {config.SCRAPE_DEADLINE}s reached before {url} finished")
+                record_error(url, f"Not finished within the {config.SCRAPE_DEADLINE}s scraping deadline")
+                continue
+            if task.cancelled():
+                logger.error(f"Scraping {url} was cancelled")
+                record_error(url, "Scrape was cancelled")
+                continue
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                logger.error(f"Timed out scraping {url} after {config.SCRAPE_URL_TIMEOUT}s")
+                record_error(url, f"Timed out after {config.SCRAPE_URL_TIMEOUT}s")
+                continue
+            if error is not None:
+                logger.error(f"Failed to scrape {url} with Crawl4AI: {str(error)}")
+                record_error(url, str(error))
+                continue
+            scraped_content[url] = task.result()
+            fetched_urls.append(url_key(url))
+            logger.info(f"Stored scraped content for {url}")
     
     try:
-        asyncio.run(scrape_urls())
+        browser_pool.run(scrape_urls)
     except Exception as e:
-        logger.error(f"AsyncWebCrawler failed: {e}")
-        state["error_log"] = state.get("error_log", []) + [{"type": "scrape_error", "message": str(e)}]
+        logger.error(f"Browser pool scrape failed: {e}")
+        errors.append({"type": "scrape_error", "message": str(e)})
 
     return {
-        **state,
-        "scraped_content": scraped_content
+        "scraped_content": scraped_content,
+        "fetched_urls": fetched_urls,
+        "error_log": errors
     }
 
 
+def _summarize_source_group(group: Dict[str, Any], original_query: str,
+                            analyzed_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract per-source key points from one group of sources (the map step)."""
+    prompt = ChatPromptTemplate.from_template("""
+    You are a research analyst extracting evidence for a query.
+    
+    QUERY: {original_query}
+    
+    ANALYZED QUERY: {analyzed_query}
+    
+    SOURCES:
+    {sources}
+    
+    For each labeled source above, list the key points that are relevant to the query, keeping
+    specific facts, figures, dates and opinions, and rate its relevance from 0 to 1.
+    Use only information stated in the source. Skip sources with nothing relevant.
+    
+    Respond in a structured JSON format:
+    {{
+        "sources": [
+            {{"label": "Web 1", "url": "source url", "relevance": 0.8, "key_points": ["point 1", "point 2"]}},
+            ...
+        ]
+    }}
+    """)
+    summaries, _ = invoke_structured(
+        providers.get("llm"),
+        prompt.format(original_query=original_query, analyzed_query=analyzed_query, sources=group["text"]),
+        SourceSummaries,
+        node="summarize_sources"
+    )
+    return (summaries or {}).get("sources", [])
+
+
+def _map_sources(web_results: List[Dict[str, Any]], news_results: List[Dict[str, Any]],
+                 scraped_content: Dict[str, str], original_query: str,
+                 analyzed_query: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """Summarize groups of sources concurrently and merge the results per URL.
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]: {url: {'label', 'relevance', 'key_points'}}
+            and statistics on the groups summarized.
+    """
+    groups = group_sources(web_results, news_results, scraped_content, config.SYNTHESIS_MAP_GROUP_TOKENS)
+    logger.info(f"Summarizing {len(groups)} source groups concurrently")
+    futures = [
+        synthesis_executor.submit(_summarize_source_group, group, original_query, analyzed_query)
+        for group in groups
+    ]
+
+    analyzed_content = {}
+    failures = 0
+    for group, future in zip(groups, futures):
+        try:
+            summaries = future.result()
+        except Exception as e:
+            logger.error(f"Failed to summarize source group: {str(e)}")
+            failures += 1
+            continue
+        for summary in summaries:
+            # Trust our label-to-URL map over a URL echoed by the model
+            url = group["sources"].get(summary["label"]) or summary["url"]
+            if not url or not summary["key_points"]:
+                continue
+            entry = analyzed_content.setdefault(url, {"label": summary["label"], "relevance": 0.0, "key_points": []})
+            entry["relevance"] = max(entry["relevance"], summary["relevance"])
+            entry["key_points"].extend(summary["key_points"])
+
+    return analyzed_content, {"groups": len(groups), "failed_groups": failures, "sources": len(analyzed_content)}
+
+
 def extract_and_synthesize_information(state: ResearchState) -> Dict[str, Any]:
     """Extract data points from sources and combine into a coherent answer.
 
     Args:
         state (ResearchState): state with 'web_results', 'news_results', and 'scraped_content'.
 
+    With SYNTHESIS_MODE "map_reduce", the sources are first summarized in
+    groups concurrently (_map_sources) and the synthesis call works from the
+    per-source key points, packed most relevant first within
+    CONTEXT_TOKEN_BUDGET, instead of the packed raw context.
+
     Returns:
-        Dict[str, Any]: state fragment containing 'synthesized_information'.
+        Dict[str, Any]: state fragment containing 'synthesized_information',
+            'analyzed_content' and 'context_stats'.
     """
     logger.info("Extracting and synthesizing information")
     
@@ -491,8 +1083,9 @@ def extract_and_synthesize_information(state: ResearchState) -> Dict[str, Any]:
     if is_fallback:
         logger.warning("Synthesizing with limited information after exhausting search iterations")
     
-    web_results = state.get("web_results", [])
-    news_results = state.get("news_results", [])
+    web_results, news_results, _ = dedupe_search_results(
+        state.get("web_results", []), state.get("news_results", [])
+    )
     scraped_content = state.get("scraped_content", {})
 
     has_scraped_content = bool(scraped_content)
@@ -512,33 +1105,15 @@ def extract_and_synthesize_information(state: ResearchState) -> Dict[str, Any]:
             }]
         }
     
-    context = []
-    
-    if web_results:
-        context.append("WEB SEARCH RESULTS:")
-        for i, result in enumerate(web_results):
-            context.append(f"[Web {i+1}] Title: {result.get('title', 'No title')}")
-            context.append(f"    URL: {result.get('url', 'No URL')}")
-            context.append(f"    Snippet: {result.get('snippet', 'No snippet')}")
-            context.append("")
-    
-    if news_results:
-        context.append("NEWS SEARCH RESULTS:")
-        for i, result in enumerate(news_results):
-            context.append(f"[News {i+1}] Title: {result.get('title', 'No title')}")
-            context.append(f"    URL: {result.get('url', 'No URL')}")
-            context.append(f"    Date: {result.get('date', 'No date')}")
-            context.append(f"    Source: {result.get('source', 'Unknown source')}")
-            context.append(f"    Summary: {result.get('summary', 'No summary')}")
-            context.append("")
-    
-    if scraped_content:
-        context.append("SCRAPED WEB CONTENT:")
-        for i, (url, content) in enumerate(scraped_content.items()):
-            truncated_content = content[:10000] + "..." if len(content) > 10000 else content
-            context.append(f"[Scraped {i+1}] URL: {url}")
-            context.append(f"Content: {truncated_content}")
-            context.append("")
+    analyzed_content = {}
+    if config.SYNTHESIS_MODE == "map_reduce":
+        analyzed_content, map_stats = _map_sources(web_results, news_results, scraped_content,
+                                                   original_query, analyzed_query)
+    if analyzed_content:
+        context, packing = pack_findings(analyzed_content)
+        context_stats = {"mode": "map_reduce", **map_stats, **packing}
+    else:
+        context, context_stats = pack_context(web_results, news_results, scraped_content, _ranking_query(state))
     
     limitations = []
     if requires_web_scraping and not has_scraped_content:
@@ -622,74 +1197,30 @@ def extract_and_synthesize_information(state: ResearchState) -> Dict[str, Any]:
     if is_fallback:
         fallback_notice = "NOTE: This synthesis is being performed with limited information after exhausting search attempts. The results may be incomplete or less reliable."
 
-    response = llm.invoke(
+    synthesized_info, parse_error = invoke_structured(
+        providers.get("llm"),
         prompt.format(
             original_query=original_query,
             analyzed_query=analyzed_query,
-            context="\n".join(context),
+            context=context,
             fallback_notice=fallback_notice,
             limitations_text=limitations_text
-        )
+        ),
+        Synthesis,
+        node="extract_and_synthesize_information"
     )
     
-    try:
-        response_text = response.content
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            json_text = response_text.strip()
-        
-        json_text = re.sub(r'\s+', ' ', json_text)
-        
-        json_text = re.sub(r',\s*}', '}', json_text)
-        json_text = re.sub(r',\s*]', ']', json_text)
-        
-        try:
-            synthesized_info = json.loads(json_text)
-        except json.JSONDecodeError as json_error:
-            logger.warning(f"Initial JSON parsing failed: {json_error}, attempting more aggressive cleanup")
-            
-            if json_text.startswith('{') and '}' in json_text:
-                clean_json = json_text[json_text.find('{'):json_text.rfind('}')+1]
-                synthesized_info = json.loads(clean_json)
-            else:
-                raise json.JSONDecodeError("Cannot parse JSON", json_text, 0)
-        
+    if synthesized_info is not None:
         logger.info("Information synthesis complete")
-        
-        if "key_topics" not in synthesized_info:
+        # Schema defaults cover the other fields; an empty topic list gets a visible placeholder
+        if not synthesized_info["key_topics"]:
             synthesized_info["key_topics"] = [{
                 "topic": original_query,
                 "key_findings": ["Information extracted but not properly formatted."],
                 "confidence": "low",
                 "supporting_evidence": "Data structure error in synthesis process."
             }]
-        
-        if "information_gaps" not in synthesized_info:
-            synthesized_info["information_gaps"] = ["Information gaps not identified due to formatting issues."]
-        
-        if "source_assessment" not in synthesized_info:
-            synthesized_info["source_assessment"] = "Source assessment unavailable due to data formatting issues."
-        
-        if "recommendations" not in synthesized_info:
-            synthesized_info["recommendations"] = []
-        
-        if "confidence_summary" not in synthesized_info:
-            synthesized_info["confidence_summary"] = {
-                "overall": "low",
-                "reasoning": "Confidence assessment unavailable due to data formatting issues."
-            }
-        elif not isinstance(synthesized_info["confidence_summary"], dict):
-            synthesized_info["confidence_summary"] = {
-                "overall": "low",
-                "reasoning": f"Original confidence data was malformed: {synthesized_info['confidence_summary']}"
-            }
-    
-    except (json.JSONDecodeError, IndexError) as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        logger.error(f"Raw response text: {response_text[:500]}...")
+    else:
         synthesized_info = {
             "key_topics": [{
                 "topic": original_query,
@@ -702,12 +1233,14 @@ def extract_and_synthesize_information(state: ResearchState) -> Dict[str, Any]:
             "recommendations": [],
             "confidence_summary": {
                 "overall": "low",
-                "reasoning": f"Error during information processing: {str(e)}"
+                "reasoning": f"Error during information processing: {parse_error}"
             }
         }
     
     return {
-        "synthesized_information": [synthesized_info]
+        "synthesized_information": [synthesized_info],
+        "analyzed_content": analyzed_content,
+        "context_stats": context_stats
     }
 
 
@@ -777,13 +1310,14 @@ def compile_final_report(state: ResearchState) -> Dict[str, Any]:
         limitations_notice = "IMPORTANT RESEARCH LIMITATIONS:\n- " + "\n- ".join(low_confidence_flags)
         limitations_notice += "\n\nPlease clearly acknowledge these limitations in your report."
     
-    response = llm.invoke(
+    response = providers.get("llm").invoke(
         prompt.format(
             original_query=original_query,
             analyzed_query=analyzed_query,
             synthesized_info=json.dumps(synthesized_info, indent=2),
             limitations_notice=limitations_notice
-        )
+        ),
+        node="compile_final_report"
     )
     
     final_report = "RESEARCH REPORT\n"
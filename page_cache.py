@@ -0,0 +1,145 @@
+"""Content-addressed cache for scraped pages and their per-query extractions."""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+import config
+from cache import PersistentCache, get_cache, make_cache_key, normalize_query
+from cassette import wrap_session
+from tools import get_http_session
+from tracing import span
+from urls import url_key
+
+logger = logging.getLogger(__name__)
+
+_stats = {"fresh_hits": 0, "not_modified": 0, "changed": 0, "rendered": 0,
+          "extraction_hits": 0, "extraction_misses": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def page_cache_stats() -> Dict[str, int]:
+    """Return page freshness and revalidation counters for this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def freshness_ttl(content_type: Optional[str]) -> float:
+    """Return how long a page of the given content type is served without revalidation."""
+    mime = (content_type or "").split(";")[0].strip().lower()
+    return config.PAGE_CACHE_TTLS.get(mime, config.PAGE_CACHE_TTLS["default"])
+
+
+class PageCache:
+    """
+    Scraped page cache keyed by canonical URL, with extractions stored separately.
+
+    Page entries hold the rendered markdown plus the validators (ETag and
+    Last-Modified) from the original response. A page younger than its
+    content type's TTL is served directly. An older page is revalidated with a
+    conditional GET; on 304 it is served again without rendering. Extractions
+    are keyed on the page's content hash and the query, so a changed page
+    never reuses a stale extraction.
+    """
+
+    def __init__(self):
+        self.enabled = config.PAGE_CACHE_ENABLED
+        self.pages: PersistentCache = get_cache(
+            "page_markdown", ttl=config.PAGE_CACHE_RETENTION, max_entries=config.PAGE_CACHE_MAX_ENTRIES
+        )
+        self.extractions: PersistentCache = get_cache(
+            "page_extraction", ttl=config.EXTRACTION_CACHE_TTL, max_entries=config.PAGE_CACHE_MAX_ENTRIES
+        )
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached page entry for url, fresh or not, or None."""
+        if not self.enabled:
+            return None
+        return self.pages.get(url_key(url))
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        fresh = time.time() - entry["fetched_at"] < freshness_ttl(entry.get("content_type"))
+        if fresh:
+            _count("fresh_hits")
+        return fresh
+
+    def revalidate(self, url: str, entry: Dict[str, Any]) -> bool:
+        """
+        Check a stale entry with a conditional GET.
+
+        Returns True (and refreshes the entry) if the server answered 304 Not
+        Modified. Returns False if the page changed, the server sent no
+        validators, or the request failed.
+        """
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            return False
+        try:
+            with span("external", "pages", "revalidate") as call:
+                response = wrap_session(get_http_session("pages"), "pages", include_host=True).get(
+                    url, headers=headers, stream=True,
+                    timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+                )
+                response.close()
+                call.outcome = "not_modified" if response.status_code == 304 else f"http_{response.status_code}"
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Revalidation failed for {url}: {str(e)}")
+            return False
+        if response.status_code != 304:
+            _count("changed")
+            return False
+        _count("not_modified")
+        logger.info(f"Page not modified, reusing cached content for {url}")
+        entry["fetched_at"] = time.time()
+        self.pages.set(url_key(url), entry)
+        return True
+
+    def store_page(self, url: str, markdown: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Store freshly rendered markdown and return the new entry."""
+        _count("rendered")
+        entry = {
+            "url": url,
+            "markdown": markdown,
+            "content_hash": hashlib.sha256(markdown.encode("utf-8")).hexdigest(),
+            "etag": _header(headers, "etag"),
+            "last_modified": _header(headers, "last-modified"),
+            "content_type": _header(headers, "content-type"),
+            "fetched_at": time.time(),
+        }
+        if self.enabled:
+            self.pages.set(url_key(url), entry)
+        return entry
+
+    def _extraction_key(self, content_hash: str, query: str) -> str:
+        return make_cache_key(content_hash=content_hash, query=normalize_query(query))
+
+    def get_extraction(self, content_hash: str, query: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        extraction = self.extractions.get(self._extraction_key(content_hash, query))
+        _count("extraction_hits" if extraction is not None else "extraction_misses")
+        return extraction
+
+    def store_extraction(self, content_hash: str, query: str, extraction: str):
+        if self.enabled:
+            self.extractions.set(self._extraction_key(content_hash, query), extraction)
@@ -0,0 +1,70 @@
+"""Rule-based research planner used before falling back to the LLM planner."""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NEWS_TYPES = ("news", "update", "current", "latest", "announcement")
+FACT_TYPES = ("fact", "definition", "technical", "explanation", "historical", "how-to", "instruction")
+JUDGEMENT_TYPES = ("opinion", "review", "comparison", "analysis", "pros/cons", "recommendation")
+
+
+def _info_type(analyzed_query: Dict[str, Any]) -> str:
+    info_type = analyzed_query.get("info_type") or ""
+    if isinstance(info_type, (list, tuple)):
+        info_type = " ".join(str(item) for item in info_type)
+    return str(info_type).lower()
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def _matches(info_type: str, keywords: Tuple[str, ...]) -> bool:
+    return any(keyword in info_type for keyword in keywords)
+
+
+def heuristic_plan(analyzed_query: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], float]:
+    """
+    Decide the search approach from the query analysis without calling the LLM.
+
+    Uses only info_type, time_sensitive and depth_required. Confidence is
+    high for the common cases the LLM planner answers predictably (simple
+    evergreen facts go to web search, time-sensitive news goes to news
+    search) and low for subjective or mixed queries, where the caller should
+    ask the LLM instead.
+
+    Returns:
+        The research plan, or None if no rule applies, and the rule's confidence in [0, 1].
+    """
+    info_type = _info_type(analyzed_query)
+    time_sensitive = _flag(analyzed_query.get("time_sensitive"))
+    depth = str(analyzed_query.get("depth_required") or "medium").lower()
+    is_news = _matches(info_type, NEWS_TYPES)
+    is_fact = _matches(info_type, FACT_TYPES)
+    needs_judgement = _matches(info_type, JUDGEMENT_TYPES)
+
+    if needs_judgement and (time_sensitive or depth == "high"):
+        return None, 0.3
+    if is_news and time_sensitive:
+        approach, confidence = ("parallel_search", 0.75) if depth == "high" else ("news_search", 0.8)
+    elif time_sensitive:
+        approach, confidence = "parallel_search", 0.7
+    elif is_fact and not needs_judgement:
+        confidence = {"low": 0.95, "medium": 0.85}.get(depth, 0.6)
+        approach = "web_search"
+    elif needs_judgement:
+        approach, confidence = "web_search", 0.6
+    else:
+        approach, confidence = "web_search", 0.5
+
+    plan = {
+        "search_approach": approach,
+        "priority_info": list(analyzed_query.get("key_entities") or []),
+        "source_priorities": ["news", "general"] if approach != "web_search" else ["general"],
+        "search_refinement_needed": False,
+    }
+    return plan, confidence
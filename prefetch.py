@@ -0,0 +1,82 @@
+"""Speculative page prefetching while the evaluator decides what to scrape."""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List
+
+from browser_pool import BrowserPool
+from ranking import BM25Index
+from urls import url_key
+
+logger = logging.getLogger(__name__)
+
+_stats = {"started": 0, "hits": 0, "adopted_in_flight": 0, "misses": 0,
+          "wasted": 0, "cancelled": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+
+def prefetch_stats() -> Dict[str, int]:
+    """Return prefetch outcome counters for this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def rank_candidates(snippets: List[Dict[str, Any]], query: str, limit: int) -> List[str]:
+    """Return the URLs of the `limit` search results that score best against the query."""
+    snippets = [s for s in snippets if s.get("url")]
+    if not snippets or limit <= 0:
+        return []
+    index = BM25Index([f"{s.get('title', '')} {s.get('snippet', '')}" for s in snippets])
+    return [snippets[i]["url"] for i, _ in index.top_k(query, limit)]
+
+
+class Prefetcher:
+    """
+    Fetch likely scrape targets into the page cache before they are selected.
+
+    Fetches run on the browser pool's event loop (without LLM extraction)
+    while the caller carries on. `settle` is called with the URLs actually
+    selected: matching prefetches are left to finish and are picked up by the
+    scrape through the page cache or the in-flight fetch, and the rest are
+    cancelled. Fetches go through the shared single-flight group, so
+    cancelling one only detaches this run; a page another run is waiting for
+    keeps loading. Pages already fetched but not selected are counted as wasted.
+    """
+
+    def __init__(self, browser_pool: BrowserPool, fetch: Callable[[str], Awaitable[Any]]):
+        self.browser_pool = browser_pool
+        self.fetch = fetch
+        self.futures: Dict[str, Future] = {}
+
+    def start(self, urls: List[str]):
+        for url in urls:
+            key = url_key(url)
+            if key and key not in self.futures:
+                self.futures[key] = self.browser_pool.submit(lambda url=url: self.fetch(url))
+        if self.futures:
+            logger.info(f"Speculatively prefetching {len(self.futures)} pages")
+
+    def settle(self, selected_urls: List[str]) -> Dict[str, int]:
+        """Adopt prefetches that were selected, cancel the rest and return this run's outcome counts."""
+        selected = {url_key(url) for url in selected_urls}
+        outcome = {"started": len(self.futures), "hits": 0, "adopted_in_flight": 0,
+                   "misses": len(selected - set(self.futures)), "wasted": 0, "cancelled": 0, "failed": 0}
+        for key, future in self.futures.items():
+            if key in selected:
+                if not future.done():
+                    outcome["adopted_in_flight"] += 1
+                elif future.cancelled() or future.exception() is not None:
+                    outcome["failed"] += 1
+                else:
+                    outcome["hits"] += 1
+            elif future.done():
+                outcome["wasted"] += 1
+            else:
+                future.cancel()
+                outcome["cancelled"] += 1
+        with _stats_lock:
+            for name, count in outcome.items():
+                _stats[name] += count
+        logger.info(f"Prefetch settled: {outcome}")
+        return outcome
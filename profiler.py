@@ -0,0 +1,234 @@
+"""Per-run profiling split by graph node: cProfile stats, sampled stacks and wall vs CPU time."""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_active: ContextVar[Optional["RunProfile"]] = ContextVar("active_profile", default=None)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]+$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class RunProfile:
+    """
+    Profile of one research run.
+
+    Every node execution is timed (wall, CPU of the node's thread, and CPU
+    of the whole process) and run under cProfile; stats are merged per node.
+    A sampler thread records the stack of every thread running a node every
+    `sample_interval` seconds, prefixed with the node name, as folded stacks
+    for flamegraph.pl or speedscope. Sampling is wall-clock, so stacks
+    blocked on the network show up as well. With `all_threads` the other
+    threads of the process (search fan-out, browser pool loop) are sampled
+    too; leave it off when other requests share the process.
+    """
+
+    def __init__(self, label: str, sample_interval: float = None, all_threads: bool = False):
+        slug = re.sub(r"[^0-9A-Za-z]+", "-", label).strip("-")[:40] or "run"
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:6]}"
+        self.label = label
+        self.sample_interval = sample_interval or config.PROFILE_SAMPLE_INTERVAL
+        self.all_threads = all_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._node_threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = self._wall = self._cpu = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._cpu = time.process_time()
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._wall = time.perf_counter() - self._started
+        self._cpu = time.process_time() - self._cpu
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                node_threads = dict(self._node_threads)
+            if not node_threads and not self.all_threads:
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                node = node_threads.get(thread_id)
+                if node is None:
+                    if not self.all_threads:
+                        continue
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    prefix = f"thread {names.get(thread_id, thread_id)}"
+                else:
+                    prefix = f"node {node}"
+                self.stacks[f"{prefix};{_fold(frame)}"] += 1
+            self.samples += 1
+
+    @contextmanager
+    def node(self, name: str) -> Iterator[None]:
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._node_threads[thread_id] = name
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is active in this interpreter (Python 3.12+)
+            profile = None
+        wall, cpu, process_cpu = time.perf_counter(), time.thread_time(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            process_cpu = time.process_time() - process_cpu
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self._node_threads.pop(thread_id, None)
+                timing = self._timings.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                                         "process_cpu_seconds": 0.0})
+                timing["calls"] += 1
+                timing["wall_seconds"] += wall
+                timing["cpu_seconds"] += cpu
+                timing["process_cpu_seconds"] += process_cpu
+                if profile is not None:
+                    if name in self._stats:
+                        self._stats[name].add(profile)
+                    else:
+                        self._stats[name] = pstats.Stats(profile)
+
+    def _top_functions(self, name: str, limit: int = 10) -> List[Dict[str, Any]]:
+        stats = self._stats.get(name)
+        if stats is None:
+            return []
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [{
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "own_seconds": own,
+            "cumulative_seconds": cumulative,
+        } for (filename, line, func), (_, calls, own, cumulative, _) in rows]
+
+    def summary(self) -> Dict[str, Any]:
+        """Wall vs CPU time per node (CPU of the node's own thread and of the whole process)."""
+        with self._lock:
+            timings = {name: dict(timing) for name, timing in self._timings.items()}
+        for name, timing in timings.items():
+            timing["wait_seconds"] = max(0.0, timing["wall_seconds"] - timing["cpu_seconds"])
+            timing["cpu_share"] = timing["cpu_seconds"] / timing["wall_seconds"] if timing["wall_seconds"] else 0.0
+            timing["top_functions"] = self._top_functions(name)
+        return {
+            "id": self.id,
+            "label": self.label,
+            "wall_seconds": self._wall,
+            "process_cpu_seconds": self._cpu,
+            "sample_interval": self.sample_interval,
+            "samples": self.samples,
+            "nodes": timings,
+        }
+
+    def save(self, directory: str = None) -> str:
+        """
+        Write the profile to <directory>/<id>/ and return that path.
+
+        Files: summary.json, stacks.folded (flamegraph.pl / speedscope input)
+        and one <node>.prof per node (pstats / snakeviz input).
+        """
+        path = os.path.join(directory or config.PROFILE_DIR, self.id)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "summary.json"), "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(os.path.join(path, "stacks.folded"), "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with self._lock:
+            for name, stats in self._stats.items():
+                stats.dump_stats(os.path.join(path, f"{name}.prof"))
+        logger.info(f"Profile written to {path}")
+        return path
+
+
+@contextmanager
+def profile_run(label: str, all_threads: bool = False) -> Iterator[RunProfile]:
+    """Profile every node executed inside the block (in this context and the graph's worker threads)."""
+    run = RunProfile(label, all_threads=all_threads)
+    token = _active.set(run)
+    run.start()
+    try:
+        yield run
+    finally:
+        run.stop()
+        _active.reset(token)
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[None]:
+    """Profile a node execution if a run profile is active, otherwise do nothing."""
+    run = _active.get()
+    if run is None:
+        yield
+        return
+    with run.node(name):
+        yield
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Render a run summary as a plain-text table of wall vs CPU time per node."""
+    lines = [f"{'node':<38} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'wait s':>9} {'cpu %':>6}"]
+    nodes = sorted(summary["nodes"].items(), key=lambda item: item[1]["wall_seconds"], reverse=True)
+    for name, timing in nodes:
+        lines.append(f"{name:<38} {timing['calls']:>5} {timing['wall_seconds']:>9.3f} {timing['cpu_seconds']:>9.3f} "
+                     f"{timing['wait_seconds']:>9.3f} {timing['cpu_share'] * 100:>5.0f}%")
+    lines.append(f"{'total':<38} {'':>5} {summary['wall_seconds']:>9.3f} {summary['process_cpu_seconds']:>9.3f}")
+    return "\n".join(lines)
+
+
+def load_profile_file(profile_id: str, filename: str, directory: str = None) -> Optional[str]:
+    """Read a file of a saved profile, or None if the id or file does not exist."""
+    if not PROFILE_ID_PATTERN.match(profile_id) or filename not in ("summary.json", "stacks.folded"):
+        return None
+    path = os.path.join(directory or config.PROFILE_DIR, profile_id, filename)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return f.read()
@@ -0,0 +1,43 @@
+"""Registry of lazily constructed clients shared by the graph nodes."""
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, factory: Callable[[], Any]):
+    """Register how to build a client; nothing is constructed until get(name) is called."""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get(name: str) -> Any:
+    """Return the shared client for name, building it on first use."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _instances.get(name)
+        if instance is None:
+            if name not in _factories:
+                raise KeyError(f"No provider registered as {name!r}")
+            logger.debug(f"Initializing provider {name}")
+            instance = _factories[name]()
+            _instances[name] = instance
+        return instance
+
+
+def reset(name: str = None):
+    """Drop built clients (all of them, or just name) so the next get() rebuilds them."""
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
@@ -0,0 +1,134 @@
+"""Local BM25 passage ranking for scraped pages."""
+
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+import config
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor not
+now of off on once only or other our ours out over own same she should so some such than that the
+their them then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_markdown(markdown: str, target_words: int = None) -> List[str]:
+    """
+    Split markdown into passages of roughly target_words words.
+
+    Paragraphs (blank-line separated blocks) are packed together until the
+    target is reached; a single paragraph longer than the target is split on
+    word boundaries.
+    """
+    target_words = target_words or config.PASSAGE_WORDS
+    passages = []
+    current: List[str] = []
+    current_words = 0
+    for paragraph in re.split(r"\n\s*\n", markdown):
+        words = paragraph.split()
+        if not words:
+            continue
+        if len(words) > target_words:
+            if current:
+                passages.append("\n\n".join(current))
+                current, current_words = [], 0
+            for start in range(0, len(words), target_words):
+                passages.append(" ".join(words[start:start + target_words]))
+            continue
+        if current_words + len(words) > target_words and current:
+            passages.append("\n\n".join(current))
+            current, current_words = [], 0
+        current.append(paragraph.strip())
+        current_words += len(words)
+    if current:
+        passages.append("\n\n".join(current))
+    return passages
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a list of passages with array-backed term statistics.
+
+    Term occurrences are stored as parallel numpy arrays (term id, passage id,
+    count) sorted by term, so scoring a query touches only the postings of its
+    terms and is vectorized across passages.
+    """
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(passages)
+        self.vocabulary = {}
+        term_ids, doc_ids = [], []
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for doc_id, passage in enumerate(passages):
+            tokens = tokenize(passage)
+            lengths[doc_id] = len(tokens)
+            for token in tokens:
+                term_ids.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                doc_ids.append(doc_id)
+
+        pairs = np.array([term_ids, doc_ids], dtype=np.int64).reshape(2, -1)
+        unique_pairs, counts = np.unique(pairs, axis=1, return_counts=True)
+        # np.unique sorts pairs by term id first, giving contiguous postings per term
+        self.post_terms = unique_pairs[0]
+        self.post_docs = unique_pairs[1]
+        self.post_counts = counts.astype(np.float64)
+        doc_freq = np.bincount(self.post_terms, minlength=len(self.vocabulary)).astype(np.float64)
+        self.idf = np.log(1 + (self.size - doc_freq + 0.5) / (doc_freq + 0.5))
+        average = lengths.mean() if self.size else 0.0
+        self.length_norm = self.k1 * (1 - self.b + self.b * lengths / (average or 1.0))
+
+    def scores(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every passage for the query."""
+        scores = np.zeros(self.size, dtype=np.float64)
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start = np.searchsorted(self.post_terms, term_id, side="left")
+            end = np.searchsorted(self.post_terms, term_id, side="right")
+            docs = self.post_docs[start:end]
+            tf = self.post_counts[start:end]
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+        return scores
+
+    def top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Return up to k (passage index, score) pairs, best first."""
+        scores = self.scores(query)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(i), float(scores[i])) for i in order]
+
+
+def select_passages(markdown: str, query: str, k: int = None, max_chars: int = None) -> List[str]:
+    """
+    Return the passages of a page most relevant to the query, in page order.
+
+    At most k passages are kept, and if max_chars is given, passages are
+    added best first while they fit in the character budget.
+    """
+    k = k or config.PASSAGES_PER_PAGE
+    passages = chunk_markdown(markdown)
+    if len(passages) <= 1:
+        return passages
+    ranked = BM25Index(passages).top_k(query, k)
+    selected = []
+    used = 0
+    for index, _ in ranked:
+        if max_chars is not None and used + len(passages[index]) > max_chars and selected:
+            continue
+        selected.append(index)
+        used += len(passages[index])
+    return [passages[i] for i in sorted(selected)]
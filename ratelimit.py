@@ -0,0 +1,170 @@
+"""Process-wide rate limiting for external providers."""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `capacity` tokens."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1 or self.rate <= 0:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus an AIMD concurrency limit for a single provider.
+
+    Callers take a slot with `with limiter.slot():` (or `async with
+    limiter.async_slot():` on an event loop) and block until both a
+    concurrency slot and a rate token are available. Throttling responses
+    halve the concurrency limit and request rate and pause new calls for the
+    retry-after period; successful calls faster than the latency target grow
+    them back additively. Calls slower than the target shrink concurrency
+    gently before the provider starts rejecting requests.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, max_concurrency: int,
+                 latency_target: Optional[float] = None, min_concurrency: int = 1):
+        self.name = name
+        self.base_rate = rate
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = float(max_concurrency)
+        self.throttled = 0
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    self._cond.wait(timeout=self._paused_until - now)
+                elif self._in_flight >= int(self.limit):
+                    self._cond.wait(timeout=1.0)
+                else:
+                    break
+            self._in_flight += 1
+        try:
+            self.bucket.acquire()
+        except BaseException:
+            self._release()
+            raise
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Wait for capacity, then hold a concurrency slot for the duration of the call."""
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """slot() for coroutines; the wait runs in a worker thread so the event loop keeps running."""
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker thread still takes the slot; give it back once it has
+            acquiring.add_done_callback(lambda done: done.cancelled() or done.exception() or self._release())
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def record_success(self, latency: float):
+        """Additively increase capacity, or back off slightly if the call was slow."""
+        with self._cond:
+            if self.latency_target and latency > self.latency_target:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / max(self.limit, 1))
+                if self.bucket.rate < self.base_rate:
+                    self.bucket.set_rate(min(self.base_rate, self.bucket.rate + self.base_rate * 0.1))
+            self._cond.notify_all()
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicatively decrease capacity and pause new calls after a rate-limit response."""
+        with self._cond:
+            self.throttled += 1
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self.bucket.set_rate(max(self.base_rate * 0.1, self.bucket.rate / 2))
+            pause = retry_after if retry_after is not None else config.RATE_LIMIT_BACKOFF
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"{self.name} rate limited, concurrency limit now {int(self.limit)}, "
+                       f"rate {self.bucket.rate:.2f}/s, pausing {pause:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self._in_flight,
+                "rate": self.bucket.rate,
+                "throttled": self.throttled,
+            }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> AdaptiveLimiter:
+    """Return the process-wide limiter for a provider configured in config.RATE_LIMITS."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = AdaptiveLimiter(provider, **config.RATE_LIMITS[provider])
+            _limiters[provider] = limiter
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Return statistics for every limiter created in this process."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
@@ -0,0 +1,219 @@
+"""Retries, hedging and circuit breaking for external provider calls."""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Runs primary and hedged attempts so the caller can wait on whichever finishes first
+_hedge_executor = ThreadPoolExecutor(max_workers=config.HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("call_deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the provider's circuit is open."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when no time is left in the caller's deadline for another attempt."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Bound the provider calls made in this context, including their retries, to `seconds` from now."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there is none."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected for `reset_timeout` seconds. The first call after that is let
+    through as a probe: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Return the pct percentile, or None until min_samples latencies were recorded."""
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff delay for a zero-based retry attempt."""
+    return random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def hedged_call(fn: Callable[[], Any], hedge_after: Optional[float]) -> Any:
+    """
+    Call fn, sending one duplicate call if the first has not finished after hedge_after seconds.
+
+    The first successful result wins. If one attempt fails, the other is still
+    awaited; the error is raised only if both fail. Attempts run in the
+    caller's context, so they share its deadline.
+    """
+    if hedge_after is None:
+        return fn()
+    primary = _hedge_executor.submit(contextvars.copy_context().run, fn)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+    logger.info(f"Call exceeded {hedge_after:.2f}s, sending hedged request")
+    pending = {primary, _hedge_executor.submit(contextvars.copy_context().run, fn)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+class ResilientCaller:
+    """
+    Apply circuit breaking, jittered exponential retries and p95 hedging to calls for one provider.
+
+    `retry_on` decides whether an exception is transient; other exceptions are
+    raised immediately without retrying and count as the provider answering,
+    so they never open (or keep open) the circuit. Inside a `deadline`, a retry is only
+    made if its backoff delay ends before the deadline.
+    """
+
+    def __init__(self, name: str, retry_on: Callable[[Exception], bool] = lambda e: True):
+        self.name = name
+        self.retry_on = retry_on
+        self.breaker = CircuitBreaker(name, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
+        self.latency = LatencyTracker()
+
+    def _attempt(self, fn: Callable[[], Any]) -> Any:
+        hedge_after = None
+        if config.HEDGE_ENABLED:
+            hedge_after = self.latency.percentile(95, min_samples=config.HEDGE_MIN_SAMPLES)
+        start = time.monotonic()
+        result = hedged_call(fn, hedge_after)
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        for attempt in range(config.RETRY_ATTEMPTS):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.name}")
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceededError(f"Deadline reached before {self.name} call attempt {attempt + 1}")
+            try:
+                result = self._attempt(fn)
+            except Exception as e:
+                if not self.retry_on(e):
+                    # The provider answered; a bad request says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == config.RETRY_ATTEMPTS - 1:
+                    raise
+                delay = backoff_delay(attempt)
+                remaining = remaining_time()
+                if remaining is not None and delay >= remaining:
+                    logger.warning(f"{self.name} call failed (attempt {attempt + 1}): {str(e)}, no time left to retry")
+                    raise
+                logger.warning(f"{self.name} call failed (attempt {attempt + 1}): {str(e)}, retrying in {delay:.2f}s")
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "p95_latency": self.latency.percentile(95),
+        }
+
+
+_callers: Dict[str, ResilientCaller] = {}
+_callers_lock = threading.Lock()
+
+
+def get_caller(name: str, retry_on: Callable[[Exception], bool] = lambda e: True) -> ResilientCaller:
+    """Return the process-wide ResilientCaller for a provider, creating it on first use."""
+    with _callers_lock:
+        caller = _callers.get(name)
+        if caller is None:
+            caller = ResilientCaller(name, retry_on)
+            _callers[name] = caller
+        return caller
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    """Return circuit and latency statistics for every provider caller in this process."""
+    with _callers_lock:
+        callers = list(_callers.values())
+    return {caller.name: caller.stats() for caller in callers}
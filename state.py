@@ -12,26 +12,46 @@ def dict_merge(dict1: Dict[str, T], dict2: Dict[str, T]) -> Dict[str, T]:
     result.update(dict2)
     return result
 
+# Custom reducer function to merge lists without repeating items
+def merge_unique(list1: List[T], list2: List[T]) -> List[T]:
+    """Append the items of list2 that are not already in list1, keeping order."""
+    result = list(list1)
+    seen = set(result)
+    for item in list2:
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+    return result
+
 class ResearchState(TypedDict, total=False):
     """State maintained throughout the research process."""
     
     # Input and analysis
     original_query: str  # This should not be modified by parallel nodes
+    run_options: Dict[str, Any]  # Per-run settings: disable_news, fused_planning, planner_mode
     analyzed_query: Dict[str, Any]  # Intent, keywords, type of info needed
     
     # Search and planning
     search_queries: List[str]  # Generated search terms
     research_plan: Dict[str, Any]  # Strategy with steps
+    plan_decision: Dict[str, Any]  # Which planner produced research_plan, its confidence and the rule-based choice
     
-    # Results from tools - Use Annotated types with reducers for parallel node updates
+    # Results from tools - Use Annotated types with reducers for parallel node updates.
+    # Nodes return only the items they add; returning the whole list would append it to itself.
     web_results: Annotated[List[Dict[str, Any]], operator.add]  # [{'url': str, 'snippet': str, 'title': str}]
     news_results: Annotated[List[Dict[str, Any]], operator.add]  # [{'url': str, 'title': str, 'summary': str, 'date': str}]
     urls_to_scrape: Annotated[List[str], operator.add]
+    executed_queries: Annotated[Dict[str, List[str]], dict_merge]  # {provider: normalized queries already searched}
+    fetched_urls: Annotated[List[str], merge_unique]  # url_key of every page already scraped in this run
+    evaluation_reasoning: str  # Why the last evaluation found the results sufficient or not
+    dedup_stats: Dict[str, Any]  # Duplicates and prompt characters removed before evaluation
+    prefetch_stats: Dict[str, Any]  # Speculative fetches adopted, cancelled or wasted in this run
     scraped_content: Annotated[Dict[str, str], dict_merge]  # {url: content}
     
     # Processed information
     analyzed_content: Annotated[Dict[str, Dict[str, Any]], dict_merge]  # {url: {'relevance': float, 'key_points': List[str]}}
     synthesized_information: Annotated[List[Dict[str, Any]], operator.add]  # Structured extracted data
+    context_stats: Dict[str, Any]  # Token budget usage and sources dropped from the synthesis prompt
     
     # Output
     final_report: str
@@ -0,0 +1,254 @@
+"""Schema-constrained LLM output: typed response schemas, local JSON repair and validation."""
+
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Literal, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class QueryAnalysis(BaseModel):
+    main_topic: str = ""
+    specific_request: str = ""
+    info_type: str = "facts"
+    time_sensitive: bool = False
+    key_entities: List[str] = []
+    subjective_criteria: List[str] = []
+    depth_required: Literal["low", "medium", "high"] = "medium"
+    regional_context: Optional[str] = None
+    search_queries: List[str] = []
+    requires_web_scraping: bool = False
+
+
+class ResearchPlan(BaseModel):
+    search_approach: Literal["web_search", "news_search", "parallel_search"] = "web_search"
+    priority_info: List[str] = []
+    source_priorities: List[str] = []
+    search_refinement_needed: bool = False
+
+
+class AnalysisAndPlan(BaseModel):
+    analysis: QueryAnalysis = QueryAnalysis()
+    plan: ResearchPlan = ResearchPlan()
+
+
+class QueryRefinement(BaseModel):
+    search_queries: List[str] = []
+    reasoning: str = ""
+
+
+class RequirementCheck(BaseModel):
+    aspect: str = ""
+    sufficient: bool = False
+    reason: str = ""
+
+
+class Evaluation(BaseModel):
+    requirements: List[RequirementCheck] = []
+    snippets_sufficient: bool = False
+    urls_to_scrape: List[str] = []
+    refine_search: bool = False
+    reasoning: str = ""
+
+
+class SourceSummary(BaseModel):
+    label: str = ""
+    url: str = ""
+    relevance: float = 0.0
+    key_points: List[str] = []
+
+
+class SourceSummaries(BaseModel):
+    sources: List[SourceSummary] = []
+
+
+class KeyTopic(BaseModel):
+    topic: str = ""
+    key_findings: List[str] = []
+    confidence: str = "low"
+    supporting_evidence: str = ""
+
+
+class ConfidenceSummary(BaseModel):
+    overall: str = "low"
+    reasoning: str = "Confidence assessment unavailable due to data formatting issues."
+
+
+class Synthesis(BaseModel):
+    key_topics: List[KeyTopic] = []
+    information_gaps: List[str] = ["Information gaps not identified due to formatting issues."]
+    source_assessment: str = "Source assessment unavailable due to data formatting issues."
+    recommendations: List[str] = []
+    confidence_summary: ConfidenceSummary = ConfidenceSummary()
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM response cannot be repaired into the expected schema."""
+
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _count(node: str, outcome: str):
+    with _stats_lock:
+        counters = _stats.setdefault(node, {"parsed": 0, "repaired": 0, "failed": 0})
+        counters[outcome] += 1
+
+
+def structured_output_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-node counts of responses parsed cleanly, repaired locally, or unusable."""
+    with _stats_lock:
+        return {node: dict(counters) for node, counters in _stats.items()}
+
+
+def response_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Model call options asking Gemini for JSON that conforms to the schema."""
+    if not config.STRUCTURED_OUTPUT_ENABLED:
+        return {}
+    return {"response_mime_type": "application/json", "response_json_schema": schema.model_json_schema()}
+
+
+def _close_brackets(text: str) -> str:
+    """Close strings, arrays and objects left open by a truncated response."""
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    text = re.sub(r",\s*$", "", text.rstrip())
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """
+    Apply cheap fixes for the usual ways a model breaks JSON.
+
+    Strips markdown fences and surrounding prose, // comments, trailing
+    commas and Python literals, and closes brackets left open by truncation.
+    """
+    if "```" in text:
+        fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+        if fenced:
+            text = fenced.group(1)
+    start = text.find("{")
+    if start == -1:
+        raise StructuredOutputError("No JSON object in response")
+    end = text.rfind("}")
+    text = text[start:end + 1] if end > start and text.count("{") == text.count("}") else text[start:]
+    text = re.sub(r'(?<!:)//[^\n"]*', "", text)
+    text = re.sub(r"\bTrue\b", "true", text)
+    text = re.sub(r"\bFalse\b", "false", text)
+    text = re.sub(r"\bNone\b", "null", text)
+    text = _close_brackets(text)
+    return re.sub(r",\s*([}\]])", r"\1", text)
+
+
+def _drop_invalid_fields(data: Dict[str, Any], error: ValidationError) -> bool:
+    """Remove the fields named in a validation error so their defaults apply."""
+    dropped = False
+    for issue in error.errors():
+        container, key = data, None
+        for part in issue["loc"]:
+            if key is not None:
+                container = container[key] if isinstance(container, (dict, list)) else None
+            if isinstance(container, dict) and part in container:
+                key = part
+            elif isinstance(container, list) and isinstance(part, int) and part < len(container):
+                key = part
+            else:
+                break
+        if isinstance(container, dict) and key in container:
+            del container[key]
+            dropped = True
+        elif isinstance(container, list) and isinstance(key, int) and key < len(container):
+            container.pop(key)
+            dropped = True
+    return dropped
+
+
+def parse_structured(text: str, schema: Type[BaseModel]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse and validate a model response against a schema.
+
+    Returns:
+        The validated data and whether local repair was needed.
+
+    Raises:
+        StructuredOutputError: if no valid object can be recovered.
+    """
+    repaired = False
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        repaired = True
+        try:
+            data = json.loads(repair_json(text))
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"Unrepairable JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"Expected a JSON object, got {type(data).__name__}")
+
+    for _ in range(3):
+        try:
+            return schema.model_validate(data).model_dump(), repaired
+        except ValidationError as e:
+            repaired = True
+            if not _drop_invalid_fields(data, e):
+                break
+    raise StructuredOutputError(f"Response does not match {schema.__name__}")
+
+
+def _parses_cleanly(text: str, schema: Type[BaseModel]) -> bool:
+    """Whether the text is valid for the schema without local repair."""
+    try:
+        return not parse_structured(text, schema)[1]
+    except StructuredOutputError:
+        return False
+
+
+def invoke_structured(llm: Any, prompt: Any, schema: Type[BaseModel], node: str
+                      ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Call the LLM in JSON-schema response mode and return validated data.
+
+    Only responses that match the schema without repair are cached, so a
+    truncated or malformed response is requested again next time.
+
+    Returns:
+        The validated data and None, or None and the error message if the
+        response could not be recovered; the caller supplies its own default.
+    """
+    response = llm.invoke(prompt, node=node, validate=lambda text: _parses_cleanly(text, schema),
+                          **response_format(schema))
+    text = response.content if isinstance(response.content, str) else str(response.content)
+    try:
+        data, repaired = parse_structured(text, schema)
+    except StructuredOutputError as e:
+        _count(node, "failed")
+        logger.error(f"Failed to parse {node} response: {e}. Raw response: {text[:500]}")
+        return None, str(e)
+    _count(node, "repaired" if repaired else "parsed")
+    if repaired:
+        logger.warning(f"Repaired malformed {schema.__name__} response from {node}")
+    return data, None
@@ -0,0 +1,30 @@
+import pytest
+import cache
+import config
+import providers
+import ratelimit
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep persistent caches out of the working tree and independent between tests."""
+    monkeypatch.setattr(config, "CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache, "_caches", {})
+    monkeypatch.setattr(cache, "_memory_caches", {})
+
+
+@pytest.fixture(autouse=True)
+def placeholder_providers(monkeypatch):
+    """Build clients with placeholder API keys and undo providers registered by a test."""
+    for key in ("GOOGLE_API_KEY", "TAVILY_API_KEY"):
+        monkeypatch.setenv(key, "test-key")
+    monkeypatch.setattr(providers, "_factories", dict(providers._factories))
+    providers.reset()
+    yield
+    providers.reset()
+
+
+@pytest.fixture(autouse=True)
+def isolated_limiters(monkeypatch):
+    """Give every test fresh provider limiters, so one test's calls do not slow the next."""
+    monkeypatch.setattr(ratelimit, "_limiters", {})
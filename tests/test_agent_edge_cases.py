@@ -11,9 +11,19 @@ def test_missing_google_api_key(monkeypatch):
     monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
     sys.modules.pop("config", None)
     sys.modules.pop("nodes", None)
+    import nodes
+    import providers
+    # Clients are built on first use, so the missing key surfaces there rather than at import
+    providers.reset("llm")
     with pytest.raises(ValueError) as excinfo:
-        import nodes 
+        providers.get("llm")
     assert "GOOGLE_API_KEY is required" in str(excinfo.value)
+    providers.reset("llm")
+
+def test_provider_attributes_cannot_be_reassigned():
+    import nodes
+    with pytest.raises(AttributeError, match="providers.register"):
+        nodes.web_search_tool = object()
 
 class DummyAgent:
     def invoke(self, state):
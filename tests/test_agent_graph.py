@@ -0,0 +1,59 @@
+import pytest
+
+import agent
+import nodes
+
+
+@pytest.fixture
+def visited(monkeypatch):
+    calls = []
+
+    def node(name, update):
+        def run(state):
+            calls.append(name)
+            return update(state)
+        return run
+
+    plan = {"research_plan": {"search_approach": "parallel_search"}, "search_queries": ["q"]}
+    monkeypatch.setattr(nodes, "analyze_query", node("analyze_query", lambda s: {**s, "analyzed_query": {}}))
+    monkeypatch.setattr(nodes, "analyze_and_plan", node("analyze_and_plan", lambda s: {**s, **plan}))
+    monkeypatch.setattr(nodes, "plan_research_strategy", node("plan_research_strategy", lambda s: {**s, **plan}))
+    monkeypatch.setattr(nodes, "execute_web_search", node("execute_web_search", lambda s: {"web_results": []}))
+    monkeypatch.setattr(nodes, "execute_news_search", node("execute_news_search", lambda s: {"news_results": []}))
+    monkeypatch.setattr(nodes, "evaluate_results_and_select_urls", node(
+        "evaluate_results_and_select_urls", lambda s: {**s, "next_node": "extract_and_synthesize_information"}))
+    monkeypatch.setattr(nodes, "extract_and_synthesize_information", node(
+        "extract_and_synthesize_information", lambda s: {}))
+    monkeypatch.setattr(nodes, "compile_final_report", node(
+        "compile_final_report", lambda s: {"final_report": str(s.get("run_options"))}))
+    monkeypatch.setattr(agent, "_agent", agent.create_web_research_agent())
+    return calls
+
+
+def test_graph_is_compiled_once(monkeypatch):
+    monkeypatch.setattr(agent, "_agent", None)
+    assert agent.get_web_research_agent() is agent.get_web_research_agent()
+
+
+def test_run_options_select_the_variant_per_run(visited, monkeypatch):
+    monkeypatch.setattr(agent.config, "DISABLE_NEWS_SEARCH", False)
+    monkeypatch.setattr(agent.config, "FUSED_PLANNING", False)
+
+    agent.run_web_research_agent("query")
+    assert visited[:2] == ["analyze_query", "plan_research_strategy"]
+    assert "execute_news_search" in visited
+
+    visited.clear()
+    result = agent.run_web_research_agent("query", {"disable_news": True, "fused_planning": True})
+    assert visited[0] == "analyze_and_plan"
+    assert "execute_news_search" not in visited
+    assert "'disable_news': True" in result["final_report"]
+
+
+def test_resolve_run_options_validates(monkeypatch):
+    monkeypatch.setattr(agent.config, "PLANNER_MODE", "hybrid")
+    assert agent.resolve_run_options({"planner_mode": None})["planner_mode"] == "hybrid"
+    with pytest.raises(ValueError):
+        agent.resolve_run_options({"planner_mode": "fast"})
+    with pytest.raises(ValueError):
+        agent.resolve_run_options({"unknown": True})
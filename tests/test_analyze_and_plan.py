@@ -0,0 +1,42 @@
+import json
+import pytest
+import nodes
+from agent import create_web_research_agent
+
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+def test_analyze_and_plan_single_call(monkeypatch):
+    calls = []
+    content = json.dumps({
+        "analysis": {"main_topic": "batteries", "search_queries": ["solid state battery progress"]},
+        "plan": {"search_approach": "parallel_search", "priority_info": [], "source_priorities": []},
+    })
+
+    def invoke(self, prompt, *args, **kwargs):
+        calls.append(prompt)
+        return DummyResponse(f"```json\n{content}\n```")
+
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", invoke)
+    updated = nodes.analyze_and_plan({"original_query": "solid state batteries"})
+    assert len(calls) == 1
+    assert updated["search_queries"] == ["solid state battery progress"]
+    assert updated["research_plan"]["search_approach"] == "parallel_search"
+    assert updated["iteration_count"]["total_research"] == 1
+
+
+def test_analyze_and_plan_invalid_json_falls_back(monkeypatch):
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", lambda self, *args, **kwargs: DummyResponse('{"plan": {}}'))
+    updated = nodes.analyze_and_plan({"original_query": "test"})
+    assert updated["search_queries"] == ["test"]
+    assert updated["research_plan"]["search_approach"] == "web_search"
+
+
+def test_graph_has_both_planning_entry_points():
+    graph = create_web_research_agent().get_graph()
+    starts = {edge.target for edge in graph.edges if edge.source == "__start__"}
+    assert starts == {"analyze_and_plan", "analyze_query"}
+    assert "plan_research_strategy" in graph.nodes
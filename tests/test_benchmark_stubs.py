@@ -0,0 +1,41 @@
+import json
+
+import pytest
+import requests
+
+import config
+from benchmarks.stubs import Stubs
+from structured import Evaluation, parse_structured
+from tools import NewsAggregatorTool, TavilySearchTool
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    with Stubs("instant") as running:
+        for name, value in running.endpoints().items():
+            monkeypatch.setattr(config, name, value)
+        monkeypatch.setattr(config, "SEARCH_CACHE_ENABLED", False)
+        yield running
+
+
+def test_search_tools_use_configured_endpoints(stubs):
+    web = TavilySearchTool(api_key="key").search("solid state batteries", num_results=3)
+    news = NewsAggregatorTool(api_key="key").search_news("solid state batteries", num_results=2)
+    assert len(web) == 3 and len(news) == 2
+    assert all(result["url"].startswith(stubs.site.url) for result in web + news)
+    assert requests.get(web[0]["url"]).text.count("<p>") == stubs.site.paragraphs
+    assert stubs.stats()["tavily"]["requests"] == 1
+
+
+def test_gemini_stub_answers_with_the_requested_schema(stubs):
+    page = stubs.site.page_url("batteries", 0)
+    body = {
+        "contents": [{"role": "user", "parts": [{"text": f"ORIGINAL QUERY: batteries\n[{json.dumps(page)}]"}]}],
+        "generationConfig": {"responseMimeType": "application/json",
+                             "responseJsonSchema": Evaluation.model_json_schema()},
+    }
+    response = requests.post(f"{stubs.gemini.url}/v1beta/models/test:generateContent", json=body).json()
+    evaluation, repaired = parse_structured(response["candidates"][0]["content"]["parts"][0]["text"], Evaluation)
+    assert not repaired
+    assert evaluation["urls_to_scrape"] == [page]
+    assert evaluation["snippets_sufficient"] is False
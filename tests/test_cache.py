@@ -0,0 +1,39 @@
+import time
+import pytest
+from cache import PersistentCache, make_cache_key, normalize_query
+
+
+def test_cache_roundtrip_and_counters(tmp_path):
+    store = PersistentCache("test", ttl=60, max_entries=10, path=str(tmp_path / "c.sqlite3"))
+    key = make_cache_key(query=normalize_query("  Quantum   Computing "), num_results=5)
+    assert key == make_cache_key(num_results=5, query="quantum computing")
+    assert store.get(key) is None
+    store.set(key, [{"url": "http://a.com"}])
+    assert store.get(key) == [{"url": "http://a.com"}]
+    stats = store.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+
+def test_cache_expiry_and_persistence(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    store = PersistentCache("test", ttl=60, max_entries=10, path=path)
+    store.set("fresh", 1)
+    store.set("stale", 2, ttl=0.01)
+    time.sleep(0.05)
+    reopened = PersistentCache("test", ttl=60, max_entries=10, path=path)
+    assert reopened.get("fresh") == 1
+    assert reopened.get("stale") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    store = PersistentCache("test", ttl=60, max_entries=2, path=str(tmp_path / "c.sqlite3"))
+    store.set("a", 1)
+    time.sleep(0.01)
+    store.set("b", 2)
+    time.sleep(0.01)
+    store.get("a")
+    time.sleep(0.01)
+    store.set("c", 3)
+    assert store.get("b") is None
+    assert store.get("a") == 1
+    assert store.get("c") == 3
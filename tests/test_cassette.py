@@ -0,0 +1,92 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+from langchain_core.messages import AIMessage
+
+from cassette import Cassette, CassetteCrawler, CassetteMissError, CassetteModel, CassetteSession, RecordedError
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = 0
+
+    def request(self, method, url, params=None, json=None, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = b'{"results": [{"url": "http://a.com"}]}'
+        return response
+
+
+class FakeModel:
+    model = "gemini-test"
+    temperature = 0.1
+
+    def invoke(self, prompt, **kwargs):
+        if prompt == "fail":
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return AIMessage(content=f"answer to {prompt}")
+
+
+class FakeCrawler:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def arun(self, url, **kwargs):
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(markdown=f"# {url}", response_headers={"etag": '"v1"'})
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "run.jsonl.gz")
+
+
+def test_search_session_replays_without_network_or_credentials(path):
+    session = FakeSession()
+    recorder = CassetteSession(session, "newsapi", Cassette(path, "record"))
+    recorder.get("https://newsapi.org/v2/everything", params={"q": "ai", "apiKey": "secret"})
+
+    player = CassetteSession(FakeSession(), "newsapi", Cassette(path, "replay", time_scale=0))
+    response = player.get("http://127.0.0.1:9/v2/everything", params={"q": "ai", "apiKey": "other"})
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"url": "http://a.com"}]}
+    assert player.session.calls == 0
+    with pytest.raises(CassetteMissError):
+        player.get("http://127.0.0.1:9/v2/everything", params={"q": "other query"})
+
+
+def test_model_replays_responses_and_errors(path):
+    recorder = CassetteModel(FakeModel(), Cassette(path, "record"))
+    recorder.invoke("question", response_mime_type="application/json")
+    with pytest.raises(RuntimeError):
+        recorder.invoke("fail")
+
+    player = CassetteModel(FakeModel(), Cassette(path, "replay", time_scale=0))
+    assert player.invoke("question", response_mime_type="application/json").content == "answer to question"
+    with pytest.raises(RecordedError, match="429"):
+        player.invoke("fail")
+    with pytest.raises(CassetteMissError):
+        player.invoke("question")  # different call options
+    assert player.model == "gemini-test"
+
+
+def test_crawler_replay_scales_recorded_timing(path):
+    async def crawl(crawler):
+        async with crawler:
+            start = time.monotonic()
+            result = await crawler.arun(url="http://a.com")
+            return result, time.monotonic() - start
+
+    asyncio.run(crawl(CassetteCrawler(FakeCrawler(), Cassette(path, "record"))))
+    result, elapsed = asyncio.run(crawl(CassetteCrawler(None, Cassette(path, "replay", time_scale=2))))
+    assert result.markdown == "# http://a.com"
+    assert result.response_headers == {"etag": '"v1"'}
+    assert elapsed >= 0.09
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import pytest
+from coalesce import SingleFlight
+
+
+def test_concurrent_sync_calls_share_one_execution():
+    flight = SingleFlight("test")
+    executions = []
+    results = []
+
+    def work():
+        executions.append(1)
+        time.sleep(0.1)
+        return ["result"]
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(executions) == 1
+    assert results == [["result"]] * 5
+    assert flight.stats() == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+
+def test_async_callers_on_different_loops_share_result_and_errors():
+    flight = SingleFlight("test")
+    executions = []
+    outcomes = []
+
+    async def work():
+        executions.append(1)
+        await asyncio.sleep(0.1)
+        raise RuntimeError("page failed")
+
+    def run():
+        try:
+            asyncio.run(flight.do_async("url", work))
+        except RuntimeError as e:
+            outcomes.append(str(e))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(executions) == 1
+    assert outcomes == ["page failed"] * 3
+
+
+def test_key_released_after_completion():
+    flight = SingleFlight("test")
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_cancelled_leader_does_not_fail_live_follower():
+    flight = SingleFlight("test")
+    executions = []
+
+    async def work():
+        executions.append(1)
+        await asyncio.sleep(0.2)
+        return "page"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("url", work))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(flight.do_async("url", work))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "page"
+    assert len(executions) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_work_cancelled_once_no_caller_waits():
+    flight = SingleFlight("test")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.2)
+        finished.append(1)
+
+    async def main():
+        caller = asyncio.create_task(flight.do_async("url", work))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+    assert finished == []
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,67 @@
+import pytest
+import config
+from context_packer import estimate_tokens, group_sources, pack_context, pack_findings
+
+
+def make_web(n):
+    return [{"url": f"http://site{i}.com", "title": f"Result {i}", "snippet": "general filler text " * 20}
+            for i in range(n)]
+
+
+def test_context_stays_within_budget_with_stable_labels(monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_TOKEN_BUDGET", 600)
+    web = make_web(40)
+    web[30]["snippet"] = "fusion reactor tokamak plasma confinement record"
+    context, report = pack_context(web, [], {}, "fusion reactor plasma")
+    assert report["used_tokens"] <= 600
+    assert estimate_tokens(context) <= 700
+    assert "[Web 31] Title: Result 30" in context
+    assert any(d["label"] == "Web 40" for d in report["dropped"])
+    assert "[Web 1] Title: Result 0" in context
+
+
+def test_unused_share_flows_to_other_sources(monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_TOKEN_BUDGET", 2000)
+    page = "\n\n".join(f"Paragraph {i} about battery chemistry and lithium supply." for i in range(200))
+    context, report = pack_context([], [], {"http://page.com": page}, "lithium battery")
+    assert report["used_tokens"] > 2000 * config.CONTEXT_BUDGET_SHARES["scraped"]
+    assert report["used_tokens"] <= 2000
+    assert context.startswith("SCRAPED WEB CONTENT:\n[Scraped 1] URL: http://page.com")
+    assert report["dropped"][0]["partial"] is True
+
+
+def test_small_inputs_are_kept_whole():
+    web = make_web(2)
+    news = [{"url": "http://n.com", "title": "N", "summary": "s", "date": "2024-01-01", "source": "Src"}]
+    context, report = pack_context(web, news, {"http://p.com": "page text"}, "query")
+    assert report["dropped"] == []
+    for label in ["[Web 1]", "[Web 2]", "[News 1]", "[Scraped 1]"]:
+        assert label in context
+
+
+def test_group_sources_covers_everything_within_group_budget():
+    page = "\n\n".join(f"Paragraph {i} about battery chemistry and lithium supply." for i in range(200))
+    web = make_web(10)
+    groups = group_sources(web, [], {"http://page.com": page}, max_tokens=500)
+    assert len(groups) > 2
+    assert all(estimate_tokens(group["text"]) <= 550 for group in groups)
+    labels = [label for group in groups for label in group["sources"]]
+    assert [f"Web {i}" for i in range(1, 11)] == [label for label in labels if label.startswith("Web")]
+    assert sum(1 for group in groups if "Scraped 1" in group["sources"]) > 1
+    assert "Paragraph 199" in groups[-1]["text"]
+
+
+def test_findings_are_packed_by_relevance_within_budget(monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_TOKEN_BUDGET", 300)
+    findings = {
+        f"http://site{i}.com": {"label": f"Web {i+1}", "relevance": 0.9 if i == 20 else 0.1,
+                                "key_points": [f"finding {j} about lithium supply" for j in range(5)]}
+        for i in range(40)
+    }
+    context, report = pack_findings(findings)
+    assert report["used_tokens"] <= 300
+    assert estimate_tokens(context) <= 300
+    assert context.split("\n")[1].startswith("[Web 21] URL: http://site20.com")
+    assert "[Web 40]" not in context
+    assert any(d["label"] == "Web 40" and not d["partial"] for d in report["dropped"])
+    assert report["included"]["sources"] + sum(not d["partial"] for d in report["dropped"]) == 40
@@ -35,8 +35,9 @@ def test_evaluate_invalid_json(monkeypatch):
         "research_plan": {}
     }
     updated = evaluate_results_and_select_urls(state)
-    assert updated.get("urls_to_scrape") == []
-    assert updated.get("next_node") == "plan_research_strategy"
+    # An unparseable evaluation must not cost another research loop
+    assert updated.get("urls_to_scrape") == ["http://example.com"]
+    assert updated.get("next_node") == "scrape_websites"
 
 
 def test_evaluate_snippets_sufficient(monkeypatch):
@@ -52,4 +53,19 @@ def test_evaluate_snippets_sufficient(monkeypatch):
     }
     updated = evaluate_results_and_select_urls(state)
     assert updated.get("urls_to_scrape") == []
-    assert updated.get("next_node") == "extract_and_synthesize_information" 
\ No newline at end of file
+    assert updated.get("next_node") == "extract_and_synthesize_information" 
+
+def test_selected_urls_keep_their_original_form(monkeypatch):
+    content = ('{"snippets_sufficient": false, "refine_search": false, '
+               '"urls_to_scrape": ["https://www.example.com/a/?ref=home", "https://example.com/a"]}')
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", lambda self, *args, **kwargs: DummyResponse(content))
+    state = {
+        "web_results": [{"url": "https://www.example.com/a/?ref=home", "snippet": "snippet", "title": "title"}],
+        "news_results": [],
+        "error_log": [],
+        "analyzed_query": {"info_type": "facts"},
+        "original_query": "simple query",
+        "research_plan": {}
+    }
+    updated = evaluate_results_and_select_urls(state)
+    assert updated.get("urls_to_scrape") == ["https://www.example.com/a/?ref=home"]
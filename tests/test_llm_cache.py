@@ -0,0 +1,80 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+import cache
+import config
+import llm_client
+from llm_client import LLMClient, llm_cache_stats
+from ratelimit import AdaptiveLimiter
+from structured import Evaluation, invoke_structured
+
+
+class Model:
+    model = "gemini-test"
+    temperature = 0.1
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, prompt, **kwargs):
+        self.calls.append(prompt)
+        return AIMessage(content=f"answer {len(self.calls)}")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_client, "_cache_stats", {})
+    monkeypatch.setattr(config, "LLM_CACHE_POLICIES", {
+        "cached": {"enabled": True, "ttl": 60},
+        "uncached": {"enabled": False, "ttl": 60},
+    })
+    return LLMClient(Model(), AdaptiveLimiter("gemini", rate=100, burst=100, max_concurrency=2))
+
+
+def test_identical_prompt_is_served_from_memory(client):
+    first = client.invoke("prompt", node="cached")
+    second = client.invoke("prompt", node="cached")
+    assert first.content == second.content == "answer 1"
+    assert len(client.model.calls) == 1
+    assert llm_cache_stats()["cached"]["misses"] == 1
+    assert llm_cache_stats()["cached"]["memory_hits"] == 1
+
+
+def test_persistent_tier_survives_memory_loss(client, monkeypatch):
+    client.invoke("prompt", node="cached")
+    monkeypatch.setattr(cache, "_memory_caches", {})
+    assert client.invoke("prompt", node="cached").content == "answer 1"
+    assert client.invoke("prompt", node="cached").content == "answer 1"
+    stats = llm_cache_stats()["cached"]
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert len(client.model.calls) == 1
+
+
+def test_key_covers_prompt_and_model_settings(client):
+    client.invoke("prompt", node="cached")
+    client.invoke("other prompt", node="cached")
+    client.model.temperature = 0.7
+    client.invoke("prompt", node="cached")
+    assert len(client.model.calls) == 3
+
+
+def test_disabled_and_unnamed_calls_bypass_cache(client):
+    client.invoke("prompt", node="uncached")
+    client.invoke("prompt", node="uncached")
+    client.invoke("prompt")
+    assert len(client.model.calls) == 3
+    stats = llm_cache_stats()
+    assert stats["uncached"]["bypassed"] == 2 and stats["unnamed"]["bypassed"] == 1
+
+
+def test_responses_failing_validation_are_not_cached(client):
+    # "answer N" is not JSON, so every call reaches the model
+    assert invoke_structured(client, "prompt", Evaluation, node="cached")[0] is None
+    assert invoke_structured(client, "prompt", Evaluation, node="cached")[0] is None
+    assert len(client.model.calls) == 2
+
+    client.model.invoke = lambda prompt, **kwargs: AIMessage(content='{"refine_search": true}')
+    invoke_structured(client, "prompt", Evaluation, node="cached")
+    data, _ = invoke_structured(client, "prompt", Evaluation, node="cached")
+    assert data["refine_search"] is True
+    assert llm_cache_stats()["cached"]["memory_hits"] == 1
@@ -0,0 +1,69 @@
+import pytest
+import config
+import nodes
+from planner import heuristic_plan
+
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+@pytest.mark.parametrize("analysis, approach", [
+    ({"info_type": "facts", "time_sensitive": False, "depth_required": "low"}, "web_search"),
+    ({"info_type": "technical explanations", "time_sensitive": "false", "depth_required": "medium"}, "web_search"),
+    ({"info_type": "news updates", "time_sensitive": True, "depth_required": "medium"}, "news_search"),
+    ({"info_type": ["news", "facts"], "time_sensitive": True, "depth_required": "high"}, "parallel_search"),
+])
+def test_heuristic_plan_confident_cases(analysis, approach):
+    plan, confidence = heuristic_plan(analysis)
+    assert plan["search_approach"] == approach
+    assert confidence >= config.PLANNER_CONFIDENCE_THRESHOLD
+
+
+def test_heuristic_plan_defers_subjective_queries():
+    plan, confidence = heuristic_plan({"info_type": "opinions/comparison", "time_sensitive": False,
+                                       "depth_required": "high"})
+    assert plan is None
+    assert confidence < config.PLANNER_CONFIDENCE_THRESHOLD
+
+
+def _state(analysis):
+    return {"analyzed_query": analysis, "iteration_count": {"total_research": 0},
+            "max_iterations": {"total_research": 3}}
+
+
+def test_plan_skips_llm_for_simple_queries(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", fail)
+    monkeypatch.setattr(config, "PLANNER_MODE", "hybrid")
+    updated = nodes.plan_research_strategy(_state({"info_type": "facts", "time_sensitive": False,
+                                                   "depth_required": "low", "key_entities": ["boiling point"]}))
+    assert updated["research_plan"]["search_approach"] == "web_search"
+    assert updated["plan_decision"]["source"] == "heuristic"
+
+
+def test_plan_falls_back_to_llm_and_records_agreement(monkeypatch):
+    content = '{"search_approach": "parallel_search", "priority_info": [], "source_priorities": []}'
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", lambda self, *args, **kwargs: DummyResponse(content))
+    monkeypatch.setattr(config, "PLANNER_MODE", "shadow")
+    updated = nodes.plan_research_strategy(_state({"info_type": "facts", "time_sensitive": False,
+                                                   "depth_required": "low"}))
+    decision = updated["plan_decision"]
+    assert updated["research_plan"]["search_approach"] == "parallel_search"
+    assert decision["source"] == "llm"
+    assert decision["heuristic_approach"] == "web_search"
+    assert decision["agrees_with_heuristic"] is False
+
+
+def test_run_option_overrides_planner_mode(monkeypatch):
+    content = '{"search_approach": "news_search", "priority_info": [], "source_priorities": []}'
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", lambda self, *args, **kwargs: DummyResponse(content))
+    monkeypatch.setattr(config, "PLANNER_MODE", "hybrid")
+    state = {**_state({"info_type": "facts", "time_sensitive": False, "depth_required": "low"}),
+             "run_options": {"planner_mode": "llm"}}
+    updated = nodes.plan_research_strategy(state)
+    assert updated["plan_decision"]["mode"] == "llm"
+    assert updated["research_plan"]["search_approach"] == "news_search"
@@ -0,0 +1,54 @@
+import contextvars
+import json
+import os
+import threading
+import time
+
+from profiler import load_profile_file, profile_run
+from tracing import trace_node
+
+
+def crunch(state):
+    deadline = time.thread_time() + 0.15
+    while time.thread_time() < deadline:
+        json.loads(json.dumps({"values": list(range(200))}))
+    return state
+
+
+def wait(state):
+    time.sleep(0.15)
+    return state
+
+
+def test_profile_splits_wall_and_cpu_time_per_node(tmp_path):
+    with profile_run("cpu vs network") as run:
+        trace_node("crunch", crunch)({})
+        # LangGraph runs parallel branches in worker threads with the caller's context
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(trace_node("wait", wait), {}))
+        worker.start()
+        worker.join()
+
+    nodes = run.summary()["nodes"]
+    assert nodes["crunch"]["calls"] == 1 and nodes["wait"]["calls"] == 1
+    assert nodes["crunch"]["cpu_share"] > 0.5
+    assert nodes["wait"]["cpu_share"] < 0.5
+    assert nodes["wait"]["wait_seconds"] >= 0.1
+    assert any("loads" in row["function"] for row in nodes["crunch"]["top_functions"])
+    assert any(stack.startswith("node wait;") and "wait (test_profiler.py" in stack for stack in run.stacks)
+
+    path = run.save(str(tmp_path))
+    assert {"summary.json", "stacks.folded", "crunch.prof", "wait.prof"} <= set(os.listdir(path))
+    assert json.loads(load_profile_file(run.id, "summary.json", str(tmp_path)))["label"] == "cpu vs network"
+
+
+def test_nodes_are_not_profiled_outside_a_run():
+    with profile_run("other") as run:
+        pass
+    trace_node("crunch", lambda state: state)({})
+    assert run.summary()["nodes"] == {}
+
+
+def test_load_profile_file_rejects_unknown_paths(tmp_path):
+    assert load_profile_file("../etc", "summary.json", str(tmp_path)) is None
+    assert load_profile_file("missing", "summary.json", str(tmp_path)) is None
+    assert load_profile_file("missing", "passwd", str(tmp_path)) is None
@@ -0,0 +1,33 @@
+import pytest
+from ranking import BM25Index, chunk_markdown, select_passages
+
+
+def test_chunk_markdown_packs_and_splits_paragraphs():
+    markdown = "one two three\n\nfour five\n\n" + " ".join(["word"] * 25)
+    passages = chunk_markdown(markdown, target_words=10)
+    assert passages[0] == "one two three\n\nfour five"
+    assert [len(p.split()) for p in passages[1:]] == [10, 10, 5]
+
+
+def test_bm25_prefers_matching_passages():
+    passages = [
+        "The weather today is sunny with a light breeze.",
+        "Quantum computers use qubits; quantum error correction protects qubits.",
+        "Classical computers use bits and transistors.",
+        "",
+    ]
+    index = BM25Index(passages)
+    ranked = index.top_k("quantum error correction", 2)
+    assert ranked[0][0] == 1
+    assert ranked[0][1] > ranked[1][1]
+    assert index.scores("nothing matches")[:3].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_select_passages_finds_content_past_page_head():
+    filler = "\n\n".join(f"Navigation menu item {i} about cookies and subscriptions." for i in range(300))
+    relevant = "Solid-state batteries improve energy density and charging safety."
+    markdown = filler + "\n\n" + relevant
+    selected = select_passages(markdown, "solid-state battery energy density", k=2)
+    assert markdown.index(relevant) > 10000
+    assert any(relevant in passage for passage in selected)
+    assert sum(len(p) for p in selected) < len(markdown) / 10
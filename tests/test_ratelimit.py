@@ -0,0 +1,122 @@
+import threading
+import time
+import pytest
+import config
+import tools
+from llm_client import LLMClient
+from ratelimit import AdaptiveLimiter, TokenBucket
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_aimd_adjusts_concurrency(monkeypatch):
+    limiter = AdaptiveLimiter("test", rate=100, burst=100, max_concurrency=8, latency_target=1.0)
+    limiter.record_throttle(retry_after=0)
+    assert limiter.stats()["concurrency_limit"] == 4
+    for _ in range(10):
+        limiter.record_success(0.01)
+    assert limiter.stats()["concurrency_limit"] > 4
+    limiter.record_success(5.0)
+    assert limiter.limit < 8
+
+
+def test_slot_caps_concurrency():
+    limiter = AdaptiveLimiter("test", rate=1000, burst=1000, max_concurrency=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with limiter.slot():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+
+
+class StatusResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": "0"}
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+def test_tavily_waits_out_429(monkeypatch):
+    responses = [StatusResponse(429), StatusResponse(200, {"results": [{"url": "http://a.com", "title": "A", "content": "s"}]})]
+    tool = tools.TavilySearchTool(api_key="key")
+    tool.limiter = AdaptiveLimiter("tavily", rate=100, burst=100, max_concurrency=4)
+    monkeypatch.setattr(tool.session, "post", lambda url, **kwargs: responses.pop(0))
+    results = tool.search("rate limited query")
+    assert results[0]["url"] == "http://a.com"
+    assert tool.limiter.throttled == 1
+
+
+class QuotaError(Exception):
+    code = 429
+
+
+def test_llm_client_retries_rate_limit_errors(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_BACKOFF", 0)
+    attempts = []
+
+    class Model:
+        def invoke(self, prompt, **kwargs):
+            attempts.append(prompt)
+            if len(attempts) == 1:
+                raise QuotaError("quota exceeded")
+            return "ok"
+
+    client = LLMClient(Model(), AdaptiveLimiter("gemini", rate=100, burst=100, max_concurrency=2))
+    assert client.invoke("prompt") == "ok"
+    assert len(attempts) == 2
+
+
+def test_page_extraction_uses_gemini_limiter_and_backs_off(monkeypatch):
+    import asyncio
+    import nodes
+
+    monkeypatch.setattr(config, "RATE_LIMIT_BACKOFF", 0)
+    limiter = AdaptiveLimiter("gemini", rate=1000, burst=1000, max_concurrency=1)
+    monkeypatch.setattr(nodes, "get_limiter", lambda provider: limiter)
+    active, peak, calls = [], [], []
+
+    class Strategy:
+        async def arun(self, url, sections):
+            calls.append(url)
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.02)
+            active.pop()
+            if calls.count(url) == 1 and url.endswith("a"):
+                return [{"index": 0, "error": True, "content": "litellm.RateLimitError: 429 RESOURCE_EXHAUSTED"}]
+            return [{"index": 0, "content": f"insights from {url}"}]
+
+    async def extract_all():
+        return await asyncio.gather(*(nodes._extract_blocks(Strategy(), url, "text") for url in ("a", "b", "c")))
+
+    results = asyncio.run(extract_all())
+    assert [blocks[0]["content"] for blocks in results] == ["insights from a", "insights from b", "insights from c"]
+    assert max(peak) == 1
+    assert limiter.stats()["throttled"] == 1
+    assert calls.count("a") == 2
@@ -0,0 +1,113 @@
+import json
+import pytest
+import config
+import nodes
+
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+def test_web_search_skips_queries_already_run(monkeypatch):
+    searched = []
+
+    def fake_search(query, num_results=10):
+        searched.append(query)
+        return [{"url": f"http://{query.replace(' ', '')}.com", "title": query, "snippet": query}]
+
+    monkeypatch.setattr(nodes.web_search_tool, "search", fake_search)
+    state = {"search_queries": ["Old Query", "new query", "new  query"], "original_query": "test",
+             "executed_queries": {"web": ["old query"], "news": ["new query"]}}
+    updated = nodes.execute_web_search(state)
+    assert searched == ["new query"]
+    assert updated["executed_queries"] == {"web": ["old query", "new query"]}
+
+
+def test_search_with_nothing_new_makes_no_requests(monkeypatch):
+    monkeypatch.setattr(nodes.news_tool, "search_news", lambda *args, **kwargs: pytest.fail("unexpected search"))
+    updated = nodes.execute_news_search({"search_queries": ["q"], "executed_queries": {"news": ["q"]}})
+    assert updated["news_results"] == []
+
+
+def _refinement_state():
+    return {
+        "original_query": "battery recycling",
+        "analyzed_query": {"info_type": "facts", "depth_required": "low"},
+        "search_queries": ["battery recycling"],
+        "executed_queries": {"web": ["battery recycling"]},
+        "evaluation_reasoning": "No cost figures",
+        "iteration_count": {"total_research": 1},
+        "max_iterations": {"total_research": 3},
+    }
+
+
+def test_refinement_replaces_queries_with_new_ones(monkeypatch):
+    prompts = []
+    content = json.dumps({"search_queries": ["Battery Recycling", "lithium recycling cost per tonne"]})
+
+    def invoke(self, prompt, *args, **kwargs):
+        prompts.append(prompt)
+        return DummyResponse(content)
+
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", invoke)
+    monkeypatch.setattr(config, "PLANNER_MODE", "hybrid")
+    updated = nodes.plan_research_strategy(_refinement_state())
+    assert updated["search_queries"] == ["lithium recycling cost per tonne"]
+    assert updated["research_plan"]["search_approach"] == "web_search"
+    assert "No cost figures" in str(prompts[0])
+
+
+def test_refinement_without_new_queries_goes_to_synthesis(monkeypatch):
+    content = json.dumps({"search_queries": ["battery recycling"]})
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", lambda self, *args, **kwargs: DummyResponse(content))
+    updated = nodes.plan_research_strategy(_refinement_state())
+    assert updated["search_queries"] == []
+    assert updated["research_plan"]["search_approach"] == "extract_and_synthesize_information"
+
+
+def test_refinement_loop_adds_each_search_result_once(monkeypatch):
+    import agent
+    import providers
+
+    refinements = []
+
+    def invoke(self, prompt, *args, **kwargs):
+        prompt = str(prompt)
+        if "SEARCHES ALREADY RUN" in prompt:
+            refinements.append(prompt)
+            return DummyResponse(json.dumps({"search_queries": [f"refined query {len(refinements)}"]}))
+        if "evaluating search results" in prompt:
+            return DummyResponse(json.dumps({"snippets_sufficient": False, "urls_to_scrape": [], "refine_search": True}))
+        if "create a research plan" in prompt:
+            return DummyResponse(json.dumps({"search_approach": "web_search"}))
+        if "synthesizing information" in prompt:
+            return DummyResponse(json.dumps({"key_topics": [{"topic": "t", "key_findings": ["f"]}]}))
+        if "Analyze the following research query" in prompt:
+            return DummyResponse(json.dumps({"info_type": "facts", "depth_required": "low",
+                                             "search_queries": ["first query"]}))
+        return DummyResponse("report")
+
+    class FakeSearch:
+        def __init__(self):
+            self.calls = 0
+
+        def search(self, query, num_results=10):
+            self.calls += 1
+            return [{"url": f"http://site{i}.com", "title": query, "snippet": query} for i in range(3)]
+
+    search = FakeSearch()
+    providers.register("web_search", lambda: search)
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", invoke)
+    monkeypatch.setattr(config, "FUSED_PLANNING", False)
+    monkeypatch.setattr(config, "PLANNER_MODE", "llm")
+    monkeypatch.setattr(config, "DISABLE_NEWS_SEARCH", True)
+    monkeypatch.setattr(config, "SPECULATIVE_PREFETCH", False)
+    monkeypatch.setattr(agent, "_agent", None)
+
+    result = agent.run_web_research_agent("battery recycling")
+    assert len(refinements) >= 5
+    assert search.calls == len(refinements) + 1
+    # Each search adds its three results once; the list must not grow with the number of nodes run
+    assert len(result["web_results"]) == 3 * search.calls
+    assert len(result["error_log"]) == 0
@@ -0,0 +1,126 @@
+import time
+import pytest
+import requests
+import config
+import nodes
+import providers
+import resilience
+import tools
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, deadline, hedged_call
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(config, "HEDGE_ENABLED", False)
+
+
+def test_retries_transient_failures():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise requests.exceptions.ConnectionError("reset")
+        return "ok"
+
+    caller = ResilientCaller("test")
+    assert caller.call(flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_non_retryable_error_is_raised_immediately():
+    attempts = []
+
+    def bad_request():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    caller = ResilientCaller("test", retry_on=lambda e: not isinstance(e, ValueError))
+    with pytest.raises(ValueError):
+        caller.call(bad_request)
+    assert len(attempts) == 1
+
+
+def test_non_retryable_errors_do_not_open_the_circuit(monkeypatch):
+    monkeypatch.setattr(config, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    caller = ResilientCaller("test", retry_on=lambda e: not isinstance(e, ValueError))
+
+    def bad_request():
+        raise ValueError("bad request")
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            caller.call(bad_request)
+    assert caller.stats()["circuit"] == "closed"
+    assert caller.call(lambda: "ok") == "ok"
+
+
+def test_retries_stop_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(resilience, "backoff_delay", lambda attempt: 5)
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise requests.exceptions.ConnectionError("reset")
+
+    start = time.monotonic()
+    with deadline(1), pytest.raises(requests.exceptions.ConnectionError):
+        ResilientCaller("test").call(failing)
+    assert time.monotonic() - start < 0.5
+    assert len(attempts) == 1
+
+
+def test_circuit_opens_and_probes_after_timeout():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_hedged_call_returns_faster_duplicate():
+    calls = []
+
+    def slow_then_fast():
+        calls.append(1)
+        time.sleep(0.5 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    start = time.monotonic()
+    assert hedged_call(slow_then_fast, hedge_after=0.05) == 2
+    assert time.monotonic() - start < 0.4
+
+
+def test_tavily_failure_surfaces_in_error_log():
+    tool = tools.TavilySearchTool(api_key="key")
+    tool.resilience = ResilientCaller("tavily", retry_on=tools.is_transient_error)
+
+    class RefusingSession:
+        def post(self, url, **kwargs):
+            raise requests.exceptions.ConnectionError("connection refused")
+
+    tool.session = RefusingSession()
+    providers.register("web_search", lambda: tool)
+    updated = nodes.execute_web_search({"search_queries": ["quantum"]})
+    assert updated["web_results"] == []
+    assert updated["error_log"][0]["provider"] == "tavily"
+    assert "connection refused" in updated["error_log"][0]["message"]
+
+
+def test_open_circuit_skips_refinement():
+    state = {
+        "web_results": [],
+        "news_results": [],
+        "error_log": [{"type": "search_error", "provider": "tavily", "query": "q",
+                       "message": "Circuit open for tavily", "circuit_open": True}],
+        "analyzed_query": {},
+        "original_query": "q",
+    }
+    updated = nodes.evaluate_results_and_select_urls(state)
+    assert updated["next_node"] == "extract_and_synthesize_information"
@@ -0,0 +1,272 @@
+import asyncio
+import sys
+import threading
+import time
+import pytest
+import nodes
+from browser_pool import BrowserPool
+from page_cache import PageCache
+from prefetch import Prefetcher
+from urls import url_key
+
+
+class FakeResult:
+    def __init__(self, url):
+        self.markdown = f"content of {url}"
+        self.response_headers = {"ETag": f'"{url}"', "Content-Type": "text/html"}
+
+
+class FakeStrategy:
+    calls = 0
+
+    async def arun(self, url, sections):
+        FakeStrategy.calls += 1
+        return [{"index": 0, "tags": [], "content": f"insights from {sections[0]}"}]
+
+
+class FakeCrawler:
+    delays = {}
+    active = 0
+    peak = 0
+    renders = 0
+    rendered = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def arun(self, url, **kwargs):
+        FakeCrawler.renders += 1
+        FakeCrawler.rendered.append(url)
+        FakeCrawler.active += 1
+        FakeCrawler.peak = max(FakeCrawler.peak, FakeCrawler.active)
+        try:
+            await asyncio.sleep(self.delays.get(url, 0.05))
+            if url.endswith("broken"):
+                raise RuntimeError("navigation failed")
+            if url.endswith("cancelled"):
+                raise asyncio.CancelledError()
+            return FakeResult(url)
+        finally:
+            FakeCrawler.active -= 1
+
+
+@pytest.fixture
+def fake_crawler(monkeypatch):
+    FakeCrawler.delays = {}
+    FakeCrawler.active = 0
+    FakeCrawler.peak = 0
+    FakeCrawler.renders = 0
+    FakeCrawler.rendered = []
+    FakeStrategy.calls = 0
+    pool = BrowserPool(size=4, max_uses=100, max_memory_growth_mb=1e9, crawler_factory=FakeCrawler)
+    monkeypatch.setattr(nodes, "get_browser_pool", lambda: pool)
+    monkeypatch.setattr(nodes, "LLMExtractionStrategy", lambda **kwargs: FakeStrategy())
+    monkeypatch.setattr(nodes, "LLMConfig", lambda **kwargs: None)
+    # Importing crawl4ai on the first scrape would count against the timing assertions
+    monkeypatch.setattr(nodes, "CrawlerRunConfig", lambda **kwargs: None)
+    monkeypatch.setattr(nodes, "CacheMode", type("CacheMode", (), {"BYPASS": "bypass"}))
+    yield FakeCrawler
+    pool.close()
+
+
+def test_scrapes_concurrently_with_limit(monkeypatch, fake_crawler):
+    monkeypatch.setattr(nodes.config, "SCRAPE_CONCURRENCY", 2)
+    urls = [f"http://site{i}.com" for i in range(4)]
+    fake_crawler.delays = {url: 0.1 for url in urls}
+    start = time.monotonic()
+    updated = nodes.scrape_websites({"original_query": "q", "urls_to_scrape": urls, "error_log": []})
+    assert time.monotonic() - start < 0.35
+    assert fake_crawler.peak == 2
+    assert list(updated["scraped_content"]) == urls
+
+
+def test_url_timeout_and_deadline_keep_finished_pages(monkeypatch, fake_crawler):
+    monkeypatch.setattr(nodes.config, "SCRAPE_URL_TIMEOUT", 0.2)
+    monkeypatch.setattr(nodes.config, "SCRAPE_DEADLINE", 0.5)
+    fake_crawler.delays = {"http://slow.com": 1.0}
+    urls = ["http://slow.com", "http://fast.com", "http://broken"]
+    updated = nodes.scrape_websites({"original_query": "q", "urls_to_scrape": urls, "error_log": []})
+    assert list(updated["scraped_content"]) == ["http://fast.com"]
+    messages = {e["url"]: e["message"] for e in updated["error_log"]}
+    assert "Timed out" in messages["http://slow.com"]
+    assert "navigation failed" in messages["http://broken"]
+
+
+
+def test_cancelled_scrape_only_fails_its_own_url(fake_crawler):
+    urls = ["http://fast.com", "http://cancelled"]
+    updated = nodes.scrape_websites({"original_query": "q", "urls_to_scrape": urls, "error_log": []})
+    assert list(updated["scraped_content"]) == ["http://fast.com"]
+    assert [(e["url"], e["message"]) for e in updated["error_log"]] == [("http://cancelled", "Scrape was cancelled")]
+
+
+def test_pool_reuses_and_recycles_crawlers():
+    created = []
+
+    class CountingCrawler(FakeCrawler):
+        def __init__(self):
+            created.append(self)
+
+    pool = BrowserPool(size=1, max_uses=2, max_memory_growth_mb=1e9, crawler_factory=CountingCrawler)
+
+    async def scrape():
+        async with pool.lease() as crawler:
+            return await crawler.arun("http://a.com")
+
+    try:
+        for _ in range(3):
+            pool.run(scrape)
+        stats = pool.stats()
+        assert len(created) == 2
+        assert stats["leases"] == 3
+        assert stats["recycled"] == 1
+        assert stats["in_use"] == 0
+    finally:
+        pool.close()
+
+
+
+def test_memory_recycling_ignores_other_crawlers_browsers():
+    pytest.importorskip("psutil")
+    browser_mb = iter([1, 60])
+
+    class ProcessCrawler(FakeCrawler):
+        async def __aenter__(self):
+            code = f"import time; x = bytearray({next(browser_mb)} * 2**20); time.sleep(30)"
+            self.process = await asyncio.create_subprocess_exec(sys.executable, "-c", code)
+            await asyncio.sleep(0.5)
+            return self
+
+        async def __aexit__(self, *args):
+            self.process.kill()
+            await self.process.wait()
+
+    pool = BrowserPool(size=2, max_uses=100, max_memory_growth_mb=20, crawler_factory=ProcessCrawler)
+
+    async def overlapping_leases():
+        async with pool.lease():
+            async with pool.lease():
+                pass
+
+    try:
+        pool.run(overlapping_leases)
+        assert pool.stats()["recycled"] == 0
+    finally:
+        pool.close()
+
+def test_page_cache_skips_render_and_extraction(fake_crawler):
+    state = {"original_query": "q", "urls_to_scrape": ["http://Site.com/page#intro"], "error_log": []}
+    first = nodes.scrape_websites(dict(state))
+    second = nodes.scrape_websites({**state, "urls_to_scrape": ["http://site.com/page"]})
+    assert "insights from content of" in first["scraped_content"]["http://Site.com/page#intro"]
+    assert second["scraped_content"]["http://site.com/page"] == first["scraped_content"]["http://Site.com/page#intro"]
+    assert fake_crawler.renders == 1
+    assert FakeStrategy.calls == 1
+    nodes.scrape_websites({**state, "original_query": "another question"})
+    assert fake_crawler.renders == 1
+    assert FakeStrategy.calls == 2
+
+
+class NotModified:
+    status_code = 304
+
+    def close(self):
+        pass
+
+
+def test_stale_page_revalidated_with_etag(monkeypatch, fake_crawler):
+    monkeypatch.setattr(nodes.config, "PAGE_CACHE_TTLS", {"default": 0})
+    requests_sent = []
+
+    def fake_get(url, headers=None, **kwargs):
+        requests_sent.append(headers)
+        return NotModified()
+
+    import tools
+    monkeypatch.setattr(tools.get_http_session("pages"), "get", fake_get)
+    state = {"original_query": "q", "urls_to_scrape": ["http://site.com/a"], "error_log": []}
+    nodes.scrape_websites(dict(state))
+    nodes.scrape_websites(dict(state))
+    assert fake_crawler.renders == 1
+    assert requests_sent == [{"If-None-Match": '"http://site.com/a"'}]
+
+
+def test_speculative_prefetch_adopts_selected_and_cancels_rest(monkeypatch, fake_crawler):
+    monkeypatch.setattr(nodes.config, "SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(nodes.config, "SPECULATIVE_PREFETCH_URLS", 2)
+    fake_crawler.delays = {"http://a.com": 0.01, "http://b.com": 1.0}
+
+    class Response:
+        content = '{"snippets_sufficient": false, "urls_to_scrape": ["http://a.com", "http://c.com"]}'
+
+    def slow_evaluation(self, *args, **kwargs):
+        time.sleep(0.2)
+        return Response()
+
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", slow_evaluation)
+    state = {
+        "original_query": "solar panel efficiency",
+        "analyzed_query": {"info_type": "facts"},
+        "web_results": [
+            {"url": "http://a.com", "title": "Solar panel efficiency", "snippet": "solar panel efficiency records"},
+            {"url": "http://b.com", "title": "Solar efficiency", "snippet": "panel efficiency"},
+            {"url": "http://c.com", "title": "Gardening", "snippet": "unrelated"},
+        ],
+        "news_results": [],
+        "error_log": [],
+    }
+    evaluated = nodes.evaluate_results_and_select_urls(state)
+    assert evaluated["next_node"] == "scrape_websites"
+    assert evaluated["prefetch_stats"] == {"started": 2, "hits": 1, "adopted_in_flight": 0, "misses": 1,
+                                           "wasted": 0, "cancelled": 1, "failed": 0}
+
+    nodes.scrape_websites({**evaluated, "error_log": []})
+    assert fake_crawler.rendered.count("http://a.com") == 1
+    assert "http://c.com" in fake_crawler.rendered
+
+
+
+def test_settling_prefetch_keeps_fetch_another_run_waits_for(fake_crawler):
+    fake_crawler.delays = {"http://x.com/a": 0.3}
+    pool, pages = nodes.get_browser_pool(), PageCache()
+    prefetcher = Prefetcher(pool, lambda url: nodes.scrape_flight.do_async(
+        url_key(url), lambda: nodes._fetch_page(pool, pages, url)))
+    prefetcher.start(["http://x.com/a"])
+    time.sleep(0.05)
+    updated = {}
+    state = {"original_query": "q", "urls_to_scrape": ["http://x.com/a", "http://y.com/b"], "error_log": []}
+    other_run = threading.Thread(target=lambda: updated.update(nodes.scrape_websites(state)))
+    other_run.start()
+    time.sleep(0.05)
+    assert prefetcher.settle([])["cancelled"] == 1
+    other_run.join()
+    assert list(updated["scraped_content"]) == ["http://x.com/a", "http://y.com/b"]
+    assert fake_crawler.rendered.count("http://x.com/a") == 1
+
+def test_pages_fetched_earlier_in_the_run_are_not_scraped_again(fake_crawler):
+    state = {"original_query": "q", "error_log": [], "fetched_urls": [url_key("http://old.com")],
+             "scraped_content": {"http://old.com": "earlier"},
+             "urls_to_scrape": ["http://old.com", "http://new.com", "https://www.new.com/"]}
+    updated = nodes.scrape_websites(state)
+    assert fake_crawler.rendered == ["http://new.com"]
+    # Only the new page is returned; the state reducers merge it into the earlier ones
+    assert updated["fetched_urls"] == [url_key("http://new.com")]
+    assert set(updated["scraped_content"]) == {"http://new.com"}
+
+
+def test_slow_page_cache_reads_do_not_block_other_scrapes(monkeypatch, fake_crawler):
+    get_page = PageCache.get_page
+
+    def slow_get_page(self, url):
+        time.sleep(0.3)
+        return get_page(self, url)
+
+    monkeypatch.setattr(PageCache, "get_page", slow_get_page)
+    urls = ["http://a.com", "http://b.com", "http://c.com"]
+    start = time.monotonic()
+    updated = nodes.scrape_websites({"original_query": "q", "urls_to_scrape": urls, "error_log": []})
+    assert time.monotonic() - start < 0.6
+    assert list(updated["scraped_content"]) == urls
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import nodes
+
+
+def test_web_search_keeps_query_order(monkeypatch):
+    delays = {"slow": 0.2, "medium": 0.1, "fast": 0.0}
+
+    def fake_search(query, num_results=10):
+        time.sleep(delays[query])
+        return [{"url": f"http://{query}.com", "title": query, "snippet": query}]
+
+    monkeypatch.setattr(nodes.web_search_tool, "search", fake_search)
+    state = {"search_queries": ["slow", "medium", "fast"], "original_query": "test"}
+    updated = nodes.execute_web_search(state)
+    assert [r["title"] for r in updated["web_results"]] == ["slow", "medium", "fast"]
+    assert updated["error_log"] == []
+
+
+def test_news_search_failing_query_is_isolated(monkeypatch):
+    def fake_search_news(query, days_back=7, num_results=5):
+        if query == "bad":
+            raise RuntimeError("boom")
+        return [{"url": f"http://{query}.com", "title": query, "summary": "", "date": "", "source": ""}]
+
+    monkeypatch.setattr(nodes.news_tool, "search_news", fake_search_news)
+    state = {"search_queries": ["good", "bad", "other"], "analyzed_query": {"time_sensitive": True}}
+    updated = nodes.execute_news_search(state)
+    assert [r["title"] for r in updated["news_results"]] == ["good", "other"]
+    assert len(updated["error_log"]) == 1
+    assert updated["error_log"][0]["query"] == "bad"
+    assert "boom" in updated["error_log"][0]["message"]
+
+
+def test_search_timeout_does_not_block_results(monkeypatch):
+    monkeypatch.setattr(nodes.config, "SEARCH_TIMEOUT", 0.2)
+
+    def fake_search(query, num_results=10):
+        if query == "hang":
+            time.sleep(1)
+        return [{"url": f"http://{query}.com", "title": query, "snippet": query}]
+
+    monkeypatch.setattr(nodes.web_search_tool, "search", fake_search)
+    start = time.monotonic()
+    updated = nodes.execute_web_search({"search_queries": ["hang", "ok"]})
+    assert time.monotonic() - start < 0.9
+    assert [r["title"] for r in updated["web_results"]] == ["ok"]
+    assert updated["error_log"][0]["query"] == "hang"
+
+
+def test_search_timeout_starts_when_the_query_runs(monkeypatch):
+    monkeypatch.setattr(nodes.config, "SEARCH_TIMEOUT", 0.3)
+
+    def fake_search(query):
+        time.sleep(0.2)
+        return [{"url": f"http://{query}.com", "title": query, "snippet": query}]
+
+    # One worker, so the second query waits for the first before its own timeout starts
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results, errors = nodes._fan_out_queries(executor, fake_search, ["first", "second"], "tavily")
+    assert [r["title"] for r in results] == ["first", "second"]
+    assert errors == []
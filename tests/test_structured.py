@@ -0,0 +1,62 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+import structured
+from structured import (AnalysisAndPlan, Evaluation, StructuredOutputError, Synthesis, invoke_structured,
+                        parse_structured, repair_json)
+
+
+def test_clean_json_is_not_repaired():
+    data, repaired = parse_structured('{"snippets_sufficient": true, "urls_to_scrape": []}', Evaluation)
+    assert data["snippets_sufficient"] is True and data["refine_search"] is False
+    assert repaired is False
+
+
+@pytest.mark.parametrize("text", [
+    'Here you go:\n```json\n{"urls_to_scrape": ["https://a.com/x"], "refine_search": False,}\n```',
+    '{"urls_to_scrape": ["https://a.com/x"],  // chosen pages\n "refine_search": false}',
+    '{"urls_to_scrape": ["https://a.com/x"], "reasoning": "truncated mid-sent',
+])
+def test_common_glitches_are_repaired_locally(text):
+    data, repaired = parse_structured(text, Evaluation)
+    assert data["urls_to_scrape"] == ["https://a.com/x"]
+    assert data["refine_search"] is False
+    assert repaired is True
+
+
+def test_invalid_fields_fall_back_to_defaults():
+    data, repaired = parse_structured(
+        '{"analysis": {"main_topic": "x", "depth_required": "extreme"}, "plan": {"search_approach": "both"}}',
+        AnalysisAndPlan
+    )
+    assert data["analysis"]["main_topic"] == "x"
+    assert data["analysis"]["depth_required"] == "medium"
+    assert data["plan"]["search_approach"] == "web_search"
+    assert repaired is True
+
+
+def test_synthesis_keeps_valid_fields_when_one_is_malformed():
+    data, _ = parse_structured('{"key_topics": [{"topic": "t"}], "confidence_summary": "high"}', Synthesis)
+    assert data["key_topics"][0]["topic"] == "t"
+    assert data["confidence_summary"]["overall"] == "low"
+
+
+def test_unrecoverable_text_raises():
+    with pytest.raises(StructuredOutputError):
+        repair_json("not a json")
+
+
+def test_invoke_structured_requests_schema_mode(monkeypatch):
+    monkeypatch.setattr(structured, "_stats", {})
+    received = {}
+
+    class Client:
+        def invoke(self, prompt, node=None, **kwargs):
+            received.update(kwargs)
+            return AIMessage(content="nothing useful")
+
+    data, error = invoke_structured(Client(), "prompt", Evaluation, node="evaluate")
+    assert data is None and error
+    assert received["response_mime_type"] == "application/json"
+    assert "urls_to_scrape" in received["response_json_schema"]["properties"]
+    assert structured.structured_output_stats()["evaluate"]["failed"] == 1
@@ -0,0 +1,53 @@
+import json
+import re
+import threading
+import time
+import config
+import nodes
+
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+def test_map_reduce_summarizes_groups_concurrently_and_reduces_once(monkeypatch):
+    monkeypatch.setattr(config, "SYNTHESIS_MODE", "map_reduce")
+    monkeypatch.setattr(config, "SYNTHESIS_MAP_GROUP_TOKENS", 60)
+    lock = threading.Lock()
+    calls = {"map": 0, "reduce": 0, "active": 0, "peak": 0}
+    reduce_prompts = []
+
+    def invoke(self, prompt, *args, **kwargs):
+        prompt = str(prompt)
+        if "SOURCES:" in prompt:
+            with lock:
+                calls["map"] += 1
+                calls["active"] += 1
+                calls["peak"] = max(calls["peak"], calls["active"])
+            time.sleep(0.05)
+            with lock:
+                calls["active"] -= 1
+            return DummyResponse(json.dumps({"sources": [
+                {"label": label, "url": "ignored", "relevance": 0.5, "key_points": [f"point from {label}"]}
+                for label in re.findall(r"\[(Web \d+)\]", prompt)
+            ]}))
+        calls["reduce"] += 1
+        reduce_prompts.append(prompt)
+        return DummyResponse(json.dumps({"key_topics": [{"topic": "t", "key_findings": ["f [Web 1]"]}]}))
+
+    monkeypatch.setattr(nodes.ChatGoogleGenerativeAI, "invoke", invoke)
+    web = [{"url": f"http://site{i}.com/", "title": f"Result {i}", "snippet": "lithium battery recycling " * 10}
+           for i in range(6)]
+    state = {"original_query": "battery recycling", "analyzed_query": {}, "web_results": web,
+             "news_results": [], "scraped_content": {},
+             "iteration_count": {"total_research": 1}, "max_iterations": {"total_research": 3}}
+    updated = nodes.extract_and_synthesize_information(state)
+
+    assert calls["map"] > 1 and calls["peak"] > 1
+    assert calls["reduce"] == 1
+    assert updated["analyzed_content"]["http://site0.com/"]["key_points"] == ["point from Web 1"]
+    assert "KEY POINTS EXTRACTED FROM EACH SOURCE" in reduce_prompts[0]
+    assert updated["context_stats"]["mode"] == "map_reduce"
+    assert updated["context_stats"]["dropped"] == []
+    assert updated["synthesized_information"][0]["key_topics"][0]["topic"] == "t"
@@ -0,0 +1,57 @@
+import pytest
+import tools
+import config
+
+
+class DummyHTTPResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+def test_tools_share_pooled_session():
+    first = tools.TavilySearchTool(api_key="key")
+    second = tools.TavilySearchTool(api_key="key")
+    news = tools.NewsAggregatorTool(api_key="key")
+    assert first.session is second.session
+    assert first.session is tools.get_http_session("tavily")
+    assert news.session is not first.session
+    adapter = first.session.get_adapter("https://api.tavily.com/search")
+    assert adapter._pool_maxsize == config.HTTP_POOL_SIZE
+
+
+def test_tavily_search_uses_session_timeout(monkeypatch):
+    calls = []
+
+    def fake_post(url, **kwargs):
+        calls.append(kwargs)
+        return DummyHTTPResponse({"results": [{"url": "http://a.com", "title": "A", "content": "snippet"}]})
+
+    tool = tools.TavilySearchTool(api_key="key")
+    monkeypatch.setattr(tool.session, "post", fake_post)
+    results = tool.search("query")
+    assert results == [{"url": "http://a.com", "title": "A", "snippet": "snippet"}]
+    assert calls[0]["timeout"] == (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+
+def test_tavily_search_is_cached(monkeypatch):
+    calls = []
+
+    def fake_post(url, **kwargs):
+        calls.append(kwargs)
+        return DummyHTTPResponse({"results": [{"url": "http://a.com", "title": "A", "content": "snippet"}]})
+
+    tool = tools.TavilySearchTool(api_key="key")
+    monkeypatch.setattr(tool.session, "post", fake_post)
+    first = tool.search("Quantum computing")
+    second = tools.TavilySearchTool(api_key="key").search("quantum   computing")
+    assert first == second
+    assert len(calls) == 1
+    assert tool.cache.stats()["hits"] == 1
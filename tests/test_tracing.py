@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import tracing
+from tracing import span, trace_node, tracing_stats
+
+
+@pytest.fixture(autouse=True)
+def fresh_tracing(monkeypatch):
+    monkeypatch.setattr(tracing, "_trackers", {})
+    monkeypatch.setattr(tracing, "_outcomes", {})
+
+
+def test_span_records_outcome_and_latency():
+    with span("external", "tavily", "search") as current:
+        current.payload_bytes = 128
+    with span("external", "tavily", "search") as current:
+        current.outcome = "http_429"
+
+    stats = tracing_stats()["external:tavily.search"]
+    assert stats["count"] == 2
+    assert stats["outcomes"] == {"ok": 1, "http_429": 1}
+    assert stats["p50"] is not None and stats["p99"] >= stats["p50"]
+
+
+def test_span_marks_exceptions_as_errors():
+    with pytest.raises(RuntimeError):
+        with span("external", "crawl4ai", "page_load"):
+            raise RuntimeError("boom")
+    assert tracing_stats()["external:crawl4ai.page_load"]["outcomes"] == {"error": 1}
+
+
+def test_trace_node_keeps_function_and_records_span():
+    def analyze_query(state):
+        return {**state, "analyzed_query": {"main_topic": "x"}}
+
+    traced = trace_node("analyze_query", analyze_query)
+    assert traced.__name__ == "analyze_query"
+    assert traced({"query": "q"})["analyzed_query"] == {"main_topic": "x"}
+    assert tracing_stats()["node:analyze_query"]["count"] == 1
+
+
+
+def test_node_payload_is_sized_outside_the_span(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(tracing, "_record", recorded.append)
+    monkeypatch.setattr(tracing, "_update_size", lambda state, update: time.sleep(0.2) or 5)
+    traced = trace_node("scrape_websites", lambda state: {**state, "urls_to_scrape": []})
+    traced({"scraped_content": {"http://a.com": "x" * 1000}})
+    assert recorded[0].payload_bytes == 5
+    assert recorded[0].duration < 0.1
+
+
+def test_node_payload_counts_only_changed_keys():
+    pages = {"http://a.com": "x" * 1000}
+    update = {"scraped_content": pages, "next_node": "report"}
+    assert tracing._update_size({"scraped_content": pages}, update) == len("report")
+
+def test_tracing_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(tracing.config, "TRACING_ENABLED", False)
+    with span("node", "report"):
+        pass
+    assert tracing_stats() == {}
+
+
+def test_metrics_payload_without_prometheus(monkeypatch):
+    monkeypatch.setattr(tracing, "prometheus_client", None)
+    assert tracing.metrics_payload() is None
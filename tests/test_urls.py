@@ -0,0 +1,35 @@
+import pytest
+from urls import canonicalize_url, dedupe_search_results, url_key
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("https://www.Example.com/article/?utm_source=x&utm_medium=y#section", "https://example.com/article"),
+    ("https://example.com/story/amp", "https://example.com/story"),
+    ("https://amp.example.com/amp/story.html", "https://example.com/story.html"),
+    ("https://example.com/post?b=2&fbclid=abc&a=1", "https://example.com/post?a=1&b=2"),
+    ("https://www.google.com/url?q=https://example.com/page%3Futm_campaign%3Dz&sa=D", "https://example.com/page"),
+    ("http://example.com:80/", "http://example.com/"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_url_key_ignores_scheme():
+    assert url_key("http://www.example.com/a") == url_key("https://example.com/a/")
+
+
+def test_dedupe_keeps_richest_snippet_and_reports_savings():
+    web = [
+        {"url": "https://example.com/a?utm_source=tw", "title": "A", "snippet": "short"},
+        {"url": "https://www.example.com/a", "title": "", "snippet": "a much longer snippet"},
+        {"url": "https://example.com/b", "title": "B", "snippet": "b"},
+        {"url": "https://news.site/story", "title": "S", "snippet": "web copy of the story text"},
+    ]
+    news = [{"url": "https://news.site/story/amp", "title": "S", "summary": "news", "date": "2024-01-01", "source": "N"}]
+    unique_web, unique_news, stats = dedupe_search_results(web, news)
+    assert [r["url"] for r in unique_web] == ["https://example.com/a?utm_source=tw", "https://example.com/b"]
+    assert unique_web[0]["snippet"] == "a much longer snippet"
+    assert unique_web[0]["title"] == "A"
+    assert unique_news[0]["summary"] == "web copy of the story text"
+    assert stats["web_before"] == 4 and stats["web_after"] == 2
+    assert stats["chars_removed"] > 0
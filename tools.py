@@ -3,16 +3,32 @@
 import json
 import logging
 import requests
+import threading
 import time
 import os
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Any, Optional
 import config
+from cache import PersistentCache, get_cache, make_cache_key, normalize_query
+from ratelimit import AdaptiveLimiter, get_limiter
+from resilience import CircuitOpenError, get_caller, remaining_time
+from tracing import span
+from cassette import wrap_session
 import datetime
 import re
 import random
 
 logger = logging.getLogger(__name__)
 
+class SearchProviderError(Exception):
+    """Raised when a search provider call fails after retries or is rejected by its circuit breaker."""
+
+    def __init__(self, provider: str, query: str, message: str, circuit_open: bool = False):
+        super().__init__(f"{provider} search failed for '{query}': {message}")
+        self.provider = provider
+        self.query = query
+        self.circuit_open = circuit_open
+
 def redact_api_key_from_url(url):
     """
     Redact API keys from URLs to prevent them from being logged.
@@ -20,6 +36,84 @@ def redact_api_key_from_url(url):
     redacted_url = re.sub(r'(api_?[kK]ey=)[^&]+', r'\1[REDACTED]', url)
     return redacted_url
 
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_http_session(provider: str) -> requests.Session:
+    """
+    Return the process-wide pooled session for a provider.
+
+    Sessions are created on first use and shared by every tool instance, node
+    and API request so that TCP/TLS connections are kept alive and reused.
+    """
+    with _sessions_lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Connection": "keep-alive"})
+            _sessions[provider] = session
+        return session
+
+def _search_cache(namespace: str, ttl: float) -> Optional[PersistentCache]:
+    """Return the shared result cache for a provider, or None when caching is disabled."""
+    if not config.SEARCH_CACHE_ENABLED:
+        return None
+    return get_cache(namespace, ttl=ttl, max_entries=config.SEARCH_CACHE_MAX_ENTRIES)
+
+def http_timeout():
+    """Return the (connect, read) timeout tuple used for provider requests, shortened to any current deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+    remaining = max(remaining, 0.1)
+    return (min(config.HTTP_CONNECT_TIMEOUT, remaining), min(config.HTTP_READ_TIMEOUT, remaining))
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds."""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+def is_transient_error(error: Exception) -> bool:
+    """Return True for errors worth retrying: network failures, timeouts, 408, 429 and 5xx."""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status in (408, 429) or status >= 500
+    return isinstance(error, requests.exceptions.RequestException)
+
+def rate_limited_request(limiter: AdaptiveLimiter, send) -> requests.Response:
+    """
+    Send a request through a provider's limiter.
+
+    429 responses are reported to the limiter, which pauses and reduces
+    concurrency, and the request waits for capacity and is sent again up to
+    RATE_LIMIT_MAX_RETRIES times, or until the pause would run past the
+    current deadline. The last response is returned as-is.
+    """
+    for attempt in range(config.RATE_LIMIT_MAX_RETRIES + 1):
+        with limiter.slot(), span("external", limiter.name, "search") as call:
+            start = time.monotonic()
+            response = send()
+            latency = time.monotonic() - start
+            call.payload_bytes = len(getattr(response, "content", None) or b"")
+            if response.status_code >= 400:
+                call.outcome = f"http_{response.status_code}"
+        if response.status_code != 429:
+            limiter.record_success(latency)
+            return response
+        retry_after = _retry_after(response)
+        limiter.record_throttle(retry_after)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= (retry_after if retry_after is not None else config.RATE_LIMIT_BACKOFF):
+            logger.warning(f"{limiter.name} returned 429 (attempt {attempt + 1}), no time left to wait for capacity")
+            return response
+        logger.warning(f"{limiter.name} returned 429 (attempt {attempt + 1}), waiting for capacity")
+    return response
+
 class TavilySearchTool:
     """Tool for performing web searches using Tavily's Search API."""
     
@@ -28,23 +122,39 @@ class TavilySearchTool:
         if not self.api_key:
             raise ValueError("TAVILY_API_KEY is required for TavilySearchTool")
         
-        self.base_url = "https://api.tavily.com/search"
+        self.base_url = config.TAVILY_SEARCH_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.session = wrap_session(get_http_session("tavily"), "tavily")
+        self.limiter = get_limiter("tavily")
+        self.resilience = get_caller("tavily", retry_on=is_transient_error)
+        self.cache = _search_cache("web_search", config.WEB_SEARCH_CACHE_TTL)
     
-    def search(self, query: str, num_results: int = config.MAX_SEARCH_RESULTS) -> List[Dict[str, Any]]:
+    def search(self, query: str, num_results: int = config.MAX_SEARCH_RESULTS,
+               topic: str = "general") -> List[Dict[str, Any]]:
         """
         Perform a web search using Tavily's Search API.
         
         Args:
             query: The search query
             num_results: Maximum number of results to return
+            topic: Tavily search topic
             
         Returns:
             List of search results with url, title, and snippet
+
+        Raises:
+            SearchProviderError: if the request fails after retries or the circuit is open
         """
+        cache_key = make_cache_key(query=normalize_query(query), num_results=num_results, topic=topic)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Tavily web search cache hit for: {query}")
+                return cached
+        
         logger.info(f"Performing Tavily web search for: {query}")
         
         try:
@@ -54,16 +164,20 @@ class TavilySearchTool:
                 "search_depth": "basic",
                 "include_answer": False,
                 "include_raw_content": False,
-                "topic": "general"
+                "topic": topic
             }
             
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
+            def request():
+                response = rate_limited_request(self.limiter, lambda: self.session.post(
+                    self.base_url,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=http_timeout()
+                ))
+                response.raise_for_status()
+                return response.json()
+            
+            data = self.resilience.call(request)
             
             results = []
             if "results" in data:
@@ -84,18 +198,16 @@ class TavilySearchTool:
                     snippet = result.get('snippet', 'No snippet')
                     logger.debug(f"  Snippet: {snippet[:150]}..." if len(snippet) > 150 else f"  Snippet: {snippet}")
             
+            if self.cache is not None:
+                self.cache.set(cache_key, results)
             return results
                 
+        except CircuitOpenError as e:
+            logger.error(f"Tavily web search skipped: {str(e)}")
+            raise SearchProviderError("tavily", query, str(e), circuit_open=True) from e
         except requests.exceptions.RequestException as e:
             logger.error(f"Error in Tavily web search: {str(e)}")
-            results = []
-            for i in range(min(3, num_results)):
-                results.append({
-                    "url": f"https://example.com/result{i}",
-                    "title": f"Example Result {i} for {query}",
-                    "snippet": f"This is a fallback snippet related to {query}. Tavily API call failed: {str(e)}",
-                })
-            return results
+            raise SearchProviderError("tavily", query, str(e)) from e
 
 class WebSearchTool:
     """
@@ -125,7 +237,11 @@ class NewsAggregatorTool:
     
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.environ.get("NEWS_API_KEY") or config.NEWS_API_KEY
-        self.base_url = "https://newsapi.org/v2/everything"
+        self.base_url = config.NEWS_API_URL
+        self.session = wrap_session(get_http_session("newsapi"), "newsapi")
+        self.limiter = get_limiter("newsapi")
+        self.resilience = get_caller("newsapi", retry_on=is_transient_error)
+        self.cache = _search_cache("news_search", config.NEWS_SEARCH_CACHE_TTL)
         if not self.api_key:
             logger.warning("NEWS_API_KEY not provided. News search will return mock data.")
     
@@ -141,6 +257,9 @@ class NewsAggregatorTool:
 
         Returns:
             List of news results with url, title, summary, date, and source
+
+        Raises:
+            SearchProviderError: if the request fails after retries or the circuit is open
         """
         logger.info(f"Searching news for: {query}")
         results: List[Dict[str, Any]] = []
@@ -160,6 +279,12 @@ class NewsAggregatorTool:
                 })
             logger.info(f"News search (MOCK) returned {len(results)} results")
             return results
+        cache_key = make_cache_key(query=normalize_query(query), num_results=num_results, days_back=days_back)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"News search cache hit for: {query}")
+                return cached
         # Perform real NewsAPI request
         try:
             # Calculate the 'from' date based on days_back
@@ -171,9 +296,15 @@ class NewsAggregatorTool:
                 "pageSize": num_results,
                 "apiKey": self.api_key
             }
-            response = requests.get(self.base_url, params=params, timeout=config.SEARCH_TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
+            def request():
+                response = rate_limited_request(
+                    self.limiter,
+                    lambda: self.session.get(self.base_url, params=params, timeout=http_timeout())
+                )
+                response.raise_for_status()
+                return response.json()
+
+            data = self.resilience.call(request)
             articles = data.get("articles", [])
             for art in articles[:num_results]:
                 results.append({
@@ -184,20 +315,12 @@ class NewsAggregatorTool:
                     "source": art.get("source", {}).get("name", ""),
                 })
             logger.info(f"News search returned {len(results)} articles")
+            if self.cache is not None:
+                self.cache.set(cache_key, results)
             return results
+        except CircuitOpenError as e:
+            logger.error(f"NewsAPI search skipped: {str(e)}")
+            raise SearchProviderError("newsapi", query, str(e), circuit_open=True) from e
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error in NewsAPI search: {str(e)}")
-            # Fallback to mock data on error
-            current_time = time.time()
-            for i in range(min(3, num_results)):
-                days_ago = i % days_back
-                timestamp = time.strftime("%Y-%m-%d", time.localtime(current_time - days_ago * 86400))
-                results.append({
-                    "url": f"https://news-example.com/article{i}",
-                    "title": f"[MOCK] News Article {i} about {query}",
-                    "summary": f"NewsAPI search failed: {str(e)}. This is mock data.",
-                    "date": timestamp,
-                    "source": f"Mock News Source {i}",
-                })
-            logger.info(f"News search (fallback) returned {len(results)} mock results")
-            return results
\ No newline at end of file
+            logger.error(f"Error in NewsAPI search: {redact_api_key_from_url(str(e))}")
+            raise SearchProviderError("newsapi", query, redact_api_key_from_url(str(e))) from e
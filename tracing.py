@@ -0,0 +1,214 @@
+"""Latency spans for graph nodes and external calls, exported to Prometheus and OpenTelemetry."""
+
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import config
+from profiler import profiled
+from resilience import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+try:
+    import prometheus_client
+except ImportError:  # /metrics is unavailable without prometheus_client
+    prometheus_client = None
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # OpenTelemetry spans are skipped without opentelemetry-api
+    otel_trace = None
+
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+if prometheus_client is not None:
+    NODE_DURATION = prometheus_client.Histogram(
+        "research_node_duration_seconds", "Duration of LangGraph node executions",
+        ["node", "outcome"], buckets=DURATION_BUCKETS
+    )
+    NODE_PAYLOAD = prometheus_client.Histogram(
+        "research_node_payload_bytes", "Approximate size of the state keys changed by a node",
+        ["node"], buckets=PAYLOAD_BUCKETS
+    )
+    CALL_DURATION = prometheus_client.Histogram(
+        "research_external_call_duration_seconds", "Duration of calls to external services",
+        ["provider", "operation", "outcome"], buckets=DURATION_BUCKETS
+    )
+    CALL_PAYLOAD = prometheus_client.Histogram(
+        "research_external_call_payload_bytes", "Size of the response received from external services",
+        ["provider", "operation"], buckets=PAYLOAD_BUCKETS
+    )
+
+_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+_outcomes: Dict[Tuple[str, str], Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+class Span:
+    """Timing and attributes of one node execution or external call."""
+
+    def __init__(self, kind: str, name: str, operation: Optional[str] = None):
+        self.kind = kind
+        self.name = name
+        self.operation = operation
+        self.outcome = "ok"
+        self.payload_bytes: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.duration = 0.0
+        self.stopped_at: Optional[float] = None
+
+    def stop(self):
+        """Stop the clock; the rest of the block (e.g. sizing the result) is not part of the duration."""
+        if self.stopped_at is None:
+            self.stopped_at = time.perf_counter()
+
+
+def _record(span: Span):
+    key = (span.kind, f"{span.name}.{span.operation}" if span.operation else span.name)
+    with _stats_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = LatencyTracker(config.TRACING_WINDOW)
+        outcomes = _outcomes.setdefault(key, {})
+        outcomes[span.outcome] = outcomes.get(span.outcome, 0) + 1
+    tracker.record(span.duration)
+
+    if prometheus_client is None:
+        return
+    if span.kind == "node":
+        NODE_DURATION.labels(span.name, span.outcome).observe(span.duration)
+        if span.payload_bytes is not None:
+            NODE_PAYLOAD.labels(span.name).observe(span.payload_bytes)
+    else:
+        CALL_DURATION.labels(span.name, span.operation or "", span.outcome).observe(span.duration)
+        if span.payload_bytes is not None:
+            CALL_PAYLOAD.labels(span.name, span.operation or "").observe(span.payload_bytes)
+
+
+@contextmanager
+def span(kind: str, name: str, operation: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a block as a node ("node") or external call ("external") span.
+
+    The block may set `payload_bytes`, `outcome` and extra `attributes` on the
+    yielded span; an exception marks the outcome "error" (unless the block set
+    another outcome) and is re-raised.
+    """
+    current = Span(kind, name, operation)
+    current.attributes.update(attributes)
+    otel_span = None
+    if config.TRACING_ENABLED and otel_trace is not None:
+        otel_span = otel_trace.get_tracer(__name__).start_span(
+            f"{kind}.{name}" + (f".{operation}" if operation else "")
+        )
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        if current.outcome == "ok":
+            current.outcome = "error"
+        raise
+    finally:
+        current.duration = (current.stopped_at or time.perf_counter()) - start
+        if config.TRACING_ENABLED:
+            _record(current)
+        if otel_span is not None:
+            otel_span.set_attribute("outcome", current.outcome)
+            if current.payload_bytes is not None:
+                otel_span.set_attribute("payload_bytes", current.payload_bytes)
+            for key, value in current.attributes.items():
+                otel_span.set_attribute(key, value)
+            otel_span.end()
+
+
+def _estimated_size(value: Any) -> int:
+    """Rough serialized size of a state value: string lengths plus a few bytes per scalar."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(key)) + _estimated_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(_estimated_size(item) for item in value)
+    return 8
+
+
+def _update_size(state: Any, update: Any) -> Optional[int]:
+    """Estimated size of the keys a node changed (nodes often return the whole state)."""
+    if not isinstance(update, dict):
+        return None
+    if not isinstance(state, dict):
+        state = {}
+    return sum(_estimated_size(value) for key, value in update.items()
+               if key not in state or state[key] is not value)
+
+
+def trace_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node so every execution is recorded as a node span (and profiled when requested)."""
+    @functools.wraps(fn)
+    def traced(state):
+        with span("node", name) as current:
+            with profiled(name):
+                update = fn(state)
+            current.stop()
+            current.payload_bytes = _update_size(state, update)
+            return update
+    return traced
+
+
+def tracing_stats() -> Dict[str, Dict[str, Any]]:
+    """Return count, outcomes and p50/p95/p99 latency per node and external call."""
+    with _stats_lock:
+        items = [(key, tracker, dict(_outcomes.get(key, {}))) for key, tracker in _trackers.items()]
+    stats = {}
+    for (kind, name), tracker, outcomes in items:
+        stats[f"{kind}:{name}"] = {
+            "count": sum(outcomes.values()),
+            "outcomes": outcomes,
+            "p50": tracker.percentile(50, min_samples=1),
+            "p95": tracker.percentile(95, min_samples=1),
+            "p99": tracker.percentile(99, min_samples=1),
+        }
+    return stats
+
+
+def reset_tracing_stats():
+    """Forget the recorded percentile windows and outcome counts (Prometheus histograms are kept)."""
+    with _stats_lock:
+        _trackers.clear()
+        _outcomes.clear()
+
+
+def metrics_payload() -> Optional[Tuple[bytes, str]]:
+    """Return the Prometheus exposition and its content type, or None without prometheus_client."""
+    if prometheus_client is None:
+        return None
+    return prometheus_client.generate_latest(), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def configure_otel_exporter() -> bool:
+    """
+    Export spans over OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set.
+
+    Needs opentelemetry-sdk and opentelemetry-exporter-otlp; returns False
+    (spans stay no-ops) if they are not installed or no endpoint is configured.
+    """
+    if not config.OTEL_EXPORTER_ENDPOINT:
+        return False
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but the OpenTelemetry SDK/exporter is not installed")
+        return False
+    provider = TracerProvider(resource=Resource.create({"service.name": config.OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(provider)
+    logger.info(f"Exporting traces to {config.OTEL_EXPORTER_ENDPOINT}")
+    return True
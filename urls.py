@@ -0,0 +1,144 @@
+"""URL canonicalization and search result deduplication."""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "ref_url", "cmpid", "ncid", "sr_share", "_ga", "_gl", "amp", "outputtype",
+}
+
+# Redirect wrappers whose target is carried in a query parameter: {host suffix: (path prefix, param)}
+REDIRECT_WRAPPERS = {
+    "google.com": ("/url", ("q", "url")),
+    "facebook.com": ("/l.php", ("u",)),
+    "duckduckgo.com": ("/l/", ("uddg",)),
+    "bing.com": ("/ck/a", ("u",)),
+    "t.umblr.com": ("/redirect", ("z",)),
+    "out.reddit.com": ("/", ("url",)),
+}
+
+_AMP_PATH = re.compile(r"(/amp/?$)|(/amp(?=/))|(\.amp(?=\.html?$|$))")
+
+
+def _unwrap_redirect(url: str) -> str:
+    for _ in range(3):
+        parts = urlsplit(url)
+        host = parts.netloc.lower().split(":")[0]
+        for suffix, (path_prefix, params) in REDIRECT_WRAPPERS.items():
+            if host == suffix or host.endswith("." + suffix):
+                if parts.path.startswith(path_prefix):
+                    query = dict(parse_qsl(parts.query))
+                    target = next((unquote(query[p]) for p in params if query.get(p, "").startswith("http")), None)
+                    if target:
+                        url = target
+                        break
+        else:
+            return url
+    return url
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Return a canonical form of a URL for deduplication.
+
+    The result identifies a page; it is not meant to be fetched or shown, as
+    some hosts only answer on "www." or need the parameters removed here.
+
+    Unwraps known redirect wrappers, lowercases the host, removes "www." and
+    "amp." prefixes, default ports, fragments, AMP path variants, trailing
+    slashes and tracking parameters (utm_* and common click identifiers), and
+    sorts the remaining query parameters. The scheme is lowercased but kept;
+    url_key, which dedup and the caches compare, drops it as well.
+    """
+    if not url:
+        return url
+    url = _unwrap_redirect(url.strip())
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    for prefix in ("www.", "amp."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = _AMP_PATH.sub("", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def url_key(url: str) -> str:
+    """The canonical URL without its scheme, used for dedup and cache keys; http and https forms match."""
+    return canonicalize_url(url).split("://", 1)[-1]
+
+
+def _merge_duplicates(results: List[Dict[str, Any]], text_key: str) -> List[Dict[str, Any]]:
+    """Merge results sharing a url_key, keeping first-seen order, URL and the richest text."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        key = url_key(result.get("url", ""))
+        if not key:
+            continue
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = dict(result)
+            continue
+        if len(result.get(text_key) or "") > len(existing.get(text_key) or ""):
+            richer, other = result, existing
+        else:
+            richer, other = existing, result
+        # Fill fields the richer entry lacks (e.g. a missing title or date)
+        merged[key] = {**{k: v for k, v in other.items() if v}, **{k: v for k, v in richer.items() if v}}
+        merged[key]["url"] = existing["url"]
+    return list(merged.values())
+
+
+def dedupe_search_results(web_results: List[Dict[str, Any]], news_results: List[Dict[str, Any]]
+                          ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Deduplicate web and news results by url_key before they are put in a prompt.
+
+    Different queries and providers often return the same page, possibly
+    under another URL form. Duplicates within each list are merged keeping
+    the longest snippet; a page that appears in both lists is kept once, as
+    a news result, with the longer of the two texts. Results keep the URL
+    they were first seen with.
+
+    Returns:
+        The deduplicated web and news results and statistics on what was removed,
+        including the serialized prompt characters saved.
+    """
+    web = _merge_duplicates(web_results, "snippet")
+    news = _merge_duplicates(news_results, "summary")
+
+    news_by_key = {url_key(item["url"]): item for item in news}
+    unique_web = []
+    for item in web:
+        news_item = news_by_key.get(url_key(item["url"]))
+        if news_item is None:
+            unique_web.append(item)
+        elif len(item.get("snippet") or "") > len(news_item.get("summary") or ""):
+            news_item["summary"] = item["snippet"]
+
+    chars_before = len(json.dumps(web_results)) + len(json.dumps(news_results))
+    chars_after = len(json.dumps(unique_web)) + len(json.dumps(news))
+    stats = {
+        "web_before": len(web_results),
+        "web_after": len(unique_web),
+        "news_before": len(news_results),
+        "news_after": len(news),
+        "chars_removed": chars_before - chars_after,
+    }
+    if stats["web_before"] != stats["web_after"] or stats["news_before"] != stats["news_after"]:
+        logger.info(f"Deduplicated search results: {stats}")
+    return unique_web, news, stats